@@ -0,0 +1,99 @@
+"""
+Offline exchange benchmark / load test: drives the real ExchangeHandler code paths against the
+local Bitget V2 REST stand-in (bitget_rest_stub.py). No network, no real orders.
+
+Per scenario it runs `--trades` entries at each concurrency level: market entry with SL
+(place_order, cold config cache on the first level), SL -> BE (update_sl), price reads
+(get_market_price) and closes (close_position). Reports p50/p95/p99 per path, stub requests
+per trade, 429s seen by the stand-in and rate-limiter retries.
+
+Usage: python bench_exchange.py [--concurrency 1,4,8] [--trades 20] [--latency-ms 30] [--jitter-ms 20] [--error-rate 0.0]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from bitget_rest_stub import BitgetRestStub
+from metrics import LatencyHistogram
+
+SYMBOLS = ("BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "DOGEUSDT", "ADAUSDT", "AVAXUSDT", "LINKUSDT")
+PATHS = ("entry", "price", "sl_to_be", "close")
+
+async def timed(hist, coro):
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        hist.record((time.perf_counter() - start) * 1000)
+
+async def one_trade(exchange, stub, raw, hists):
+    symbol = exchange.symbols.unified(raw)
+    price = stub.prices.setdefault(raw, 100.0)
+    await timed(hists["entry"], exchange.place_order(symbol, "buy", 1, 10, sl_price=price * 0.98))
+    await timed(hists["price"], exchange.get_market_price(symbol))
+    pos = await exchange.get_position(symbol)
+    await timed(hists["sl_to_be"], exchange.update_sl(symbol, price, pos=pos))
+    await timed(hists["close"], exchange.close_position(symbol))
+
+async def run_level(exchange, stub, level, trades):
+    hists = {path: LatencyHistogram() for path in PATHS}
+    slots = asyncio.Semaphore(level)
+    locks = {raw: asyncio.Lock() for raw in SYMBOLS}  # One trade per symbol at a time (hedge positions would merge)
+
+    async def worker(i):
+        raw = SYMBOLS[i % len(SYMBOLS)]
+        async with slots, locks[raw]:
+            await one_trade(exchange, stub, raw, hists)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(trades)))
+    return hists, time.perf_counter() - start
+
+async def main(args):
+    stub = BitgetRestStub(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=42)
+    base_url = await stub.start()
+
+    # Config is read at import time: point CCXT and the raw client at the stub before importing
+    os.environ["BITGET_REST_URL"] = base_url
+    os.environ.update({"MARKET_WS_ENABLED": "false", "PRIVATE_WS_ENABLED": "false"})
+    os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+    from exchange_handler import ExchangeHandler
+    exchange = ExchangeHandler()
+    exchange.exchange.apiKey, exchange.exchange.secret, exchange.exchange.password = "bench", "bench", "bench"
+    exchange._remember_config = lambda key, **fields: exchange._cache.setdefault(key, {}).update(fields)  # Memory only
+    exchange.boot_markets()
+    await exchange.exchange.load_markets()
+
+    print(f"Stub: {args.latency_ms:.0f}±{args.jitter_ms:.0f}ms per request, error rate {args.error_rate:.0%} | {args.trades} trades per level")
+    print("---------------------------------------------------")
+    try:
+        for level in [int(x) for x in args.concurrency.split(",")]:
+            if args.error_rate:
+                for path in ("v2/mix/order/place-order", "v2/mix/order/place-tpsl-order"):
+                    stub.inject_error(path, "429", status=429, times=max(1, int(args.trades * args.error_rate)))
+            requests_before, limited_before = stub.stats["requests"], stub.stats["rate_limited"]
+            retries_before = sum(s["retries"] for s in exchange.limiter.stats.values())
+            hists, elapsed = await run_level(exchange, stub, level, args.trades)
+            retries = sum(s["retries"] for s in exchange.limiter.stats.values()) - retries_before
+            print(f"Concurrency {level:>3}: {args.trades / elapsed:6.1f} trades/s | "
+                  f"{(stub.stats['requests'] - requests_before) / args.trades:4.1f} requests/trade | "
+                  f"stub 429s {stub.stats['rate_limited'] - limited_before} | limiter retries {retries}")
+            for path in PATHS:
+                print(f"   {path:<9} {hists[path].format_line()}")
+        print("---------------------------------------------------")
+        for lane, s in exchange.limiter.get_stats()["lanes"].items():
+            print(f"Lane {lane:<8} {s['requests']:>5} req | queued {s['queued']:>4} | wait p50 {s['p50_wait']:.0f}ms / p99 {s['p99_wait']:.0f}ms")
+    finally:
+        await exchange.close()
+        await stub.stop()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Offline ExchangeHandler latency & load benchmark")
+    ap.add_argument("--concurrency", default="1,4,8")
+    ap.add_argument("--trades", type=int, default=20)
+    ap.add_argument("--latency-ms", type=float, default=30)
+    ap.add_argument("--jitter-ms", type=float, default=20)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Share of entries / TP-SL placements answered with a 429")
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(main(ap.parse_args()))
@@ -0,0 +1,175 @@
+"""
+Offline parser benchmark: replays the labelled channel corpus through the prefilter and
+parse_message, with Gemini replaced by the local stub (llm_stub_server.py). No network needed.
+
+Reports per-action accuracy against the expected TradeParsingResult fields, plus
+p50/p95/p99 latency and throughput at several concurrency levels.
+--batch also times the backlog catch-up path (parse_batch) against serial single parses.
+Reply contexts are compacted like the listener does (--raw-context sends the full replied-to text),
+and prompt/output tokens per result type are reported from the stub's usage metadata.
+
+Usage:
+  python bench_parser.py [--concurrency 1,4,8] [--latency-ms 800] [--jitter-ms 400]
+                         [--error-rate 0.05] [--repeat 3] [--llm-only] [--batch] [--raw-context]
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import defaultdict
+from llm_stub_server import LLMStubServer, load_corpus
+from metrics import LatencyHistogram
+from prefilter import prefilter_message
+
+FLOAT_FIELDS = ("entry", "sl", "leverage")
+
+def _same_float(a, b):
+    if a is None or b is None:
+        return a == b
+    return abs(float(a) - float(b)) <= abs(float(b)) * 1e-9
+
+def _norm_symbol(s):
+    s = (s or "").upper().replace("#", "").replace("$", "").replace("/", "")
+    return s if s.endswith("USDT") else f"{s}USDT"
+
+def matches_expected(result, expected):
+    """Only the fields present in the label are checked (type always)."""
+    for key, want in expected.items():
+        got = result.get(key)
+        if key in FLOAT_FIELDS:
+            ok = _same_float(got, want)
+        elif key == "tp":
+            ok = got is not None and len(got) == len(want) and all(_same_float(g, w) for g, w in zip(got, want))
+        elif key == "symbol":
+            ok = _norm_symbol(got) == _norm_symbol(want)
+        elif key == "value":
+            ok = str(got or "").upper() == str(want).upper()
+        else:
+            ok = got == want
+        if not ok:
+            return False
+    return True
+
+async def run_pipeline(parser, row):
+    """Same gates as TelegramListener.process_message: idea skip, prefilter, parse."""
+    text, reply = row["text"], row["prompt_context"]
+    if "IDEA" in text.upper() or not prefilter_message(text, reply).matched:
+        return {"type": "IGNORE"}
+    return await parser.parse_message(text, reply)
+
+async def run_level(parser, corpus, concurrency):
+    slots = asyncio.Semaphore(concurrency)
+    hist = LatencyHistogram()
+    results = [None] * len(corpus)
+
+    async def worker(i, row):
+        async with slots:
+            start = time.perf_counter()
+            results[i] = await run_pipeline(parser, row)
+            hist.record((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i, r) for i, r in enumerate(corpus)))
+    return results, hist, time.perf_counter() - start
+
+async def run_backlog(parser, corpus):
+    """Catch-up path: one parse_batch call over every prefiltered message vs. one LLM call at a time."""
+    rows = [r for r in corpus if "IDEA" not in r["text"].upper() and prefilter_message(r["text"], r.get("reply_context", "")).matched]
+    items = [(r["text"], r["prompt_context"]) for r in rows]
+
+    start = time.perf_counter()
+    for text, reply in items:
+        await parser.parse_message(text, reply)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await parser.parse_batch(items)
+    batched = time.perf_counter() - start
+    correct = sum(matches_expected(res, r["expected"]) for r, res in zip(rows, results))
+    return len(items), correct, serial, batched
+
+async def main(args):
+    corpus = load_corpus(args.corpus) * args.repeat
+    stub = LLMStubServer(corpus, args.latency_ms, args.jitter_ms, args.error_rate, seed=42)
+    base_url = await stub.start()
+
+    levels = [int(x) for x in args.concurrency.split(",")]
+    # Config is read at import time: point the client at the stub before importing the parser
+    os.environ["GEMINI_BASE_URL"] = base_url
+    os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+    os.environ["PARSER_MAX_CONCURRENCY"] = str(max(levels))
+    import parser
+    from parse_cache import ParseCache
+    parser.parse_cache = ParseCache(memory_size=0, persistent=False)  # Hermetic: never touches trading_bot.db
+
+    # The listener summarizes the replied-to trade from its DB record; here it comes from the reply text
+    for row in corpus:
+        reply = row.get("reply_context", "")
+        row["prompt_context"] = reply if args.raw_context else await parser.compact_reply_context(reply)
+
+    if args.llm_only:
+        parser.LOCAL_PARSE_MIN_CONFIDENCE = 2.0  # Unreachable: every parse goes to the (stub) LLM
+
+    print(f"Corpus: {args.corpus} x{args.repeat} ({len(corpus)} messages)")
+    print(f"Stub: {args.latency_ms:.0f}±{args.jitter_ms:.0f}ms, error rate {args.error_rate:.0%} | Mode: {'LLM only' if args.llm_only else 'local fast path + LLM'}"
+          f" | Reply context: {'raw' if args.raw_context else 'compact'}")
+
+    try:
+        for n, level in enumerate(levels):
+            # Fresh, memory-only, zero-size cache: every run measures real parse work
+            parser.parse_cache = ParseCache(memory_size=0, persistent=False)
+            requests_before = stub.stats["requests"]
+            results, hist, elapsed = await run_level(parser, corpus, level)
+
+            if n == 0:
+                per_action = defaultdict(lambda: [0, 0])
+                failures = []
+                for row, result in zip(corpus, results):
+                    expected = row["expected"]
+                    category = expected.get("action") or expected["type"]
+                    ok = matches_expected(result, expected)
+                    per_action[category][0] += ok
+                    per_action[category][1] += 1
+                    if not ok and row not in [f[0] for f in failures]:
+                        failures.append((row, result))
+
+                total_ok = sum(v[0] for v in per_action.values())
+                print("---------------------------------------------------")
+                print(f"Accuracy: {total_ok}/{len(corpus)} ({total_ok / len(corpus):.1%})")
+                for category, (ok, total) in sorted(per_action.items()):
+                    print(f"   {category:<14} {ok:>4}/{total:<4} ({ok / total:.0%})")
+                for row, result in failures[:10]:
+                    print(f"   ❌ {row['text'][:40]!r}: got {result.get('type')}/{result.get('action')}, want {row['expected']}")
+                print("---------------------------------------------------")
+
+            llm_calls = stub.stats["requests"] - requests_before
+            print(f"Concurrency {level:>3}: {len(corpus) / elapsed:8.1f} msg/s | "
+                  f"p50 {hist.percentile(50):7.1f}ms | p95 {hist.percentile(95):7.1f}ms | p99 {hist.percentile(99):7.1f}ms | "
+                  f"LLM calls {llm_calls}")
+
+        if args.batch:
+            parser.parse_cache = ParseCache(memory_size=0, persistent=False)
+            requests_before = stub.stats["requests"]
+            count, correct, serial, batched = await run_backlog(parser, corpus)
+            print("---------------------------------------------------")
+            print(f"Backlog of {count} messages: serial {serial * 1000:.0f}ms | batched {batched * 1000:.0f}ms "
+                  f"({serial / max(batched, 1e-9):.1f}x) | batch accuracy {correct}/{count} | "
+                  f"LLM calls {stub.stats['requests'] - requests_before}")
+        print("---------------------------------------------------")
+        for kind, t in sorted(parser.token_stats.items()):
+            print(f"Tokens {kind:<10} {t['requests']:>5} req | avg in {t['prompt_tokens'] / t['requests']:6.0f} | avg out {t['output_tokens'] / t['requests']:5.0f}")
+    finally:
+        await stub.stop()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Offline parser accuracy & latency benchmark")
+    ap.add_argument("--corpus", default="corpus/channel_corpus.jsonl")
+    ap.add_argument("--concurrency", default="1,4,8")
+    ap.add_argument("--latency-ms", type=float, default=800)
+    ap.add_argument("--jitter-ms", type=float, default=400)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--llm-only", action="store_true", help="Disable the local fast path")
+    ap.add_argument("--batch", action="store_true", help="Also time the batched backlog catch-up path")
+    ap.add_argument("--raw-context", action="store_true", help="Send the full replied-to text instead of a compact summary")
+    asyncio.run(main(ap.parse_args()))
@@ -0,0 +1,73 @@
+"""
+Prefilter benchmark over a recorded channel corpus.
+
+Reports throughput of the compiled prefilter (vs. the previous per-call regex version)
+and its false-negative / false-positive rate against the `should_parse` labels.
+
+Usage: python bench_prefilter.py [--corpus corpus/channel_corpus.jsonl] [--iterations 2000]
+"""
+import argparse
+import json
+import re
+import time
+from prefilter import prefilter_message
+
+def legacy_should_parse(text, reply_context=""):
+    """The pre-compiled-engine implementation, kept here as the throughput baseline."""
+    combined_text = (text + " " + reply_context).upper()
+    clean_text = re.sub(r'\bAS\s+LONG\s+AS\b', '', combined_text)
+    keywords = [
+        r'\bLONG\b', r'\bSHORT\b', r'\bBUY\b', r'\bSELL\b',
+        r'\bSL\d*\b', r'\bTP\d*\b', r'\bTARGET\d*\b', r'\bSTOP\b', r'\bINVALIDATION\b',
+        r'\bCLOSE\b', r'\bCANCEL\b', r'\bBOOKED\b', r'\bHIT\b', r'\bMOVE\b',
+        r'\bEXIT\b', r'\bDELETE\b', r'\bBREAKEVEN\b', r'\bBE\b',
+        r'❌', r'🎯'
+    ]
+    return any(re.search(pattern, clean_text) for pattern in keywords)
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def measure(fn, corpus, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for row in corpus:
+            fn(row["text"], row.get("reply_context", ""))
+    elapsed = time.perf_counter() - start
+    total = iterations * len(corpus)
+    return total / elapsed, elapsed / total * 1e6
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the message prefilter")
+    ap.add_argument("--corpus", default="corpus/channel_corpus.jsonl")
+    ap.add_argument("--iterations", type=int, default=2000)
+    args = ap.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    positives = [r for r in corpus if r["should_parse"]]
+    negatives = [r for r in corpus if not r["should_parse"]]
+
+    false_neg = [r for r in positives if not prefilter_message(r["text"], r.get("reply_context", "")).matched]
+    false_pos = [r for r in negatives if prefilter_message(r["text"], r.get("reply_context", "")).matched]
+    disagree = [r for r in corpus if prefilter_message(r["text"], r.get("reply_context", "")).matched != legacy_should_parse(r["text"], r.get("reply_context", ""))]
+
+    new_rate, new_us = measure(lambda t, c: prefilter_message(t, c).matched, corpus, args.iterations)
+    old_rate, old_us = measure(legacy_should_parse, corpus, args.iterations)
+
+    print(f"Corpus: {args.corpus} ({len(corpus)} messages, {len(positives)} actionable)")
+    print("---------------------------------------------------")
+    print(f"Compiled prefilter: {new_rate:,.0f} msg/s ({new_us:.2f} µs/msg)")
+    print(f"Legacy prefilter:   {old_rate:,.0f} msg/s ({old_us:.2f} µs/msg)")
+    print(f"Speedup:            {new_rate / old_rate:.1f}x")
+    print("---------------------------------------------------")
+    print(f"False negatives: {len(false_neg)}/{len(positives)} ({len(false_neg) / max(len(positives), 1):.1%})")
+    for r in false_neg:
+        print(f"   ❌ MISSED: {r['text'][:60]!r}")
+    print(f"False positives: {len(false_pos)}/{len(negatives)} ({len(false_pos) / max(len(negatives), 1):.1%})")
+    for r in false_pos:
+        print(f"   ⚠️  SENT:   {r['text'][:60]!r} (reply: {r.get('reply_context', '')[:30]!r})")
+    print(f"Disagreements with legacy: {len(disagree)}")
+
+if __name__ == "__main__":
+    main()
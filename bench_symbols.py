@@ -0,0 +1,96 @@
+"""
+Symbol resolution benchmark over the bundled Bitget contracts snapshot.
+
+Resolves every contract under several channel spellings (BTC, #btc, $BTCUSDT, BONK for
+1000BONKUSDT, nicknames, truncated names) with the registry alias/trie index and with the
+previous per-call scan, and reports index build time, lookup cost and every disagreement.
+
+Usage: python bench_symbols.py [--snapshot usdt-futures-bitget] [--iterations 20]
+"""
+import argparse
+import json
+import time
+from symbol_registry import SymbolRegistry, markets_from_contracts, RE_MULTIPLIER, COIN_NICKNAMES
+
+def clean_base(input_symbol):
+    """Same input cleanup validate_symbol applies before resolving."""
+    input_clean = input_symbol.upper().replace("$", "").replace("#", "").strip()
+    for quote in ("USDT", "USD"):
+        if input_clean.endswith(quote) and len(input_clean) > len(quote):
+            return input_clean[:-len(quote)]
+    return input_clean
+
+def legacy_resolve(markets, base):
+    """The pre-registry validate_symbol body, kept here as the baseline."""
+    futures_markets = [m for m in markets.values() if m.get('swap') and m.get('linear') and m.get('quote') == 'USDT']
+    futures_map = {m['id']: m for m in futures_markets}
+    for sym in (f"{base}USDT", f"1000{base}USDT", f"k{base}USDT"):
+        if sym in futures_map:
+            return sym
+        ccxt_target = f"{sym.replace('USDT', '')}/USDT:USDT"
+        if ccxt_target in markets:
+            return markets[ccxt_target]['id']
+    for mid in futures_map:
+        if base in mid and ("USDT" in mid or "USD" in mid):
+            return mid
+    return None
+
+def build_inputs(contracts):
+    inputs = []
+    for c in contracts:
+        base = c['symbol'][:-4]
+        plain = RE_MULTIPLIER.sub("", base)
+        inputs += [(base, c['symbol']), (f"#{base.lower()}", c['symbol']), (f"${c['symbol']}", c['symbol'])]
+        if plain != base:
+            inputs.append((plain, None))  # Expected: the multiplier contract unless `plain` is listed itself
+        if len(plain) >= 6:
+            inputs.append((plain[:-1], None))  # Truncated name: unique completion or nothing
+    inputs += [(nick, None) for nick in COIN_NICKNAMES]
+    return inputs
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark symbol resolution (validate_symbol)")
+    ap.add_argument("--snapshot", default="usdt-futures-bitget")
+    ap.add_argument("--iterations", type=int, default=20)
+    args = ap.parse_args()
+
+    with open(args.snapshot, encoding="utf-8") as f:
+        contracts = json.load(f)["data"]
+    markets = markets_from_contracts(contracts)
+
+    registry = SymbolRegistry()
+    start = time.perf_counter()
+    registry.load(markets)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    inputs = build_inputs(contracts)
+    bases = [clean_base(raw) for raw, _ in inputs]
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        new = [registry.resolve(b)[0] for b in bases]
+    new_us = (time.perf_counter() - start) / (args.iterations * len(bases)) * 1e6
+
+    start = time.perf_counter()
+    legacy = [legacy_resolve(markets, b) for b in bases]
+    old_us = (time.perf_counter() - start) / len(bases) * 1e6
+
+    wrong = [(raw, expected, got) for (raw, expected), got in zip(inputs, new) if expected and got != expected]
+    disagree = [(raw, old, got) for (raw, _), old, got in zip(inputs, legacy, new) if old != got]
+
+    print(f"Snapshot: {args.snapshot} ({len(contracts)} contracts, {len(registry.aliases)} aliases)")
+    print("---------------------------------------------------")
+    print(f"Index build:      {build_ms:.1f} ms (once per markets load)")
+    print(f"Registry resolve: {new_us:.2f} µs/lookup")
+    print(f"Legacy scan:      {old_us:.2f} µs/lookup")
+    print(f"Speedup:          {old_us / new_us:.0f}x")
+    print("---------------------------------------------------")
+    print(f"Inputs: {len(inputs)} | Wrong exact/tag resolutions: {len(wrong)}")
+    for raw, expected, got in wrong[:10]:
+        print(f"   ❌ {raw!r}: expected {expected}, got {got}")
+    print(f"Disagreements with legacy: {len(disagree)}")
+    for raw, old, got in disagree[:25]:
+        print(f"   {raw!r}: legacy {old} -> registry {got}")
+
+if __name__ == "__main__":
+    main()
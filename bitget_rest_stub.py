@@ -0,0 +1,503 @@
+"""
+Local stand-in for the Bitget V2 REST API (mix endpoints the bot uses, no network needed).
+
+Serves contracts (from the bundled snapshot), tickers, account / positions, place-order,
+cancel-order(s), pending orders, TP/SL plan orders (place-tpsl-order, orders-plan-pending,
+cancel-plan-order), fills and position history. State is scriptable: set_price() moves the
+book (fills crossing limit orders, triggers TP/SL plans), set_position() / set_account() seed it.
+Latency, jitter, Bitget error codes (inject_error: 40774 / 40789 / 22001 ...) and per-endpoint
+429 rate limits are configurable. With --with-ws the WebSocket stand-in runs on the same port
+and receives orders / positions / orders-algo pushes. Point the bot at it with
+BITGET_REST_URL=http://127.0.0.1:<port>
+
+Usage: python bitget_rest_stub.py [--port 8767] [--latency-ms 30] [--jitter-ms 20] [--no-rate-limit] [--with-ws]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+from collections import defaultdict, deque
+from aiohttp import web
+from contract_snapshot import load_snapshot
+from rate_limiter import ENDPOINT_LIMITS, DEFAULT_LIMIT, endpoint_key
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_TYPE = "USDT-FUTURES"
+
+# Bitget error replies the stand-in produces on its own (inject_error() can send any code)
+ERRORS = {
+    "40774": "The order type for unilateral position must also be the unilateral position type.",
+    "40789": "The position mode or margin mode is already set",
+    "22001": "No order to cancel",
+    "40034": "Parameter does not exist",
+    "429": "Too Many Requests",
+}
+
+class StubError(Exception):
+    def __init__(self, code, msg=None, status=400):
+        super().__init__(code)
+        self.code = str(code)
+        self.msg = msg or ERRORS.get(self.code, "Request error")
+        self.status = status
+
+def _ms():
+    return str(int(time.time() * 1000))
+
+class BitgetRestStub:
+    def __init__(self, snapshot="usdt-futures-bitget", prices=None, latency_ms=0, jitter_ms=0, rate_limit=True,
+                 balance=10000.0, pos_mode="hedge_mode", already_set_errors=True, ws=None, seed=None):
+        contracts, _, _ = load_snapshot(snapshot) if snapshot else (None, None, None)
+        self.contracts = {c["symbol"]: c for c in (contracts or [])}
+        self.prices = {"BTCUSDT": 95000.0, "ETHUSDT": 3000.0, "SOLUSDT": 150.0, "XRPUSDT": 2.4, **(prices or {})}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.latency_by_path = {}  # 'v2/mix/order/place-order' -> ms (overrides latency_ms)
+        self.rate_limit = rate_limit
+        self.already_set_errors = already_set_errors  # Reply 40789 when a mode is set to its current value
+        self.random = random.Random(seed)
+        self.ws = ws  # Optional BitgetWSStub receiving private pushes
+
+        self.balance = balance
+        self.pos_mode = pos_mode
+        self.margin_modes = defaultdict(lambda: "crossed")  # symbol -> 'isolated' / 'crossed'
+        self.leverage = defaultdict(lambda: 20)
+        self.positions = {}  # (symbol, holdSide) -> position record
+        self.orders = {}     # orderId -> pending limit order
+        self.plans = {}      # orderId -> pending TP/SL plan
+        self.fills = []
+        self.history = []    # Closed positions (history-position)
+        self._ids = itertools.count(int(time.time()) * 1000)
+        self._errors = defaultdict(deque)  # endpoint -> queued StubErrors (inject_error)
+        self._calls = defaultdict(deque)   # endpoint -> request timestamps in the last second
+        self.stats = defaultdict(int)      # endpoint -> requests, plus 'errors' / 'rate_limited'
+        self._runner = None
+        self.port = None
+
+        self.routes = {
+            "v2/public/time": self.public_time,
+            "v2/spot/public/symbols": lambda p: [],  # CCXT load_markets also lists spot / margin
+            "v2/margin/currencies": lambda p: [],
+            "v3/account/settings": self.uta_settings,
+            "v2/mix/market/contracts": self.market_contracts,
+            "v2/mix/market/ticker": self.market_ticker,
+            "v2/mix/market/tickers": self.market_tickers,
+            "v2/mix/account/account": self.account_account,
+            "v2/mix/account/accounts": self.account_accounts,
+            "v2/mix/account/set-leverage": self.set_leverage,
+            "v2/mix/account/set-margin-mode": self.set_margin_mode,
+            "v2/mix/account/set-position-mode": self.set_position_mode,
+            "v2/mix/position/all-position": self.all_positions,
+            "v2/mix/position/history-position": self.history_position,
+            "v2/mix/order/place-order": self.place_order,
+            "v2/mix/order/cancel-order": self.cancel_order,
+            "v2/mix/order/batch-cancel-orders": self.cancel_orders,
+            "v2/mix/order/cancel-all-orders": self.cancel_orders,
+            "v2/mix/order/orders-pending": self.orders_pending,
+            "v2/mix/order/detail": self.order_detail,
+            "v2/mix/order/fills": self.fill_history,
+            "v2/mix/order/fill-history": self.fill_history,
+            "v2/mix/order/place-tpsl-order": self.place_tpsl_order,
+            "v2/mix/order/orders-plan-pending": self.orders_plan_pending,
+            "v2/mix/order/cancel-plan-order": self.cancel_plan_order,
+        }
+
+    # --- Scripting -----------------------------------------------------------------
+
+    def set_price(self, symbol, price):
+        """Moves the last price; fills crossing limit orders and triggers crossed TP/SL plans."""
+        self.prices[symbol] = float(price)
+        for order in [o for o in self.orders.values() if o["symbol"] == symbol]:
+            limit = float(order["price"])
+            if (order["side"] == "buy" and price <= limit) or (order["side"] == "sell" and price >= limit):
+                del self.orders[order["orderId"]]
+                self._fill(order, limit)
+        for plan in [p for p in self.plans.values() if p["symbol"] == symbol]:
+            trigger = float(plan["triggerPrice"])
+            long = plan["posSide"] == "long"
+            is_tp = plan["planType"] in ("profit_plan", "pos_profit")
+            hit = (price >= trigger) if is_tp == long else (price <= trigger)
+            if hit:
+                del self.plans[plan["orderId"]]
+                self._push("orders-algo", [dict(plan, status="executed")])
+                self._close(symbol, plan["posSide"], float(plan["size"]), price)
+
+    def set_position(self, symbol, hold_side, size, entry_price=None, margin_mode="isolated", leverage=None):
+        key = (symbol, hold_side)
+        if size <= 0:
+            self.positions.pop(key, None)
+            return
+        self.positions[key] = {"size": float(size), "openPriceAvg": float(entry_price or self.prices.get(symbol, 100.0)),
+                               "marginMode": margin_mode, "leverage": leverage or self.leverage[symbol], "cTime": _ms()}
+
+    def set_account(self, pos_mode=None, balance=None, margin_mode=None, leverage=None, symbol=None):
+        if pos_mode:
+            self.pos_mode = pos_mode
+        if balance is not None:
+            self.balance = balance
+        if symbol and margin_mode:
+            self.margin_modes[symbol] = margin_mode
+        if symbol and leverage:
+            self.leverage[symbol] = leverage
+
+    def inject_error(self, path, code, msg=None, times=1, status=400):
+        """The next `times` calls to `path` fail with Bitget error `code` (HTTP `status`)."""
+        for _ in range(times):
+            self._errors[endpoint_key(path)].append(StubError(code, msg, status))
+
+    def set_latency(self, path, ms):
+        self.latency_by_path[endpoint_key(path)] = ms
+
+    # --- Engine --------------------------------------------------------------------
+
+    def _next_id(self):
+        return str(next(self._ids))
+
+    def _push(self, channel, data):
+        if self.ws and self.ws.private_clients:
+            asyncio.get_running_loop().create_task(self.ws.push_private(channel, data))
+
+    def _position_record(self, symbol, hold_side, pos):
+        price = self.prices.get(symbol, pos["openPriceAvg"])
+        direction = 1 if hold_side == "long" else -1
+        upl = (price - pos["openPriceAvg"]) * pos["size"] * direction
+        margin = pos["openPriceAvg"] * pos["size"] / float(pos["leverage"])
+        return {
+            "marginCoin": "USDT", "symbol": symbol, "holdSide": hold_side, "openDelegateSize": "0",
+            "marginSize": f"{margin:.8f}", "available": str(pos["size"]), "locked": "0", "total": str(pos["size"]),
+            "leverage": str(pos["leverage"]), "achievedProfits": "0", "openPriceAvg": str(pos["openPriceAvg"]),
+            "marginMode": pos["marginMode"], "posMode": self.pos_mode, "unrealizedPL": f"{upl:.8f}",
+            "liquidationPrice": "0", "keepMarginRate": "0.004", "markPrice": str(price), "breakEvenPrice": str(pos["openPriceAvg"]),
+            "totalFee": "0", "deductedFee": "0", "marginRatio": "0.01", "cTime": pos["cTime"], "uTime": _ms(),
+        }
+
+    def _order_record(self, order, status="live", fill_price=None):
+        filled = order["size"] if status == "filled" else "0"
+        return dict(order, status=status, baseVolume=filled, priceAvg=str(fill_price or ""),
+                    fee="0", totalProfits="0", quoteVolume=str(float(filled) * float(fill_price or 0)), uTime=_ms())
+
+    def _fill(self, order, price):
+        symbol, size = order["symbol"], float(order["size"])
+        if order["tradeSide"] == "close":
+            # Hedge close: side names the position (buy = long); one-way reduceOnly: side is the order direction
+            hold = ("long" if order["side"] == "buy" else "short") if self.pos_mode == "hedge_mode" else \
+                   ("short" if order["side"] == "buy" else "long")
+            self._close(symbol, hold, size, price)
+        else:
+            hold = "long" if order["side"] == "buy" else "short"
+            current = self.positions.get((symbol, hold))
+            if current:
+                total = current["size"] + size
+                current["openPriceAvg"] = (current["openPriceAvg"] * current["size"] + price * size) / total
+                current["size"] = total
+            else:
+                self.set_position(symbol, hold, size, price, self.margin_modes[symbol], self.leverage[symbol])
+            for plan_type, trigger in (("pos_loss", order.get("presetStopLossPrice")), ("pos_profit", order.get("presetStopSurplusPrice"))):
+                if trigger:
+                    self._add_plan(symbol, plan_type, trigger, hold, size)
+        self.fills.append({"tradeId": self._next_id(), "orderId": order["orderId"], "symbol": symbol, "side": order["side"],
+                           "orderType": order["orderType"], "price": str(price), "baseVolume": order["size"],
+                           "quoteVolume": str(price * size), "profit": "0", "tradeSide": order["tradeSide"], "posMode": self.pos_mode,
+                           "tradeScope": "taker", "feeDetail": [{"feeCoin": "USDT", "totalFee": f"{-price * size * 0.0006:.8f}"}], "cTime": _ms()})
+        self._push("orders", [dict(self._order_record(order, "filled", price), instId=symbol)])
+        self._push("positions", [self._position_record(s, h, p) for (s, h), p in self.positions.items() if s == symbol])
+
+    def _close(self, symbol, hold_side, size, price):
+        pos = self.positions.get((symbol, hold_side))
+        if not pos:
+            return
+        closed = min(size, pos["size"])
+        direction = 1 if hold_side == "long" else -1
+        pnl = (price - pos["openPriceAvg"]) * closed * direction
+        self.balance += pnl
+        pos["size"] -= closed
+        if pos["size"] <= 0:
+            del self.positions[(symbol, hold_side)]
+            for plan_id in [i for i, p in self.plans.items() if p["symbol"] == symbol and p["posSide"] == hold_side]:
+                del self.plans[plan_id]
+        self.history.insert(0, {"positionId": self._next_id(), "marginCoin": "USDT", "symbol": symbol, "holdSide": hold_side,
+                                "openAvgPrice": str(pos["openPriceAvg"]), "closeAvgPrice": str(price), "marginMode": pos["marginMode"],
+                                "openTotalPos": str(closed), "closeTotalPos": str(closed), "pnl": f"{pnl:.8f}", "netProfit": f"{pnl:.8f}",
+                                "totalFunding": "0", "openFee": "0", "closeFee": "0", "cTime": pos["cTime"], "uTime": _ms()})
+
+    def _add_plan(self, symbol, plan_type, trigger, hold_side, size):
+        plan = {"orderId": self._next_id(), "clientOid": self._next_id(), "symbol": symbol, "marginCoin": "USDT",
+                "size": str(size), "executePrice": "0", "triggerPrice": str(trigger), "status": "live", "orderType": "market",
+                "planType": plan_type, "side": "sell" if hold_side == "long" else "buy", "triggerType": "mark_price",
+                "posSide": hold_side, "tradeSide": "close", "marginMode": self.margin_modes[symbol], "posMode": self.pos_mode,
+                "cTime": _ms(), "uTime": _ms()}
+        self.plans[plan["orderId"]] = plan
+        self._push("orders-algo", [plan])
+        return plan
+
+    def _page(self, records, params, list_key):
+        """idLessThan / limit pagination over records sorted newest (highest id) first."""
+        limit = int(params.get("limit") or 100)
+        before = params.get("idLessThan")
+        ordered = sorted(records, key=lambda r: int(r.get("orderId") or r.get("positionId") or r.get("tradeId")), reverse=True)
+        if before:
+            ordered = [r for r in ordered if int(r.get("orderId") or r.get("positionId") or r.get("tradeId")) < int(before)]
+        page = ordered[:limit]
+        end_id = (page[-1].get("orderId") or page[-1].get("positionId") or page[-1].get("tradeId")) if page else None
+        return {list_key: page, "endId": end_id}
+
+    # --- Endpoints (params -> data, or raise StubError) ----------------------------
+
+    def uta_settings(self, params):
+        # CCXT probes this to detect a unified trading account; the stand-in is a classic account
+        raise StubError("40084", "The account is not a unified trading account")
+
+    def public_time(self, params):
+        return {"serverTime": _ms()}
+
+    def market_contracts(self, params):
+        if params.get("productType", PRODUCT_TYPE).upper() != PRODUCT_TYPE:
+            return []
+        if params.get("symbol"):
+            return [self.contracts[params["symbol"]]] if params["symbol"] in self.contracts else []
+        return list(self.contracts.values())
+
+    def _ticker(self, symbol):
+        price = self.prices.setdefault(symbol, 100.0)
+        return {"symbol": symbol, "lastPr": str(price), "askPr": str(price * 1.0001), "bidPr": str(price * 0.9999),
+                "bidSz": "10", "askSz": "10", "high24h": str(price * 1.02), "low24h": str(price * 0.98), "ts": _ms(),
+                "change24h": "0", "baseVolume": "1000", "quoteVolume": str(price * 1000), "usdtVolume": str(price * 1000),
+                "openUtc": str(price), "changeUtc24h": "0", "indexPrice": str(price), "fundingRate": "0.0001",
+                "holdingAmount": "0", "open24h": str(price), "markPrice": str(price)}
+
+    def market_ticker(self, params):
+        symbol = params.get("symbol", "")
+        if self.contracts and symbol not in self.contracts:
+            raise StubError("40034", f"Parameter {symbol} does not exist")
+        return [self._ticker(symbol)]
+
+    def market_tickers(self, params):
+        return [self._ticker(s) for s in self.prices]
+
+    def _equity(self):
+        return self.balance + sum(float(self._position_record(s, h, p)["unrealizedPL"]) for (s, h), p in self.positions.items())
+
+    def account_accounts(self, params):
+        used = sum(p["openPriceAvg"] * p["size"] / float(p["leverage"]) for p in self.positions.values())
+        equity = self._equity()
+        return [{"marginCoin": "USDT", "locked": "0", "available": f"{self.balance - used:.8f}", "crossedMaxAvailable": f"{self.balance - used:.8f}",
+                 "isolatedMaxAvailable": f"{self.balance - used:.8f}", "maxTransferOut": f"{self.balance - used:.8f}",
+                 "accountEquity": f"{equity:.8f}", "usdtEquity": f"{equity:.8f}", "btcEquity": "0", "crossedRiskRate": "0",
+                 "unrealizedPL": f"{equity - self.balance:.8f}", "coupon": "0", "crossedUnrealizedPL": "0", "isolatedUnrealizedPL": "0"}]
+
+    def account_account(self, params):
+        symbol = params.get("symbol", "")
+        return dict(self.account_accounts(params)[0], symbol=symbol, marginMode=self.margin_modes[symbol], posMode=self.pos_mode,
+                    crossedMarginLeverage=self.leverage[symbol], isolatedLongLever=self.leverage[symbol], isolatedShortLever=self.leverage[symbol])
+
+    def set_leverage(self, params):
+        symbol = params.get("symbol", "")
+        self.leverage[symbol] = int(float(params.get("leverage") or params.get("longLeverage") or 20))
+        return {"symbol": symbol, "marginCoin": "USDT", "longLeverage": str(self.leverage[symbol]), "shortLeverage": str(self.leverage[symbol]),
+                "crossMarginLeverage": str(self.leverage[symbol]), "marginMode": self.margin_modes[symbol]}
+
+    def set_margin_mode(self, params):
+        symbol, mode = params.get("symbol", ""), params.get("marginMode", "isolated")
+        if self.already_set_errors and self.margin_modes[symbol] == mode:
+            raise StubError("40789")
+        self.margin_modes[symbol] = mode
+        return {"symbol": symbol, "marginCoin": "USDT", "longLeverage": str(self.leverage[symbol]),
+                "shortLeverage": str(self.leverage[symbol]), "marginMode": mode}
+
+    def set_position_mode(self, params):
+        mode = params.get("posMode", "hedge_mode")
+        if self.already_set_errors and self.pos_mode == mode:
+            raise StubError("40789")
+        self.pos_mode = mode
+        return {"posMode": mode}
+
+    def all_positions(self, params):
+        return [self._position_record(s, h, p) for (s, h), p in self.positions.items()]
+
+    def history_position(self, params):
+        records = [h for h in self.history if not params.get("symbol") or h["symbol"] == params["symbol"]]
+        return self._page(records, params, "list")
+
+    def place_order(self, params):
+        symbol = params.get("symbol", "")
+        if symbol not in self.prices and symbol not in self.contracts:
+            raise StubError("40034", f"Parameter {symbol} does not exist")
+        trade_side = params.get("tradeSide")
+        # Hedge mode needs tradeSide open/close, one-way mode must not send it
+        if (self.pos_mode == "hedge_mode") != bool(trade_side):
+            raise StubError("40774")
+        if self.pos_mode == "one_way_mode":
+            trade_side = "close" if str(params.get("reduceOnly", "NO")).upper() == "YES" else "open"
+        order = {"orderId": self._next_id(), "clientOid": params.get("clientOid") or self._next_id(), "symbol": symbol,
+                 "size": str(params.get("size")), "price": str(params.get("price") or ""), "side": params.get("side"),
+                 "force": params.get("force", "gtc"), "posSide": "long" if params.get("side") == "buy" else "short",
+                 "marginCoin": "USDT", "marginMode": params.get("marginMode", self.margin_modes[symbol]), "orderType": params.get("orderType", "market"),
+                 "leverage": str(self.leverage[symbol]), "reduceOnly": params.get("reduceOnly", "NO"), "tradeSide": trade_side,
+                 "posMode": self.pos_mode, "orderSource": "normal", "enterPointSource": "API", "cTime": _ms(),
+                 "presetStopLossPrice": params.get("presetStopLossPrice", ""), "presetStopSurplusPrice": params.get("presetStopSurplusPrice", "")}
+        if trade_side == "close":
+            hold = order["posSide"] if self.pos_mode == "hedge_mode" else ("short" if order["side"] == "buy" else "long")
+            if (symbol, hold) not in self.positions:
+                raise StubError("22002", "No position to close")
+        if order["orderType"] == "limit":
+            self.orders[order["orderId"]] = order
+            self._push("orders", [dict(self._order_record(order), instId=symbol)])
+        else:
+            self._fill(order, self.prices.get(symbol, 100.0))
+        return {"orderId": order["orderId"], "clientOid": order["clientOid"]}
+
+    def cancel_order(self, params):
+        order = self.orders.pop(str(params.get("orderId")), None)
+        if not order:
+            raise StubError("22001")
+        self._push("orders", [dict(self._order_record(order, "canceled"), instId=order["symbol"])])
+        return {"orderId": order["orderId"], "clientOid": order["clientOid"]}
+
+    def cancel_orders(self, params):
+        """batch-cancel-orders (orderIdList) and cancel-all-orders (every pending order, optionally per symbol)."""
+        if params.get("orderIdList"):
+            ids = [str(o.get("orderId")) for o in params["orderIdList"]]
+        else:
+            ids = [i for i, o in self.orders.items() if not params.get("symbol") or o["symbol"] == params["symbol"]]
+        success, failure = [], []
+        for order_id in ids:
+            order = self.orders.pop(order_id, None)
+            if order:
+                success.append({"orderId": order_id, "clientOid": order["clientOid"]})
+            else:
+                failure.append({"orderId": order_id, "clientOid": "", "errorMsg": ERRORS["22001"], "errorCode": "22001"})
+        return {"successList": success, "failureList": failure}
+
+    def orders_pending(self, params):
+        records = [self._order_record(o) for o in self.orders.values() if not params.get("symbol") or o["symbol"] == params["symbol"]]
+        return self._page(records, params, "entrustedList")
+
+    def order_detail(self, params):
+        order = self.orders.get(str(params.get("orderId")))
+        if not order:
+            raise StubError("40109", "The data of the order cannot be found")
+        return self._order_record(order)
+
+    def fill_history(self, params):
+        records = [f for f in self.fills if not params.get("symbol") or f["symbol"] == params["symbol"]]
+        return self._page(records, params, "fillList")
+
+    def place_tpsl_order(self, params):
+        symbol, hold = params.get("symbol", ""), params.get("holdSide", "long")
+        pos = self.positions.get((symbol, hold))
+        if not pos:
+            raise StubError("40768", "Position does not exist")
+        plan = self._add_plan(symbol, params.get("planType", "loss_plan"), params.get("triggerPrice"), hold, float(params.get("size") or pos["size"]))
+        return {"orderId": plan["orderId"], "clientOid": plan["clientOid"]}
+
+    def orders_plan_pending(self, params):
+        plan_type = params.get("planType")
+        records = [p for p in self.plans.values()
+                   if (not params.get("symbol") or p["symbol"] == params["symbol"])
+                   and (plan_type != "profit_loss" or p["planType"] in ("profit_plan", "loss_plan", "pos_profit", "pos_loss"))]
+        return self._page(records, params, "entrustedList")
+
+    def cancel_plan_order(self, params):
+        if params.get("orderIdList"):
+            ids = [str(o.get("orderId")) for o in params["orderIdList"]]
+        else:
+            ids = [i for i, p in self.plans.items() if p["symbol"] == params.get("symbol") and (not params.get("planType") or p["planType"] == params["planType"])]
+        success, failure = [], []
+        for order_id in ids:
+            plan = self.plans.pop(order_id, None)
+            if plan:
+                success.append({"orderId": order_id, "clientOid": plan["clientOid"]})
+                self._push("orders-algo", [dict(plan, status="cancelled")])
+            else:
+                failure.append({"orderId": order_id, "clientOid": "", "errorMsg": ERRORS["22001"], "errorCode": "22001"})
+        return {"successList": success, "failureList": failure}
+
+    # --- HTTP ----------------------------------------------------------------------
+
+    def _rate_limited(self, endpoint):
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        calls = self._calls[endpoint]
+        while calls and calls[0] <= now - 1:
+            calls.popleft()
+        if len(calls) >= ENDPOINT_LIMITS.get(endpoint, DEFAULT_LIMIT):
+            return True
+        calls.append(now)
+        return False
+
+    async def handle(self, request):
+        endpoint = endpoint_key(request.match_info["path"])
+        self.stats[endpoint] += 1
+        self.stats["requests"] += 1
+        latency = self.latency_by_path.get(endpoint, self.latency_ms)
+        if latency or self.jitter_ms:
+            await asyncio.sleep(max(0.0, latency + self.random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+
+        params = dict(request.query)
+        if request.method == "POST" and request.can_read_body:
+            params.update(json.loads(await request.text() or "{}"))
+        try:
+            if self._rate_limited(endpoint):
+                self.stats["rate_limited"] += 1
+                raise StubError("429", status=429)
+            if self._errors[endpoint]:
+                raise self._errors[endpoint].popleft()
+            route = self.routes.get(endpoint)
+            if route is None:
+                raise StubError("40404", f"Request URL NOT FOUND: {endpoint}", status=404)
+            data = route(params)
+        except StubError as e:
+            self.stats["errors"] += 1
+            return web.json_response({"code": e.code, "msg": e.msg, "requestTime": int(_ms()), "data": None}, status=e.status)
+        return web.json_response({"code": "00000", "msg": "success", "requestTime": int(_ms()), "data": data})
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application()
+        app.router.add_route("*", "/api/{path:.*}", self.handle)
+        if self.ws:
+            app.router.add_get("/v2/ws/public", self.ws.handle_ws)
+            app.router.add_get("/v2/ws/private", self.ws.handle_private_ws)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Bitget REST stub listening on http://{host}:{self.port}")
+        return f"http://{host}:{self.port}"
+
+    async def stop(self):
+        if self.ws:
+            await self.ws.disconnect_all()
+        if self._runner:
+            await self._runner.cleanup()
+
+async def _serve(args):
+    ws = None
+    if args.with_ws:
+        from bitget_ws_stub import BitgetWSStub
+        ws = BitgetWSStub()
+    stub = BitgetRestStub(snapshot=args.snapshot, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                          rate_limit=not args.no_rate_limit, balance=args.balance, ws=ws)
+    url = await stub.start(port=args.port)
+    hint = f" BITGET_WS_PUBLIC_URL={url.replace('http', 'ws')}/v2/ws/public BITGET_WS_PRIVATE_URL={url.replace('http', 'ws')}/v2/ws/private" if ws else ""
+    print(f"Bitget REST stub ready: BITGET_REST_URL={url}{hint}")
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local Bitget V2 REST (mix) stand-in")
+    ap.add_argument("--port", type=int, default=8767)
+    ap.add_argument("--snapshot", default="usdt-futures-bitget")
+    ap.add_argument("--latency-ms", type=float, default=30)
+    ap.add_argument("--jitter-ms", type=float, default=20)
+    ap.add_argument("--balance", type=float, default=10000.0)
+    ap.add_argument("--no-rate-limit", action="store_true")
+    ap.add_argument("--with-ws", action="store_true")
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(ap.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,165 @@
+"""
+Local stand-in for the Bitget V2 public and private WebSockets (no network needed).
+
+Public: accepts `subscribe` / `unsubscribe` ops for the USDT-FUTURES `ticker` channel, answers
+"ping" with "pong" and pushes random-walk tickers for every subscribed symbol.
+Private: accepts any `login`, acks subscriptions and relays events injected with push_private()
+(orders, positions, orders-algo, account). Point the bot at it with
+BITGET_WS_PUBLIC_URL=ws://127.0.0.1:<port>/v2/ws/public
+BITGET_WS_PRIVATE_URL=ws://127.0.0.1:<port>/v2/ws/private
+
+Usage: python bitget_ws_stub.py [--port 8766] [--interval-ms 200]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from aiohttp import web, WSMsgType
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRICES = {"BTCUSDT": 95000.0, "ETHUSDT": 3000.0, "SOLUSDT": 150.0, "XRPUSDT": 2.4, "BNBUSDT": 610.0,
+                  "DOGEUSDT": 0.12, "ADAUSDT": 0.7, "AVAXUSDT": 24.0, "XAUUSDT": 2650.0, "XAGUSDT": 31.0}
+
+class BitgetWSStub:
+    def __init__(self, prices=None, interval_ms=200, seed=None):
+        self.prices = dict(DEFAULT_PRICES, **(prices or {}))
+        self.open_prices = dict(self.prices)
+        self.interval_ms = interval_ms
+        self.random = random.Random(seed)
+        self.clients = set()
+        self.private_clients = {}  # ws -> subscribed channel names
+        self.stats = {"connections": 0, "subscribes": 0, "pushes": 0, "pings": 0, "logins": 0, "private_pushes": 0}
+        self._runner = None
+        self.port = None
+
+    def _ticker(self, inst_id):
+        price = self.prices.setdefault(inst_id, 100.0)
+        price *= 1 + self.random.uniform(-0.0005, 0.0005)
+        self.prices[inst_id] = price
+        change = price / self.open_prices.setdefault(inst_id, price) - 1
+        return {"instId": inst_id, "lastPr": f"{price:.8g}", "markPrice": f"{price * 1.0001:.8g}",
+                "change24h": f"{change:.6f}", "changeUtc24h": f"{change:.6f}", "ts": str(int(time.time() * 1000))}
+
+    async def _push(self, ws, inst_id):
+        arg = {"instType": "USDT-FUTURES", "channel": "ticker", "instId": inst_id}
+        await ws.send_str(json.dumps({"action": "snapshot", "arg": arg, "data": [self._ticker(inst_id)], "ts": int(time.time() * 1000)}))
+        self.stats["pushes"] += 1
+
+    async def _pusher(self, ws, subs):
+        while not ws.closed:
+            for inst_id in list(subs):
+                await self._push(ws, inst_id)
+            await asyncio.sleep(self.interval_ms / 1000)
+
+    async def handle_ws(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.clients.add(ws)
+        self.stats["connections"] += 1
+        subs = set()
+        pusher = asyncio.create_task(self._pusher(ws, subs))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                if msg.data == "ping":
+                    self.stats["pings"] += 1
+                    await ws.send_str("pong")
+                    continue
+                payload = json.loads(msg.data)
+                for arg in payload.get("args", []):
+                    if payload.get("op") == "subscribe":
+                        subs.add(arg["instId"])
+                        self.stats["subscribes"] += 1
+                        await ws.send_str(json.dumps({"event": "subscribe", "arg": arg}))
+                        await self._push(ws, arg["instId"])  # Bitget sends a snapshot right away
+                    elif payload.get("op") == "unsubscribe":
+                        subs.discard(arg["instId"])
+                        await ws.send_str(json.dumps({"event": "unsubscribe", "arg": arg}))
+        finally:
+            pusher.cancel()
+            self.clients.discard(ws)
+        return ws
+
+    async def handle_private_ws(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.clients.add(ws)
+        self.stats["connections"] += 1
+        logged_in = False
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                if msg.data == "ping":
+                    self.stats["pings"] += 1
+                    await ws.send_str("pong")
+                    continue
+                payload = json.loads(msg.data)
+                if payload.get("op") == "login":
+                    logged_in = True
+                    self.private_clients[ws] = set()
+                    self.stats["logins"] += 1
+                    await ws.send_str(json.dumps({"event": "login", "code": 0, "msg": ""}))
+                elif payload.get("op") == "subscribe":
+                    for arg in payload.get("args", []):
+                        if not logged_in:
+                            await ws.send_str(json.dumps({"event": "error", "code": 30004, "msg": "User not logged in", "arg": arg}))
+                            continue
+                        self.private_clients[ws].add(arg["channel"])
+                        self.stats["subscribes"] += 1
+                        await ws.send_str(json.dumps({"event": "subscribe", "arg": arg}))
+        finally:
+            self.clients.discard(ws)
+            self.private_clients.pop(ws, None)
+        return ws
+
+    async def push_private(self, channel, data):
+        """Sends a private-channel push (list of Bitget V2 records) to every subscribed client."""
+        arg = {"instType": "USDT-FUTURES", "channel": channel, "instId": "default"}
+        message = json.dumps({"action": "snapshot", "arg": arg, "data": data, "ts": int(time.time() * 1000)})
+        for ws, channels in list(self.private_clients.items()):
+            if channel in channels:
+                await ws.send_str(message)
+                self.stats["private_pushes"] += 1
+
+    async def disconnect_all(self):
+        """Drops every client connection (exercises reconnect logic)."""
+        for ws in list(self.clients):
+            await ws.close()
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application()
+        app.router.add_get("/v2/ws/public", self.handle_ws)
+        app.router.add_get("/v2/ws/private", self.handle_private_ws)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Bitget WS stub listening on ws://{host}:{self.port}/v2/ws/public")
+        return f"ws://{host}:{self.port}/v2/ws/public"
+
+    async def stop(self):
+        await self.disconnect_all()
+        if self._runner:
+            await self._runner.cleanup()
+
+async def _serve(args):
+    stub = BitgetWSStub(interval_ms=args.interval_ms)
+    url = await stub.start(port=args.port)
+    print(f"Bitget WS stub ready: BITGET_WS_PUBLIC_URL={url} BITGET_WS_PRIVATE_URL={url.replace('public', 'private')}")
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local Bitget V2 public/private WebSocket stand-in")
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--interval-ms", type=float, default=200)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(ap.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,104 @@
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker.
+    CLOSED: calls pass; trips to OPEN when the error rate or slow-call rate of the last
+    `window` calls crosses its threshold (after at least `min_calls`).
+    OPEN: calls are refused for `open_seconds`, then one probe is let through (HALF_OPEN).
+    HALF_OPEN: a fast successful probe closes the circuit, a failed or slow one re-opens it.
+    A probe that never reports back (cancelled) is replaced after `probe_timeout` seconds.
+    """
+    def __init__(self, name, window=20, min_calls=5, error_rate=0.5, slow_call_ms=8000, slow_rate=0.8,
+                 open_seconds=30, probe_timeout=15):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_rate_threshold = slow_rate
+        self.open_seconds = open_seconds
+        self.probe_timeout = probe_timeout
+
+        self.state = CLOSED
+        self.calls = deque(maxlen=window)  # (failed, slow)
+        self.opened_at = 0.0
+        self.probe_started_at = 0.0
+        self.on_state_change = None  # callback(old_state, new_state, reason)
+        self.stats = {"opened": 0, "short_circuited": 0, "probes": 0}
+
+    def _rates(self):
+        if not self.calls:
+            return 0.0, 0.0
+        failed = sum(1 for f, _ in self.calls if f)
+        slow = sum(1 for _, s in self.calls if s)
+        return failed / len(self.calls), slow / len(self.calls)
+
+    def _transition(self, new_state, reason):
+        old_state, self.state = self.state, new_state
+        if new_state == OPEN:
+            self.opened_at = time.monotonic()
+            self.stats["opened"] += 1
+        if new_state == CLOSED:
+            self.calls.clear()
+        logger.warning(f"🔌 Circuit '{self.name}': {old_state} -> {new_state} ({reason})")
+        if self.on_state_change:
+            try:
+                self.on_state_change(old_state, new_state, reason)
+            except Exception as e:
+                logger.error(f"Circuit '{self.name}' state callback failed: {e}")
+
+    def allow(self):
+        """True if a call may go out now. Refused calls are counted as short-circuited."""
+        if self.state == CLOSED:
+            return True
+
+        now = time.monotonic()
+        if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN, f"probing after {self.open_seconds:.0f}s")
+
+        if self.state == HALF_OPEN and now - self.probe_started_at >= self.probe_timeout:
+            self.probe_started_at = now
+            self.stats["probes"] += 1
+            return True
+
+        self.stats["short_circuited"] += 1
+        return False
+
+    def record_success(self, latency_ms):
+        slow = latency_ms >= self.slow_call_ms
+        if self.state == HALF_OPEN:
+            if slow:
+                self._transition(OPEN, f"probe slow ({latency_ms:.0f}ms)")
+            else:
+                self._transition(CLOSED, f"probe answered in {latency_ms:.0f}ms")
+            return
+        self.calls.append((False, slow))
+        self._check()
+
+    def record_failure(self, reason="error"):
+        if self.state == HALF_OPEN:
+            self._transition(OPEN, f"probe failed: {reason}")
+            return
+        self.calls.append((True, False))
+        self._check()
+
+    def _check(self):
+        if self.state != CLOSED or len(self.calls) < self.min_calls:
+            return
+        error_rate, slow_rate = self._rates()
+        if error_rate >= self.error_rate_threshold:
+            self._transition(OPEN, f"error rate {error_rate:.0%} over last {len(self.calls)} calls")
+        elif slow_rate >= self.slow_rate_threshold:
+            self._transition(OPEN, f"{slow_rate:.0%} of last {len(self.calls)} calls slower than {self.slow_call_ms:.0f}ms")
+
+    def get_stats(self):
+        error_rate, slow_rate = self._rates()
+        return dict(self.stats, state=self.state, error_rate=error_rate, slow_rate=slow_rate, window_calls=len(self.calls))
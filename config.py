@@ -20,8 +20,81 @@ BITGET_API_KEY = os.getenv("BITGET_API_KEY", "").strip()
 BITGET_SECRET_KEY = os.getenv("BITGET_SECRET_KEY", "").strip()
 BITGET_PASSPHRASE = os.getenv("BITGET_PASSPHRASE", "").strip()
 
+# Bitget Market Stream (public WebSocket ticker book, REST is the fallback)
+MARKET_WS_ENABLED = os.getenv("MARKET_WS_ENABLED", "true").lower() == "true"
+BITGET_WS_PUBLIC_URL = os.getenv("BITGET_WS_PUBLIC_URL", "wss://ws.bitget.com/v2/ws/public")  # e.g. local bitget_ws_stub.py
+MARKET_WS_MAX_AGE = float(os.getenv("MARKET_WS_MAX_AGE", "5"))  # Seconds a streamed price stays usable
+MARKET_WS_MAX_SYMBOLS = int(os.getenv("MARKET_WS_MAX_SYMBOLS", "50"))  # Subscriptions kept (least recently used dropped)
+MARKET_WS_PING_INTERVAL = float(os.getenv("MARKET_WS_PING_INTERVAL", "25"))  # Seconds between heartbeats
+
+# Bitget Private Stream (orders / positions / plan orders / account push -> trade monitor)
+PRIVATE_WS_ENABLED = os.getenv("PRIVATE_WS_ENABLED", "true").lower() == "true"
+BITGET_WS_PRIVATE_URL = os.getenv("BITGET_WS_PRIVATE_URL", "wss://ws.bitget.com/v2/ws/private")
+POSITION_RECONCILE_INTERVAL = float(os.getenv("POSITION_RECONCILE_INTERVAL", "300"))  # Poll backstop (s) while the private stream is up
+
+# Raw Bitget V2 REST (one pooled keep-alive session for calls made outside CCXT)
+BITGET_REST_URL = os.getenv("BITGET_REST_URL", "https://api.bitget.com")  # CCXT and raw calls (http://127.0.0.1:8767 = bitget_rest_stub.py)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))  # Max open connections
+HTTP_KEEPALIVE = float(os.getenv("HTTP_KEEPALIVE", "60"))  # Seconds an idle connection is kept
+HTTP_DNS_TTL = int(os.getenv("HTTP_DNS_TTL", "300"))  # Seconds a DNS answer is cached
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))  # Total seconds per raw request
+
+# Rate limiting (per-endpoint rolling-second windows at Bitget's V2 limits, priority lanes order > risk > monitor > report)
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))  # Retries after a 429 before the error is raised
+RATE_LIMIT_BACKOFF_BASE = float(os.getenv("RATE_LIMIT_BACKOFF_BASE", "0.5"))  # Seconds, doubled per retry (jittered)
+RATE_LIMIT_BACKOFF_MAX = float(os.getenv("RATE_LIMIT_BACKOFF_MAX", "8"))  # Backoff cap in seconds
+
+# Market price reads (stream miss): CCXT ticker first, raw V2 ticker raced after the hedge delay
+PRICE_HEDGE_DELAY = float(os.getenv("PRICE_HEDGE_DELAY", "0.3"))  # Seconds before the raw ticker is fired as well
+PRICE_BUDGET_CCXT = float(os.getenv("PRICE_BUDGET_CCXT", "2"))  # Deadline (s) of the CCXT fetch_ticker path
+PRICE_BUDGET_RAW = float(os.getenv("PRICE_BUDGET_RAW", "2"))  # Deadline (s) of the raw /mix/market/ticker path
+
+# Exchange read cache (single-flight + TTL, dropped on our own writes and private-stream pushes)
+READ_TTL_POSITIONS = float(os.getenv("READ_TTL_POSITIONS", "2"))  # Seconds
+READ_TTL_BALANCE = float(os.getenv("READ_TTL_BALANCE", "5"))
+READ_TTL_TICKERS = float(os.getenv("READ_TTL_TICKERS", "2"))
+CONFIG_PREWARM_SYMBOLS = int(os.getenv("CONFIG_PREWARM_SYMBOLS", "10"))  # Most-traded symbols whose hedge/margin/leverage are checked at startup
+PLAN_INDEX_TTL = float(os.getenv("PLAN_INDEX_TTL", "30"))  # Seconds between full TP/SL plan-order sweeps (pushes patch in between)
+
+# Contract metadata: boot symbol lookups from the on-disk snapshot, refresh from the API in the background
+CONTRACTS_SNAPSHOT = os.getenv("CONTRACTS_SNAPSHOT", "usdt-futures-bitget")  # Raw V2 contracts dump (rewritten on change)
+CONTRACTS_REFRESH_INTERVAL = float(os.getenv("CONTRACTS_REFRESH_INTERVAL", "21600"))  # Seconds between refreshes (6h)
+
 # Gemini
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "").strip()
 
 # App
 DB_NAME = "trading_bot.db"
+
+# Parser (Gemini)
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "").strip()  # Override API endpoint (e.g. local llm_stub_server.py)
+PARSER_MAX_CONCURRENCY = int(os.getenv("PARSER_MAX_CONCURRENCY", "4"))  # Parallel Gemini calls
+PARSER_TIMEOUT = float(os.getenv("PARSER_TIMEOUT", "15"))  # Seconds per parse (queue wait included)
+PARSER_HEDGE_DELAY = float(os.getenv("PARSER_HEDGE_DELAY", "3"))  # Seconds before a hedged request is fired (0 = off)
+GEMINI_HEDGE_MODEL = os.getenv("GEMINI_HEDGE_MODEL", "gemini-2.5-flash-lite")  # Model used for the hedged request
+PARSER_BATCH_SIZE = int(os.getenv("PARSER_BATCH_SIZE", "8"))  # Messages per Gemini request during backlog catch-up
+REPLY_CONTEXT_MAX_CHARS = int(os.getenv("REPLY_CONTEXT_MAX_CHARS", "280"))  # Unstructured reply text sent to Gemini is cut here
+LOCAL_PARSE_MIN_CONFIDENCE = float(os.getenv("LOCAL_PARSE_MIN_CONFIDENCE", "0.9"))  # Below this, fall back to Gemini
+
+# Gemini Circuit Breaker (open -> parse locally, probe again after PARSER_BREAKER_OPEN_SECONDS)
+PARSER_BREAKER_WINDOW = int(os.getenv("PARSER_BREAKER_WINDOW", "20"))  # Rolling window of Gemini calls
+PARSER_BREAKER_MIN_CALLS = int(os.getenv("PARSER_BREAKER_MIN_CALLS", "4"))  # Calls needed before it can trip
+PARSER_BREAKER_ERROR_RATE = float(os.getenv("PARSER_BREAKER_ERROR_RATE", "0.5"))  # Error share that opens it
+PARSER_BREAKER_SLOW_MS = float(os.getenv("PARSER_BREAKER_SLOW_MS", "8000"))  # A call slower than this counts as slow
+PARSER_BREAKER_SLOW_RATE = float(os.getenv("PARSER_BREAKER_SLOW_RATE", "0.8"))  # Slow share that opens it
+PARSER_BREAKER_OPEN_SECONDS = float(os.getenv("PARSER_BREAKER_OPEN_SECONDS", "30"))  # Wait before a half-open probe
+DEGRADED_MIN_CONFIDENCE = float(os.getenv("DEGRADED_MIN_CONFIDENCE", "0.8"))  # Local parse accepted while Gemini is down (unsure parses never are)
+
+# Parse Cache
+PARSE_CACHE_TTL = int(os.getenv("PARSE_CACHE_TTL", str(24 * 3600)))  # Seconds
+PARSE_CACHE_MEMORY_SIZE = int(os.getenv("PARSE_CACHE_MEMORY_SIZE", "256"))  # In-memory LRU entries
+PARSE_CACHE_MAX_ROWS = int(os.getenv("PARSE_CACHE_MAX_ROWS", "5000"))  # SQLite rows kept
+
+# Channel Edits
+EDIT_DEBOUNCE_SECONDS = float(os.getenv("EDIT_DEBOUNCE_SECONDS", "3"))  # Quiet time before an edit burst is processed
+
+# Backlog Catch-up (startup / reconnect)
+CATCHUP_MAX_MESSAGES = int(os.getenv("CATCHUP_MAX_MESSAGES", "200"))  # Missed channel messages fetched at most
+CATCHUP_MAX_AGE = int(os.getenv("CATCHUP_MAX_AGE", "3600"))  # Seconds: older missed messages are not replayed
+CATCHUP_CHECK_INTERVAL = float(os.getenv("CATCHUP_CHECK_INTERVAL", "5"))  # Seconds between connection checks
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Contracts in these states are not tradable and are left out of the registry
+INACTIVE_STATUSES = ("off",)
+
+# Fields whose change means the snapshot is out of date (listings/delistings change the symbol set)
+VERSION_FIELDS = ("symbol", "symbolStatus", "pricePlace", "priceEndStep", "volumePlace", "minTradeNum", "sizeMultiplier")
+
+def contracts_version(contracts):
+    """Content version of a V2 contracts list: sha1 over the symbol set and its trading fields."""
+    rows = sorted("|".join(str(c.get(f, "")) for f in VERSION_FIELDS) for c in contracts)
+    return hashlib.sha1("\n".join(rows).encode("utf-8")).hexdigest()[:12]
+
+def active_contracts(contracts):
+    return [c for c in contracts if c.get("symbolStatus", "normal") not in INACTIVE_STATUSES]
+
+def load_snapshot(path):
+    """
+    Reads a raw Bitget V2 /mix/market/contracts dump. Returns (contracts, version, saved_at)
+    or (None, None, None) if the file is missing or unreadable.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        contracts = payload["data"]
+    except FileNotFoundError:
+        logger.warning(f"Contract snapshot not found: {path}")
+        return None, None, None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.error(f"Contract snapshot unreadable ({path}): {e}")
+        return None, None, None
+    version = payload.get("version") or contracts_version(contracts)
+    saved_at = (payload.get("requestTime") or 0) / 1000
+    return contracts, version, saved_at
+
+def save_snapshot(path, contracts, version=None):
+    """Rewrites the snapshot atomically (temp file + os.replace), same layout as the API response."""
+    payload = {
+        "code": "00000",
+        "msg": "success",
+        "requestTime": int(time.time() * 1000),
+        "version": version or contracts_version(contracts),
+        "data": contracts,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return payload["version"]
@@ -38,6 +38,8 @@ async def init_db():
         except: pass
         try: await db.execute('ALTER TABLE trades ADD COLUMN trade_type TEXT DEFAULT "AUTO"')
         except: pass
+        try: await db.execute('ALTER TABLE trades ADD COLUMN entry_pending INTEGER DEFAULT 0')
+        except: pass
         
         await db.execute('''
             CREATE TABLE IF NOT EXISTS settings (
@@ -47,6 +49,25 @@ async def init_db():
         ''')
         # Default Risk Multiplier
         await db.execute('INSERT OR IGNORE INTO settings (key, value) VALUES ("risk_multiplier", "1.0")')
+
+        # Content-addressed cache of Gemini parse results (see parse_cache.py)
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                cache_key TEXT PRIMARY KEY,
+                result TEXT,
+                created_at REAL,
+                last_hit REAL
+            )
+        ''')
+
+        # Hedge mode / margin mode / leverage already applied per symbol side (ExchangeHandler._cache)
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS exchange_config (
+                cache_key TEXT PRIMARY KEY,
+                config TEXT,
+                updated_at REAL
+            )
+        ''')
         
         await db.commit()
     logger.info("Database initialized.")
@@ -98,14 +119,14 @@ async def reserve_trade(message_id, symbol, trade_type="AUTO"):
         logger.warning(f"Failed to reserve trade {message_id}: {e}")
         return False
 
-async def update_trade_full(message_id, order_id, symbol, entry_price, sl_price, tp_price=None, status="OPEN", position_side="LONG", leverage=None, notes=None):
-    """Update a reserved trade with full details."""
+async def update_trade_full(message_id, order_id, symbol, entry_price, sl_price, tp_price=None, status="OPEN", position_side="LONG", leverage=None, notes=None, entry_pending=False):
+    """Update a reserved trade with full details. entry_pending marks a limit entry still waiting for its fill."""
     async with aiosqlite.connect(DB_NAME) as db:
         await db.execute('''
             UPDATE trades 
-            SET order_id = ?, symbol = ?, entry_price = ?, sl_price = ?, tp_price = ?, status = ?, position_side = ?, leverage = ?, notes = ?
+            SET order_id = ?, symbol = ?, entry_price = ?, sl_price = ?, tp_price = ?, status = ?, position_side = ?, leverage = ?, notes = ?, entry_pending = ?
             WHERE message_id = ?
-        ''', (order_id, symbol, entry_price, sl_price, tp_price, status, position_side, leverage, notes, message_id))
+        ''', (order_id, symbol, entry_price, sl_price, tp_price, status, position_side, leverage, notes, int(entry_pending), message_id))
         await db.commit()
 
 async def delete_trade(message_id):
@@ -133,6 +154,20 @@ async def get_trade_by_msg_id(message_id):
                 }
             return None
 
+async def get_pending_entry_by_order_id(order_id):
+    """Retrieve an OPEN trade whose limit entry has not filled yet, by exchange order id (fill pushes only carry the order id)."""
+    async with aiosqlite.connect(DB_NAME) as db:
+        async with db.execute('SELECT message_id FROM trades WHERE order_id = ? AND status = "OPEN" AND entry_pending = 1', (str(order_id),)) as cursor:
+            row = await cursor.fetchone()
+    return await get_trade_by_msg_id(row[0]) if row else None
+
+async def mark_entry_filled(message_id, entry_price=None):
+    """Clears the pending flag (and syncs the entry price if given). False if another fill event already did."""
+    async with aiosqlite.connect(DB_NAME) as db:
+        cursor = await db.execute('UPDATE trades SET entry_pending = 0, entry_price = COALESCE(?, entry_price) WHERE message_id = ? AND entry_pending = 1', (entry_price, message_id))
+        await db.commit()
+        return cursor.rowcount == 1
+
 async def update_trade_order_id(message_id, order_id):
     async with aiosqlite.connect(DB_NAME) as db:
         await db.execute('UPDATE trades SET order_id = ? WHERE message_id = ?', (order_id, message_id))
@@ -367,4 +402,61 @@ async def get_setting(key, default=None):
 async def update_setting(key, value):
     async with aiosqlite.connect(DB_NAME) as db:
         await db.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', (key, str(value)))
-        await db.commit()
\ No newline at end of file
+        await db.commit()
+
+async def get_parse_cache(cache_key, min_created_at):
+    """Returns the cached parse JSON if it is newer than min_created_at (TTL), else None."""
+    import time
+    async with aiosqlite.connect(DB_NAME) as db:
+        async with db.execute('SELECT result FROM parse_cache WHERE cache_key = ? AND created_at >= ?', (cache_key, min_created_at)) as cursor:
+            row = await cursor.fetchone()
+        if not row:
+            return None
+        await db.execute('UPDATE parse_cache SET last_hit = ? WHERE cache_key = ?', (time.time(), cache_key))
+        await db.commit()
+        return row[0]
+
+async def store_parse_cache(cache_key, result_json):
+    import time
+    now = time.time()
+    async with aiosqlite.connect(DB_NAME) as db:
+        await db.execute('INSERT OR REPLACE INTO parse_cache (cache_key, result, created_at, last_hit) VALUES (?, ?, ?, ?)', (cache_key, result_json, now, now))
+        await db.commit()
+
+async def prune_parse_cache(min_created_at, max_rows):
+    """Drops expired entries, then evicts least recently hit rows beyond max_rows."""
+    async with aiosqlite.connect(DB_NAME) as db:
+        await db.execute('DELETE FROM parse_cache WHERE created_at < ?', (min_created_at,))
+        await db.execute('''
+            DELETE FROM parse_cache WHERE cache_key NOT IN (
+                SELECT cache_key FROM parse_cache ORDER BY last_hit DESC LIMIT ?
+            )
+        ''', (max_rows,))
+        await db.commit()
+
+async def get_exchange_configs():
+    """Returns {cache_key: config dict} for every persisted symbol-side configuration."""
+    import json
+    async with aiosqlite.connect(DB_NAME) as db:
+        async with db.execute('SELECT cache_key, config FROM exchange_config') as cursor:
+            rows = await cursor.fetchall()
+    return {key: json.loads(config) for key, config in rows}
+
+async def store_exchange_config(cache_key, config):
+    import json
+    import time
+    async with aiosqlite.connect(DB_NAME) as db:
+        await db.execute('INSERT OR REPLACE INTO exchange_config (cache_key, config, updated_at) VALUES (?, ?, ?)', (cache_key, json.dumps(config), time.time()))
+        await db.commit()
+
+async def delete_exchange_config(cache_key):
+    async with aiosqlite.connect(DB_NAME) as db:
+        await db.execute('DELETE FROM exchange_config WHERE cache_key = ?', (cache_key,))
+        await db.commit()
+
+async def get_top_traded_symbols(limit=10):
+    """Most frequently traded symbols (all time), most traded first."""
+    async with aiosqlite.connect(DB_NAME) as db:
+        async with db.execute('SELECT symbol, COUNT(*) AS n FROM trades WHERE symbol IS NOT NULL GROUP BY symbol ORDER BY n DESC LIMIT ?', (limit,)) as cursor:
+            rows = await cursor.fetchall()
+    return [row[0] for row in rows]
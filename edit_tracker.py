@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import re
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Only these tokens decide whether an edit can change the parse result.
+# Emojis, casing, punctuation and filler words are cosmetic.
+RE_TRADE_TOKEN = re.compile(
+    r'[#$][A-Z][A-Z0-9]{1,14}'
+    r'|\d+(?:,\d{3})*(?:\.\d+)?'
+    r'|\b(?:LONG|SHORT|BUY|SELL|ENTRY|SL|TP\d*|TARGET\d*|STOP|STOPLOSS|INVALIDATION|LIMIT|MARKET'
+    r'|CANCEL|CLOSE|CLOSING|BOOKED|BE|BREAKEVEN|LIQ|MOVE|HIT|EXIT|DELETE|HALF|IDEA|MOCK)\b'
+)
+# Bare uppercase words ("BTC LONG" -> "ETH LONG"): tokens only if the registry lists them as a coin
+RE_BARE_TICKER = re.compile(r'\b[A-Z][A-Z0-9]{1,14}\b')
+
+def extract_trade_tokens(text, symbols=None):
+    """
+    Ordered tuple of trade-relevant tokens (prices, direction, symbol, action words), plus the
+    bare tickers `symbols` (a SymbolRegistry) recognizes.
+    """
+    tokens = tuple(t.replace(",", "") for t in RE_TRADE_TOKEN.findall((text or "").upper()))
+    if symbols is not None and symbols.loaded:
+        tokens += tuple(w for w in RE_BARE_TICKER.findall(text or "") if w in symbols.aliases or w in symbols)
+    return tokens
+
+class EditTracker:
+    """Remembers the last parsed version of recent messages so edits can be diffed."""
+    def __init__(self, max_messages=500, symbols=None):
+        self.max_messages = max_messages
+        self.symbols = symbols  # SymbolRegistry for bare tickers (optional)
+        self._seen = OrderedDict()  # msg_id -> (tokens, parsed data)
+
+    def remember(self, msg_id, text, data):
+        self._seen[msg_id] = (extract_trade_tokens(text, self.symbols), data)
+        self._seen.move_to_end(msg_id)
+        while len(self._seen) > self.max_messages:
+            self._seen.popitem(last=False)
+
+    def has_changed(self, msg_id, text):
+        """True if the message was never parsed or its trade tokens differ from the last parse."""
+        entry = self._seen.get(msg_id)
+        return entry is None or entry[0] != extract_trade_tokens(text, self.symbols)
+
+    def last_data(self, msg_id):
+        entry = self._seen.get(msg_id)
+        return entry[1] if entry else None
+
+class EditDebouncer:
+    """
+    Coalesces bursts of edits per message id: only the latest edit runs,
+    once no further edit arrived for `window` seconds.
+    """
+    def __init__(self, window):
+        self.window = window
+        self._pending = {}  # msg_id -> sleeping task
+        self.stats = {"scheduled": 0, "coalesced": 0}
+
+    def submit(self, key, callback, *args):
+        task = self._pending.get(key)
+        if task and not task.done():
+            task.cancel()
+            self.stats["coalesced"] += 1
+        self.stats["scheduled"] += 1
+        self._pending[key] = asyncio.create_task(self._fire(key, callback, args))
+
+    async def _fire(self, key, callback, args):
+        await asyncio.sleep(self.window)
+        # Leave the pending map before running, so a later edit opens a new window
+        # instead of cancelling work that is already in flight.
+        self._pending.pop(key, None)
+        try:
+            await callback(*args)
+        except Exception as e:
+            logger.error(f"Debounced edit handler failed for {key}: {e}")
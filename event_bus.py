@@ -0,0 +1,30 @@
+import asyncio
+import inspect
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+class EventBus:
+    """
+    In-process pub/sub for exchange push events (topics: 'orders', 'positions', 'orders-algo',
+    'account', 'ticker'). Handlers may be sync or async; async ones run as tasks so a slow
+    handler never stalls the WebSocket reader.
+    """
+    def __init__(self):
+        self._handlers = defaultdict(list)
+        self.stats = defaultdict(int)
+
+    def subscribe(self, topic, handler):
+        self._handlers[topic].append(handler)
+
+    def publish(self, topic, payload):
+        self.stats[topic] += 1
+        for handler in self._handlers.get(topic, []):
+            try:
+                result = handler(payload)
+                if inspect.isawaitable(result):
+                    task = asyncio.create_task(result)
+                    task.add_done_callback(lambda t, topic=topic: t.cancelled() or not t.exception() or logger.error(f"Event handler for '{topic}' failed: {t.exception()}"))
+            except Exception as e:
+                logger.error(f"Event handler for '{topic}' failed: {e}")
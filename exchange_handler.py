@@ -1,8 +1,22 @@
 import ccxt.async_support as ccxt
 import logging
 import asyncio
-import aiohttp
-from config import BITGET_API_KEY, BITGET_SECRET_KEY, BITGET_PASSPHRASE
+import time
+from config import BITGET_API_KEY, BITGET_SECRET_KEY, BITGET_PASSPHRASE, BITGET_REST_URL, MARKET_WS_ENABLED, PRIVATE_WS_ENABLED, CONTRACTS_SNAPSHOT, CONTRACTS_REFRESH_INTERVAL
+from config import RATE_LIMIT_MAX_RETRIES, RATE_LIMIT_BACKOFF_BASE, RATE_LIMIT_BACKOFF_MAX
+from config import PRICE_HEDGE_DELAY, PRICE_BUDGET_CCXT, PRICE_BUDGET_RAW
+from config import READ_TTL_POSITIONS, READ_TTL_BALANCE, READ_TTL_TICKERS, PLAN_INDEX_TTL, CONFIG_PREWARM_SYMBOLS
+from database import get_exchange_configs, store_exchange_config, delete_exchange_config, get_top_traded_symbols
+from contract_snapshot import load_snapshot, save_snapshot, contracts_version, active_contracts
+from event_bus import EventBus
+from market_stream import MarketDataStream
+from private_stream import PrivateStream
+from metrics import LatencyHistogram
+from rate_limiter import RateLimitScheduler, in_lane
+from plan_index import PlanOrderIndex
+from read_cache import ReadCache
+from rest_client import BitgetRestClient
+from symbol_registry import SymbolRegistry, markets_from_contracts
 
 logger = logging.getLogger(__name__)
 
@@ -16,44 +30,275 @@ class ExchangeHandler:
                 'defaultType': 'swap',  # Futures
             },
             'timeout': 30000,
-            'enableRateLimit': True,
             'sandboxMode': False,
         })
         
         self.exchange.has['fetchCurrencies'] = False
+        # CCXT and the raw client share BITGET_REST_URL (e.g. the local bitget_rest_stub.py)
+        self.exchange.urls['api'] = {name: BITGET_REST_URL for name in self.exchange.urls['api']}
+
+        # Per-endpoint rolling-second windows with priority lanes instead of ccxt's single throttle queue
+        # (order > risk > monitor > report), 429s back off with jitter and retry
+        self.limiter = RateLimitScheduler(max_retries=RATE_LIMIT_MAX_RETRIES, backoff_base=RATE_LIMIT_BACKOFF_BASE, backoff_max=RATE_LIMIT_BACKOFF_MAX)
+        self.limiter.install(self.exchange)
         
-        # Optimization Cache: { 'BTCUSDT': { 'leverage': 20, 'marginMode': 'isolated', 'posSide': 'long' } }
+        # Optimization Cache: { 'BTCUSDT_long': { 'leverage': 20, 'marginMode': 'isolated', 'hedgeMode': True } }
+        # Persisted in SQLite (exchange_config) and re-validated against the exchange at startup (prewarm_config)
         self._cache = {}
+        self.last_order_timings = None
+        self.config_stats = {"restored": 0, "validated": 0, "corrected": 0, "dropped": 0, "prewarmed": 0}
+
+        # raw id <-> CCXT symbol <-> base maps: booted from the contracts snapshot (boot_markets),
+        # kept fresh by market_refresh_task, or built from CCXT markets if there is no snapshot
+        self.symbols = SymbolRegistry()
+        self.contracts_version = None
+
+        # WebSocket feeds (started by start_streams). Public: live ticker book, REST stays the fallback.
+        # Private: order / position / plan-order / account pushes. Both publish on event_bus.
+        self.event_bus = EventBus()
+        self.market_stream = MarketDataStream(bus=self.event_bus, symbols=self.symbols) if MARKET_WS_ENABLED else None
+        self.private_stream = PrivateStream(self.event_bus) if PRIVATE_WS_ENABLED and BITGET_API_KEY else None
+
+        # Raw V2 REST fallbacks share one pooled keep-alive session (no handshake per call)
+        self.rest = BitgetRestClient(limiter=self.limiter)
+
+        # Positions / balance / tickers reads: concurrent callers share one request, results live
+        # for a few seconds. Dropped on our own writes and on private-stream pushes.
+        self.reads = ReadCache()
+        self.event_bus.subscribe("positions", lambda _: self.reads.invalidate("positions"))
+        self.event_bus.subscribe("orders", lambda _: self.reads.invalidate("positions", "balance"))
+        self.event_bus.subscribe("account", lambda _: self.reads.invalidate("balance"))
+
+        # Every pending TP/SL plan order, one paginated sweep for all symbols (patched by pushes)
+        self.plans = PlanOrderIndex(lambda params: self.exchange.privateMixGetV2MixOrderOrdersPlanPending(params), self.reads, PLAN_INDEX_TTL)
+        self.event_bus.subscribe("orders-algo", self.plans.apply_push)
+
+        # Hot-path reads: latency per endpoint (successful calls) and deadlines for the price paths
+        self.read_latency = {}
+        self.read_budgets = {"fetch_ticker": PRICE_BUDGET_CCXT, "v2/mix/market/ticker": PRICE_BUDGET_RAW}
+        self.price_stats = {"reads": 0, "hedges_fired": 0, "hedge_wins": 0, "timeouts": 0}
+
+        # TP/SL replacement step timings (see _replace_tpsl)
+        self.tpsl_latency = LatencyHistogram()
+        self.last_tpsl_timings = None
+
+    def start_streams(self):
+        """Starts the WebSocket feeds and pre-opens the REST pool in the background."""
+        for stream in (self.market_stream, self.private_stream):
+            if stream:
+                stream.start()
+        asyncio.create_task(self.rest.warm_up())
+
+    async def load_markets(self, reload=False):
+        """Makes sure the symbol registry is usable. Only waits on CCXT markets if nothing was booted."""
+        if reload or not self.symbols.loaded:
+            if reload or not self.exchange.markets:
+                logger.info("📡 Loading exchange markets...")
+                await self.exchange.load_markets(reload)
+            self.symbols.load(self.exchange.markets, source="ccxt")
+        self.symbols.overlay(self.exchange.markets)
+
+    async def load_ccxt_markets(self):
+        """
+        For symbols handed to CCXT methods: waits on the CCXT markets (cached after the first call,
+        CCXT would load them before the request anyway) and switches the registry to CCXT's names.
+        """
+        await self.exchange.load_markets()
+        await self.load_markets()
+
+    def boot_markets(self):
+        """Cold start: serves symbol lookups from the on-disk contracts snapshot (no API call)."""
+        contracts, version, saved_at = load_snapshot(CONTRACTS_SNAPSHOT)
+        if not contracts:
+            return False
+        self.symbols.load(markets_from_contracts(active_contracts(contracts)), source="snapshot")
+        self.contracts_version = version
+        age_h = (time.time() - saved_at) / 3600 if saved_at else float('nan')
+        logger.info(f"⚡ Markets booted from snapshot {version} ({len(contracts)} contracts, {age_h:.0f}h old)")
+        return True
+
+    @in_lane("report")
+    async def refresh_markets(self):
+        """
+        Fetches the USDT-futures contracts list. On any change (listing, delisting, symbolStatus,
+        precision) reloads the registry and atomically rewrites the snapshot. Returns True if changed.
+        """
+        contracts = await self.rest.get("/api/v2/mix/market/contracts", {"productType": "USDT-FUTURES"})
+        if not contracts:
+            raise Exception("Empty contracts list")
+        version = contracts_version(contracts)
+        if version == self.contracts_version:
+            return False
+        old_ids = set(self.symbols.by_id)
+        self.symbols.load(markets_from_contracts(active_contracts(contracts)), source="api")
+        await asyncio.to_thread(save_snapshot, CONTRACTS_SNAPSHOT, contracts, version)
+        new_ids = set(self.symbols.by_id)
+        logger.info(f"🗂️ Contracts changed {self.contracts_version} -> {version} "
+                    f"(+{len(new_ids - old_ids)} / -{len(old_ids - new_ids)}). Snapshot rewritten.")
+        self.contracts_version = version
+        return True
+
+    async def market_refresh_task(self):
+        """Background contracts refresh (right away, then every CONTRACTS_REFRESH_INTERVAL)."""
+        while True:
+            try:
+                await self.refresh_markets()
+            except Exception as e:
+                logger.warning(f"Contracts refresh failed (keeping {self.symbols.source} data): {e}")
+            await asyncio.sleep(CONTRACTS_REFRESH_INTERVAL)
 
     def get_cache_info(self):
         """Returns the current state of the optimization cache."""
         return self._cache
 
+    def _remember_config(self, cache_key, **fields):
+        """Updates a symbol-side config cache entry and persists it in the background."""
+        entry = self._cache.setdefault(cache_key, {})
+        entry.update(fields)
+        asyncio.create_task(store_exchange_config(cache_key, dict(entry)))
+
+    async def fetch_account_config(self, symbol):
+        """
+        Current hedge/margin/leverage settings for symbol, one V2 account call:
+        {'long': {'hedgeMode', 'marginMode', 'leverage'}, 'short': {...}}.
+        """
+        raw_symbol = self.symbols.raw_id(symbol)
+        res = await self.exchange.privateMixGetV2MixAccountAccount({"symbol": raw_symbol, "productType": "USDT-FUTURES", "marginCoin": "USDT"})
+        if res.get('code') != '00000' or not res.get('data'):
+            raise Exception(f"Account API Error: {res}")
+        data = res['data']
+        hedge = data.get('posMode') == 'hedge_mode'
+        margin_mode = 'isolated' if data.get('marginMode') == 'isolated' else 'crossed'
+        config = {}
+        for side, field in (('long', 'isolatedLongLever'), ('short', 'isolatedShortLever')):
+            lever = data.get(field) if margin_mode == 'isolated' else data.get('crossedMarginLeverage')
+            config[side] = {'hedgeMode': hedge, 'marginMode': margin_mode, 'leverage': int(float(lever)) if lever else None}
+        return config
+
+    @in_lane("report")
+    async def prewarm_config(self, limit=CONFIG_PREWARM_SYMBOLS):
+        """
+        Startup: restores the persisted config cache, validates every entry against the exchange
+        (wrong ones are corrected, unverifiable ones dropped) and prewarms hedge + isolated mode
+        for the most traded symbols, so the first signal after a restart takes the fast path.
+        """
+        try:
+            persisted = await get_exchange_configs()
+            self.config_stats["restored"] = len(persisted)
+            top = await get_top_traded_symbols(limit)
+        except Exception as e:
+            logger.warning(f"Config cache restore failed: {e}")
+            return
+
+        symbols = list(dict.fromkeys(top + [key.rsplit("_", 1)[0] for key in persisted]))
+        semaphore = asyncio.Semaphore(4)
+
+        async def warm(symbol):
+            async with semaphore:
+                try:
+                    actual = await self.fetch_account_config(symbol)
+                    if symbol in top and not (actual['long']['hedgeMode'] and actual['long']['marginMode'] == 'isolated'):
+                        await self.ensure_hedge_mode(symbol)
+                        await self.ensure_isolated_margin(symbol)
+                        actual = await self.fetch_account_config(symbol)
+                        self.config_stats["prewarmed"] += 1
+                except Exception as e:
+                    logger.warning(f"Config prewarm failed for {symbol}: {e}")
+                    actual = None
+
+                for side in ('long', 'short'):
+                    key = f"{symbol}_{side}"
+                    if actual is None:
+                        # Unverified: the order path sets everything again (safe, just slower)
+                        if key in persisted:
+                            self.config_stats["dropped"] += 1
+                            await delete_exchange_config(key)
+                        continue
+                    entry = actual[side]
+                    if key in persisted:
+                        # Only the fields that were persisted (an entry may predate its leverage being set)
+                        matches = all(entry.get(field) == value for field, value in persisted[key].items())
+                        self.config_stats["validated" if matches else "corrected"] += 1
+                    if entry['hedgeMode'] and entry['marginMode'] == 'isolated':
+                        self._cache[key] = entry
+                        await store_exchange_config(key, entry)
+                    elif key in persisted:
+                        await delete_exchange_config(key)
+
+        await asyncio.gather(*(warm(s) for s in symbols))
+        logger.info(f"⚙️ Config cache ready: {len(self._cache)} symbol sides ({self.config_stats})")
+
+    async def _timed_read(self, endpoint, coro):
+        """Awaits a read within its endpoint budget (if any) and records its latency on success."""
+        start = time.perf_counter()
+        budget = self.read_budgets.get(endpoint)
+        try:
+            result = await (asyncio.wait_for(coro, budget) if budget else coro)
+        except asyncio.TimeoutError:
+            self.price_stats["timeouts"] += 1
+            raise TimeoutError(f"{endpoint} exceeded its {budget}s budget")
+        self.read_latency.setdefault(endpoint, LatencyHistogram()).record((time.perf_counter() - start) * 1000)
+        return result
+
+    async def _price_ccxt(self, symbol):
+        ticker = await self._timed_read("fetch_ticker", self.exchange.fetch_ticker(symbol))
+        if not ticker.get('last'):
+            raise Exception(f"CCXT ticker without a last price for {symbol}")
+        return ticker['last']
+
+    async def _price_raw(self, symbol):
+        params = {
+            "symbol": self.symbols.raw_id(symbol),
+            "productType": "USDT-FUTURES"
+        }
+        data = await self._timed_read("v2/mix/market/ticker", self.rest.get("/api/v2/mix/market/ticker", params))
+        price = float(data[0].get('lastPr') or data[0]['last'] or 0) if data else 0.0
+        if price <= 0:
+            raise Exception(f"Raw API Error: no ticker for {symbol}")
+        return price
+
     async def get_market_price(self, symbol):
+        if self.market_stream:
+            price = self.market_stream.get_price(symbol)
+            if price:
+                return price
+            # Not streamed yet (or stale): REST this time, stream it from now on
+            self.market_stream.subscribe([symbol])
+
+        # CCXT first; if it has not answered after PRICE_HEDGE_DELAY (or failed early), race the
+        # raw V2 ticker. First valid price wins, the loser is cancelled. Each path has its own deadline.
+        self.price_stats["reads"] += 1
+        primary = asyncio.create_task(self._price_ccxt(symbol))
+        tasks = {primary}
         try:
-            ticker = await self.exchange.fetch_ticker(symbol)
-            return ticker['last']
-        except Exception as ccxt_error:
-            try:
-                url = "https://api.bitget.com/api/v2/mix/market/ticker"
-                params = {
-                    "symbol": symbol,
-                    "productType": "USDT-FUTURES"
-                }
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, params=params) as resp:
-                        data = await resp.json()
-                        if data['code'] == '00000' and data['data']:
-                            return float(data['data'][0]['last'])
-                        else:
-                            raise Exception(f"Raw API Error: {data}")
-            except Exception as raw_error:
-                logger.error(f"Price fetch failed (CCXT & Raw): {ccxt_error} | {raw_error}")
-                raise raw_error
+            await asyncio.wait(tasks, timeout=PRICE_HEDGE_DELAY)
+            if primary.done() and primary.exception() is None:
+                return primary.result()
+
+            self.price_stats["hedges_fired"] += 1
+            hedge = asyncio.create_task(self._price_raw(symbol))
+            tasks.add(hedge)
+
+            pending = {t for t in tasks if not t.done()}
+            errors = [t.exception() for t in tasks if t.done()]
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if t.exception() is None:
+                        if t is hedge:
+                            self.price_stats["hedge_wins"] += 1
+                        return t.result()
+                    errors.append(t.exception())
+            logger.error(f"Price fetch failed (CCXT & Raw): {' | '.join(str(e) for e in errors)}")
+            raise errors[-1]
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
 
     async def get_balance(self):
         """Fetches Balance Breakdown (Free vs Equity)."""
-        balance = await self.exchange.fetch_balance(params={'type': 'swap'})
+        balance = await self.reads.get(("balance",), lambda: self._timed_read("fetch_balance", self.exchange.fetch_balance(params={'type': 'swap'})), READ_TTL_BALANCE)
         
         # Bitget Specifics:
         # 'free': Available for trade (Cross margin balance - frozen)
@@ -69,22 +314,20 @@ class ExchangeHandler:
             'equity': balance.get('USDT', {}).get('total', 0.0)
         }
 
+    async def _fetch_positions(self):
+        """All USDT-futures positions (shared by get_position / get_all_positions via the read cache)."""
+        return await self.reads.get(("positions",), lambda: self._timed_read("fetch_positions", self.exchange.fetch_positions(params={'productType': 'USDT-FUTURES'})), READ_TTL_POSITIONS)
+
     async def get_position(self, symbol):
         """Fetches the current open position for the symbol."""
         try:
-            positions = await self.exchange.fetch_positions(params={'productType': 'USDT-FUTURES'})
+            positions = await self._fetch_positions()
             
             target_pos = next((p for p in positions if p['symbol'] == symbol and float(p['contracts']) > 0), None)
             
             if not target_pos:
-                 for p in positions:
-                     if float(p['contracts']) > 0:
-                         p_sym_clean = p['symbol'].replace("/", "").replace(":", "").split("USDT")[0] + "USDT"
-                         input_clean = symbol.replace("/", "").replace(":", "").split("USDT")[0] + "USDT"
-                         
-                         if p_sym_clean == input_clean:
-                             target_pos = p
-                             break
+                 input_clean = self.symbols.raw_id(symbol)
+                 target_pos = next((p for p in positions if float(p['contracts']) > 0 and self.symbols.raw_id(p['symbol']) == input_clean), None)
             return target_pos
         except Exception as e:
             logger.error(f"Error fetching position for {symbol}: {e}")
@@ -96,27 +339,17 @@ class ExchangeHandler:
         Prioritizes USDT-FUTURES.
         """
         try:
-            if not self.exchange.markets:
-                await self.exchange.load_markets()
-            
-            # 1. Direct check (if already correct)
-            if symbol in self.exchange.markets:
-                return symbol
+            await self.load_ccxt_markets()
             
-            # 2. Iterate and match
-            target_clean = symbol.replace("/", "").replace(":", "").split("USDT")[0] + "USDT"
+            # Registry lookup (USDT linear futures only): BTC/USDT:USDT as is, BTCUSDT -> BTC/USDT:USDT
+            unified = self.symbols.unified(symbol)
+            if unified:
+                return unified
             
-            # Preference: Linear Futures (Swap)
-            for m_symbol, market in self.exchange.markets.items():
-                # We want USDT futures/swaps
-                if not (market.get('linear') and market.get('quote') == 'USDT'):
-                    continue
-                
-                # Normalize this market's symbol
-                m_clean = m_symbol.replace("/", "").replace(":", "").split("USDT")[0] + "USDT"
-                
-                if m_clean == target_clean:
-                    return m_symbol  # Return the CCXT Unified Symbol (e.g. BTC/USDT:USDT)
+            # CCXT's own id index (contracts the registry skips, e.g. no longer 'normal' but still held)
+            for market in (self.exchange.markets_by_id or {}).get(self.symbols.raw_id(symbol), []):
+                if market.get('swap') and market.get('linear'):
+                    return market['symbol']
             
             # If no future found, return original (fallback)
             logger.warning(f"Could not resolve future symbol for {symbol}. Returning original.")
@@ -131,29 +364,36 @@ class ExchangeHandler:
         try:
             # fetch_positions(None) or [] should return all for Bitget V2
             # Force productType
-            positions = await self.exchange.fetch_positions(params={'productType': 'USDT-FUTURES'})
+            positions = await self._fetch_positions()
             
             # Filter for active positions (size > 0)
             active_pos = [p for p in positions if float(p['contracts']) > 0]
+            if self.market_stream and active_pos:
+                self.market_stream.subscribe([p['symbol'] for p in active_pos])
             return active_pos
         except Exception as e:
             logger.error(f"Error fetching all positions: {e}")
             return []
 
     async def set_leverage(self, symbol, leverage):
+        """Returns True if the leverage was applied (failures are logged, not raised)."""
         try:
             # Set Leverage
             await self.exchange.set_leverage(leverage, symbol)
+            return True
         except Exception as e:
             logger.warning(f"Could not set leverage: {e}")
+            return False
 
     async def ensure_hedge_mode(self, symbol):
+        """Returns True if the mode was switched, False if it was already set (40789)."""
         try:
             await self.exchange.set_position_mode(True, symbol)
+            return True
         except Exception as e:
             err_str = str(e)
             if "40789" in err_str:
-                return
+                return False
             
             # 400172: Has open positions/orders (Cannot switch)
             # 43116: Generic 'condition not met' often for this too
@@ -161,77 +401,22 @@ class ExchangeHandler:
             raise Exception(f"Failed to set Hedge Mode. Close all active positions/orders for {symbol} on Bitget manually and try again. ({e})")
 
     async def ensure_isolated_margin(self, symbol):
+        """Returns True if the mode was switched, False if it was already set (40789)."""
         try:
             await self.exchange.set_margin_mode('isolated', symbol)
+            return True
         except Exception as e:
              err_str = str(e)
              # 40789: Already in that mode (Bitget might return this if already isolated)
              if "40789" in err_str:
-                 return
+                 return False
              logger.warning(f"Set Isolated Margin Failed: {e}")
              raise Exception(f"Failed to set Isolated Margin. Close positions for {symbol} and try again. ({e})")
 
     async def get_active_tp_sl(self, symbol):
-        """Fetches active SL and TP prices from open orders AND plan orders (Supports Partial TPs)."""
+        """Active SL and TP trigger prices (Supports Partial TPs), served from the bulk plan-order index."""
         try:
-            sl_prices = []
-            tp_prices = []
-            
-            try:
-                orders = await self.exchange.fetch_open_orders(symbol)
-                for o in orders:
-                    price = None
-                    if 'stopPrice' in o and o['stopPrice']: price = float(o['stopPrice'])
-                    elif 'triggerPrice' in o and o['triggerPrice']: price = float(o['triggerPrice'])
-                    
-                    if not price: continue
-
-                    params = o.get('info', {})
-                    plan_type = params.get('planType')
-                    
-                    if plan_type == 'loss_plan':
-                        if price not in sl_prices: sl_prices.append(price)
-                    elif plan_type == 'profit_plan':
-                        if price not in tp_prices: tp_prices.append(price)
-            except Exception as e:
-                logger.warning(f"Error fetching open orders for {symbol}: {e}")
-
-            try:
-                if hasattr(self.exchange, 'privateMixGetV2MixOrderOrdersPlanPending'):
-                    raw_symbol = symbol.replace("/", "").replace(":", "").split("USDT")[0] + "USDT"
-                    
-                    params = {
-                        "symbol": raw_symbol,
-                        "productType": "USDT-FUTURES",
-                        "planType": "profit_loss" # Crucial!
-                    }
-                    # logger.info(f"Fetching Plan Orders for {raw_symbol}...")
-                    response = await self.exchange.privateMixGetV2MixOrderOrdersPlanPending(params)
-                    
-                    if response['code'] == '00000':
-                        data = response['data']['entrustedList']
-                        # logger.info(f"Found {len(data)} Plan Orders for {raw_symbol}")
-                        for o in data:
-                            plan_type = o.get('planType')
-                            price = float(o.get('triggerPrice')) if o.get('triggerPrice') else 0.0
-                            
-                            if price > 0:
-                                if plan_type == 'loss_plan':
-                                    if price not in sl_prices: sl_prices.append(price)
-                                elif plan_type == 'profit_plan':
-                                    if price not in tp_prices: tp_prices.append(price)
-                    else:
-                        logger.warning(f"Plan Order API Error for {raw_symbol}: {response}")
-            except Exception as e:
-                logger.warning(f"Error fetching plan orders for {symbol}: {e}")
-            except Exception as e:
-                logger.warning(f"Error fetching plan orders for {symbol}: {e}")
-
-            # Sort for display
-            sl_prices.sort()
-            tp_prices.sort()
-            
-            return tp_prices, sl_prices
+            return await self.plans.get_tp_sl(self.symbols.raw_id(symbol))
         except Exception as e:
             logger.warning(f"Could not fetch SL/TP for {symbol}: {e}")
             return [], []
@@ -296,40 +481,32 @@ class ExchangeHandler:
 
     async def get_tickers(self, symbols):
         """Fetches current prices and 24h change for a list of symbols."""
+        if self.market_stream:
+            streamed = {s: self.market_stream.get_ticker(s) for s in symbols}
+            if all(streamed.values()):
+                return {s: {'last': t['last'], 'percentage': t['percentage'], 'daily_pct': t['daily_pct']} for s, t in streamed.items()}
+            self.market_stream.subscribe(symbols)
         try:
             # Fetch ALL Future tickers to ensure we get the right productType data
             # Passing specific symbols to fetch_tickers with params can be flaky in CCXT/Bitget
-            tickers = await self.exchange.fetch_tickers(params={'productType': 'USDT-FUTURES'})
+            tickers = await self.reads.get(("tickers",), lambda: self.exchange.fetch_tickers(params={'productType': 'USDT-FUTURES'}), READ_TTL_TICKERS)
+            
+            if not self.symbols.loaded:
+                self.symbols.load(self.exchange.markets, source="ccxt")
+            self.symbols.overlay(self.exchange.markets)
             
             results = {}
+            by_id = None
             for s in symbols:
-                # CCXT usually normalizes Bitget Futures symbols to 'BTC/USDT:USDT'
-                # But our input 'symbols' are 'BTCUSDT'.
-                # We need to match loose or strict.
-                
-                # Check direct match or normalized match
-                data = None
+                # CCXT keys Bitget Futures tickers as 'BTC/USDT:USDT', our inputs are 'BTCUSDT'
+                # 1. Direct match, 2. Registry (BTCUSDT -> BTC/USDT:USDT)
+                data = tickers.get(s) or tickers.get(self.symbols.unified(s))
                 
-                # Try finding valid ticker
-                # 1. Direct match (unlikely if CCXT loaded markets)
-                if s in tickers:
-                    data = tickers[s]
-                
-                # 2. CCXT Normalized match (BTC/USDT:USDT)
-                if not data:
-                    # Construct CCXT format: IPUSDT -> IP/USDT:USDT
-                    base = s.replace("USDT", "")
-                    ccxt_sym = f"{base}/USDT:USDT"
-                    if ccxt_sym in tickers:
-                        data = tickers[ccxt_sym]
-                        
-                # 3. Raw match (if strict mode off)
+                # 3. Raw-id index over the ticker keys (built once, only if needed)
                 if not data:
-                    # Scan keys
-                    for k, v in tickers.items():
-                        if k.replace("/", "").replace(":", "") == s or k.replace("/", "").split(":")[0] == s:
-                             data = v
-                             break
+                    if by_id is None:
+                        by_id = {self.symbols.raw_id(k): v for k, v in tickers.items()}
+                    data = by_id.get(self.symbols.raw_id(s))
                 
                 if data:
                     # Rolling 24h Change
@@ -361,60 +538,29 @@ class ExchangeHandler:
     async def validate_symbol(self, input_symbol):
         """
         Validates and corrects the symbol for Bitget Futures.
-        Handles prefixes like '1000' for memecoins (e.g., BONK -> 1000BONKUSDT).
+        Handles prefixes like '1000' for memecoins (e.g., BONK -> 1000BONKUSDT), nicknames
+        (GOLD -> XAUUSDT) and unambiguous truncated names via the registry's alias/trie index.
         """
         try:
             # clean input
             input_clean = input_symbol.upper().replace("$", "").replace("#", "").strip()
-            if not input_clean.endswith("USDT") and not input_clean.endswith("USD"):
-                base = input_clean
-            else:
-                base = input_clean.replace("USDT", "").replace("USD", "")
+            base = input_clean
+            # Strip the quote suffix only (USDCUSDT -> USDC, not C)
+            for quote in ("USDT", "USD"):
+                if input_clean.endswith(quote) and len(input_clean) > len(quote):
+                    base = input_clean[:-len(quote)]
+                    break
             
             logger.info(f"🔎 Validating symbol for input: '{input_symbol}' (Base: '{base}')")
             
-            # Common formats to try
-            potential_symbols = [
-                f"{base}USDT",           # Standard: BTCUSDT
-                f"1000{base}USDT",       # Memecoins: 1000BONKUSDT, 10 PEPEUSDT
-                f"k{base}USDT",          # Kilo prefix
-            ]
-            
-            # Ensure markets are loaded
-            if not self.exchange.markets:
-                logger.info("📡 Loading exchange markets...")
-                await self.exchange.load_markets()
-                
-            # Filter for USDT Futures (Linear Swap) ONLY
-            futures_markets = [
-                m for m in self.exchange.markets.values() 
-                if m.get('swap') and m.get('linear') and m.get('quote') == 'USDT'
-            ]
-            
-            futures_map = {m['id']: m for m in futures_markets}
-            
-            for sym in potential_symbols:
-                # 1. Check strict ID match in Futures list
-                if sym in futures_map:
-                    logger.info(f"✅ Found exact match for '{sym}'")
-                    return sym
-                    
-                # 2. Check CCXT Symbol match (e.g. 1000BONK/USDT:USDT)
-                s_base = sym.replace("USDT", "")
-                ccxt_target = f"{s_base}/USDT:USDT"
-                
-                if ccxt_target in self.exchange.markets:
-                    m = self.exchange.markets[ccxt_target]
-                    if m.get('swap') and m.get('linear'):
-                        logger.info(f"✅ Found CCXT match '{ccxt_target}' -> ID: '{m['id']}'")
-                        return m['id']
+            # Ensure markets are loaded (the registry indexes USDT Futures / Linear Swap ONLY)
+            await self.load_markets()
             
-            # 3. Last Ditch: Prefix search
-            # If input is TAO, search for anything containing TAO inside futures_map
-            for mid in futures_map.keys():
-                if base in mid and ("USDT" in mid or "USD" in mid):
-                    logger.info(f"✅ Found fuzzy match: '{mid}' for base '{base}'")
-                    return mid
+            # Exact id, then alias (1000BONK for BONK, XAU for GOLD), then a unique prefix
+            match, how = self.symbols.resolve(base)
+            if match:
+                logger.info(f"✅ Found {how} match '{match}' for base '{base}'")
+                return match
             
             logger.warning(f"⚠️ Could not find a matching future for '{input_symbol}'. Falling back to original logic.")
             return f"{base}USDT"
@@ -423,6 +569,7 @@ class ExchangeHandler:
             logger.error(f"❌ Symbol validation failed for {input_symbol}: {e}")
             return f"{input_symbol.upper().replace('$', '').replace('#', '').strip()}USDT"
 
+    @in_lane("order")
     async def place_order(self, symbol, side, amount, leverage, sl_price=None, tp_price=None, price=None, order_type='market'):
         # 1. Check Cache to see if we can skip configuration calls
         pos_side = 'long' if side == 'buy' else 'short'
@@ -431,25 +578,55 @@ class ExchangeHandler:
         
         # Track what we actually do for traceability
         actions_taken = []
+        timings = {}
+        start = time.perf_counter()
 
-        # 2. Ensure Hedge Mode & Isolated Margin (Cache check)
-        if cached.get('marginMode') != 'isolated' or cached.get('hedgeMode') is not True:
-            await self.ensure_hedge_mode(symbol)
-            await self.ensure_isolated_margin(symbol)
-            self._cache.setdefault(cache_key, {})['hedgeMode'] = True
-            self._cache[cache_key]['marginMode'] = 'isolated'
-            actions_taken.append("Set Hedge/Isolated")
-        else:
+        async def timed(step, coro):
+            t0 = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                timings[step] = (time.perf_counter() - t0) * 1000
+
+        # 2. Configuration stage (only the uncached parts). Hedge mode is account-wide and
+        # independent of the symbol's margin mode, so both go out together; leverage follows
+        # the margin mode it applies to. 40789 ("already set") counts as a cache fill.
+        need_hedge = cached.get('hedgeMode') is not True
+        need_margin = cached.get('marginMode') != 'isolated'
+        need_lev = bool(leverage) and cached.get('leverage') != leverage
+
+        # Steps return their actions; they are appended after the gather in a fixed order
+        # (hedge, margin, leverage) rather than in completion order
+        async def hedge_step():
+            switched = await timed('hedge', self.ensure_hedge_mode(symbol))
+            self._remember_config(cache_key, hedgeMode=True)
+            return ["Set Hedge" if switched else "Hedge (Already Set)"]
+
+        async def margin_and_leverage_step():
+            actions = []
+            if need_margin:
+                switched = await timed('margin', self.ensure_isolated_margin(symbol))
+                self._remember_config(cache_key, marginMode='isolated')
+                actions.append("Set Isolated" if switched else "Isolated (Already Set)")
+            if need_lev:
+                if await timed('leverage', self.set_leverage(symbol, leverage)):
+                    self._remember_config(cache_key, leverage=leverage)
+                actions.append(f"Set Lev {leverage}x")
+            return actions
+
+        if need_hedge or need_margin or need_lev:
+            steps = [hedge_step()] if need_hedge else []
+            steps.append(margin_and_leverage_step())
+            results = await timed('config', asyncio.gather(*steps, return_exceptions=True))
+            errors = [r for r in results if isinstance(r, Exception)]
+            if errors:
+                raise errors[0]
+            for actions in results:
+                actions_taken.extend(actions)
+        if not (need_hedge or need_margin):
             actions_taken.append("Skipped Modes (Cached)")
-        
-        # 3. Set leverage (if provided and different from cache)
-        if leverage:
-            if cached.get('leverage') != leverage:
-                await self.set_leverage(symbol, leverage)
-                self._cache.setdefault(cache_key, {})['leverage'] = leverage
-                actions_taken.append(f"Set Lev {leverage}x")
-            else:
-                actions_taken.append(f"Skipped Lev (Cached {leverage}x)")
+        if leverage and not need_lev:
+            actions_taken.append(f"Skipped Lev (Cached {leverage}x)")
         
         params = {}
         params['posSide'] = pos_side
@@ -464,12 +641,19 @@ class ExchangeHandler:
             params['takeProfit'] = {'triggerPrice': tp_price, 'type': 'market'}
         
         if order_type.lower() == 'limit':
-            order = await self.exchange.create_order(symbol, 'limit', side, amount, price, params=params)
+            order = await timed('order', self.exchange.create_order(symbol, 'limit', side, amount, price, params=params))
         else:
-            order = await self.exchange.create_order(symbol, 'market', side, amount, params=params)
+            order = await timed('order', self.exchange.create_order(symbol, 'market', side, amount, params=params))
+        self.reads.invalidate("positions", "balance", "plans")
+
+        # Per-step latency breakdown, reported with the actions
+        timings['total'] = (time.perf_counter() - start) * 1000
+        self.last_order_timings = timings
+        actions_taken.append("Timing: " + " | ".join(f"{k} {v:.0f}ms" for k, v in timings.items()))
             
         return order, actions_taken
 
+    @in_lane("order")
     async def close_position(self, symbol):
         """Closes the entire position for a symbol (Supports Hedge & One-Way via Native V2 API)."""
         try:
@@ -488,7 +672,7 @@ class ExchangeHandler:
                 margin_mode = 'crossed'
             
             # Bitget V2 API requires the raw symbol (e.g., ETHUSDT)
-            raw_symbol = symbol.replace("/", "").replace(":", "").split("USDT")[0] + "USDT"
+            raw_symbol = self.symbols.raw_id(symbol)
             
             logger.info(f"Closing {side.upper()} position for {symbol} (Size: {size}, Margin: {margin_mode})...")
             
@@ -514,6 +698,7 @@ class ExchangeHandler:
                 res = await self.exchange.privateMixPostV2MixOrderPlaceOrder(params)
                 if res.get('code') == '00000':
                     logger.info(f"Closed {symbol} successfully via V2 API (Hedge Mode). Order ID: {res['data']['orderId']}")
+                    self.reads.invalidate("positions", "balance", "plans")
                     return True
                 else:
                     raise Exception(str(res))
@@ -539,6 +724,7 @@ class ExchangeHandler:
                         res_oneway = await self.exchange.privateMixPostV2MixOrderPlaceOrder(params)
                         if res_oneway.get('code') == '00000':
                             logger.info(f"Closed {symbol} successfully via V2 API (One-Way Mode). Order ID: {res_oneway['data']['orderId']}")
+                            self.reads.invalidate("positions", "balance", "plans")
                             return True
                         else:
                             logger.error(f"One-Way Mode Close failed: {res_oneway}")
@@ -554,6 +740,7 @@ class ExchangeHandler:
             logger.error(f"Exception closing position for {symbol}: {e}")
             return False
             
+    @in_lane("order")
     async def replace_limit_order(self, symbol, order, new_sl=None, new_tp=None, risk_manager=None):
         """Cancels an existing limit order and places a new one with updated params. Includes Rollback."""
         # 1. Store Original State for Rollback
@@ -658,12 +845,14 @@ class ExchangeHandler:
                 logger.critical(f"FATAL: Rollback failed! Order {original_id} lost. Error: {rollback_e}")
                 return False, f"CRITICAL: Order Lost! Update failed and Rollback failed. ({str(rollback_e)})", f"CRITICAL: Order Lost! Update failed and Rollback failed. ({str(rollback_e)})"
 
+    @in_lane("order")
     async def cancel_all_orders(self, symbol):
         """Cancels all open orders (Limit, TP, SL) for a specific symbol."""
         try:
             resolved_symbol = await self.resolve_symbol(symbol)
             # cancel_all_orders is supported by CCXT for Bitget
             await self.exchange.cancel_all_orders(resolved_symbol)
+            self.plans.invalidate()
             logger.info(f"Cancelled all open orders for {symbol} ({resolved_symbol})")
             return True
         except Exception as e:
@@ -674,173 +863,167 @@ class ExchangeHandler:
             logger.error(f"Failed to cancel orders for {symbol}: {e}")
             return False
 
+    @in_lane("order")
     async def cancel_order(self, symbol, order_id):
         """Cancels a specific order by ID."""
         try:
             resolved_symbol = await self.resolve_symbol(symbol)
             await self.exchange.cancel_order(order_id, resolved_symbol)
+            self.plans.invalidate()
             logger.info(f"Cancelled order {order_id} for {symbol} ({resolved_symbol})")
             return True
         except Exception as e:
             logger.error(f"Failed to cancel order {order_id} for {symbol}: {e}")
             return False
 
-    async def update_tp(self, symbol, new_tp):
+    async def _replace_tpsl(self, symbol, kind, new_price, pos, plans=None):
+        """
+        Replaces the position's TP or SL plan orders with one new plan.
+        Pending plans come from `plans` or the plan index (no per-type queries); the old ones are
+        cancelled with one batch request per planType. TP: place + cancels run concurrently.
+        SL: the new plan is placed first and the old ones cancelled once it exists. Only if Bitget
+        rejects it because the old plans still hold the position size are they cancelled first and
+        the placement retried; any other rejection keeps the old SL and reports the failure.
+        """
+        timings = {}
+        start = time.perf_counter()
+        raw_symbol = self.symbols.raw_id(symbol)
+        side = pos['side'].lower()
+        label = kind.upper()
+
+        if plans is None:
+            step = time.perf_counter()
+            plans = await self.plans.get_orders(raw_symbol)
+            timings['plans'] = (time.perf_counter() - step) * 1000
+
+        cancel_types = ('loss_plan', 'pos_loss') if kind == 'sl' else ('profit_plan', 'pos_profit')
+        old = {}
+        for o in plans:
+            if o['planType'] in cancel_types:
+                old.setdefault(o['planType'], []).append(o['orderId'])
+
+        # FORMAT PRICE
+        trigger_price = self.exchange.price_to_precision(symbol, new_price)
+        place_params = {
+            "symbol": raw_symbol,
+            "productType": "USDT-FUTURES",
+            "marginCoin": "USDT",
+            "triggerPrice": trigger_price,
+            "triggerType": "market_price",
+            "planType": "loss_plan" if kind == 'sl' else "profit_plan",
+            "holdSide": "long" if side == "long" else "short",
+            "size": str(pos['contracts'])
+        }
+
+        async def place():
+            step = time.perf_counter()
+            try:
+                await self.exchange.privateMixPostV2MixOrderPlaceTpslOrder(place_params)
+                return None
+            except Exception as e:
+                return e
+            finally:
+                timings['place'] = timings.get('place', 0.0) + (time.perf_counter() - step) * 1000
+
+        async def cancel(plan_type, order_ids):
+            # Batch cancel: one request per planType (orderIdList)
+            try:
+                await self.exchange.privateMixPostV2MixOrderCancelPlanOrder({
+                    "symbol": raw_symbol,
+                    "productType": "USDT-FUTURES",
+                    "marginCoin": "USDT",
+                    "planType": plan_type,
+                    "orderIdList": [{"orderId": oid} for oid in order_ids]
+                })
+                logger.info(f"Cancelled {len(order_ids)} old {label} order(s) ({plan_type}) for {symbol}")
+            except Exception as e:
+                logger.warning(f"Error cancelling old {label}s ({plan_type}): {e}")
+
+        async def cancel_old():
+            step = time.perf_counter()
+            await asyncio.gather(*(cancel(pt, ids) for pt, ids in old.items()))
+            timings['cancel'] = (time.perf_counter() - step) * 1000
+
+        kept_old = False
+        if kind == 'sl':
+            error = await place()
+            # 43023 / "exceeds position size": the old plans block the new one, so they have to go first
+            size_conflict = error is not None and ("43023" in str(error) or "position size" in str(error).lower())
+            if error is None or size_conflict:
+                await cancel_old()
+            else:
+                kept_old = bool(old)
+        else:
+            error, _ = await asyncio.gather(place(), cancel_old())
+        if error and old and not kept_old:
+            logger.warning(f"New {label} rejected while old plans were live ({error}). Retrying after cancel...")
+            error = await place()
+        self.plans.invalidate()
+
+        timings['total'] = (time.perf_counter() - start) * 1000
+        self.tpsl_latency.record(timings['total'])
+        self.last_tpsl_timings = {'symbol': symbol, 'kind': kind, **timings}
+        logger.info(f"⏱️ {label} replace {symbol}: " + " | ".join(f"{k} {v:.0f}ms" for k, v in timings.items()) +
+                    f" ({sum(len(ids) for ids in old.values())} old plan(s))")
+
+        if error:
+            logger.error(f"Failed to execute PlaceTpslOrder ({label}): {error}")
+            if kept_old:
+                return False, f"Failed to place {label} (previous {label} kept): {error}"
+            return False, f"Failed to place {label}: {error}"
+        logger.info(f"Placed new {label} order for {symbol} at {trigger_price} (Size: {pos['contracts']})")
+        return True, "Success"
+
+    async def _position_or_limit_order(self, symbol, pos):
+        """Returns (position, None) or, without a position, (None, open limit order or None)."""
+        if pos is None:
+            pos = await self.get_position(symbol)
+        if pos:
+            return pos, None
+        resolved_symbol = await self.resolve_symbol(symbol)
+        orders = await self.exchange.fetch_open_orders(resolved_symbol)
+        return None, next((o for o in orders if o['type'] == 'limit'), None)
+
+    @in_lane("risk")
+    async def update_tp(self, symbol, new_tp, pos=None, plans=None):
+        """Moves the TP. `pos` / `plans` (plan index records) skip re-fetching state the caller already has."""
         try:
             # 1. Get current position to know side and SIZE
-            pos = await self.get_position(symbol)
+            pos, limit_order = await self._position_or_limit_order(symbol, pos)
             if not pos:
-                # Fallback: Check for Open Limit Order to Update (Cancel & Replace)
-                resolved_symbol = await self.resolve_symbol(symbol)
-                orders = await self.exchange.fetch_open_orders(resolved_symbol)
-                limit_order = next((o for o in orders if o['type'] == 'limit'), None)
-                
+                # Fallback: Open Limit Order to Update (Cancel & Replace)
                 if limit_order:
+                    resolved_symbol = await self.resolve_symbol(symbol)
                     logger.info(f"Found Open Limit Order {limit_order['id']} for {symbol} ({resolved_symbol}). Updating TP via Replace.")
                     return await self.replace_limit_order(resolved_symbol, limit_order, new_tp=new_tp)
 
                 logger.warning(f"Cannot update TP for {symbol}: No active position.")
                 return False, "No active position or open limit order found."
 
-            side = pos['side'].lower()
-            size = pos['contracts']
-            raw_symbol = symbol.replace("/", "").replace(":", "").split("USDT")[0] + "USDT"
-            
-            # FORMAT PRICE
-            trigger_price = self.exchange.price_to_precision(symbol, new_tp)
-
-            # 2. Cancel Existing TP Orders (Cleaned up payload for V2 API)
-            for p_type in ['profit_plan', 'pos_profit', 'profit_loss']:
-                try:
-                    if hasattr(self.exchange, 'privateMixGetV2MixOrderOrdersPlanPending'):
-                        params = {
-                            "symbol": raw_symbol,
-                            "productType": "USDT-FUTURES",
-                            "planType": p_type
-                        }
-                        resp = await self.exchange.privateMixGetV2MixOrderOrdersPlanPending(params)
-
-                        if resp.get('code') == '00000' and resp.get('data') and 'entrustedList' in resp['data']:
-                            for o in resp['data']['entrustedList']:
-                                oid = o['orderId']
-                                actual_type = o.get('planType', p_type)
-                                
-                                # Safety: don't cancel SLs by accident
-                                if actual_type in ['loss_plan', 'pos_loss']:
-                                    continue
-                                    
-                                # Cancel
-                                cancel_params = {
-                                    "symbol": raw_symbol,
-                                    "productType": "USDT-FUTURES",
-                                    "orderId": oid,
-                                    "planType": actual_type
-                                }
-                                await self.exchange.privateMixPostV2MixOrderCancelPlanOrder(cancel_params)
-                                logger.info(f"Cancelled old TP order {oid} ({actual_type}) for {symbol}")
-                except Exception as e:
-                    logger.warning(f"Error cancelling old TPs ({p_type}): {e}")
-
-            # 3. Place New TP using PlaceTpslOrder
-            try:
-                params = {
-                    "symbol": raw_symbol,
-                    "productType": "USDT-FUTURES",
-                    "marginCoin": "USDT",
-                    "triggerPrice": trigger_price,
-                    "triggerType": "market_price",
-                    "planType": "profit_plan",
-                    "holdSide": "long" if side == "long" else "short",
-                    "size": str(size)
-                }
-                
-                await self.exchange.privateMixPostV2MixOrderPlaceTpslOrder(params)
-                logger.info(f"Placed new TP order for {symbol} at {trigger_price} (Size: {size})")
-                return True, "Success"
-                
-            except Exception as e:
-                logger.error(f"Failed to execute PlaceTpslOrder (TP): {e}")
-                return False, f"Failed to place TP: {e}"
+            # 2. Replace the TP plan(s)
+            return await self._replace_tpsl(symbol, 'tp', new_tp, pos, plans)
 
         except Exception as e:
             logger.error(f"Update TP failed: {e}")
             return False, str(e)
 
-    async def update_sl(self, symbol, new_sl):
+    @in_lane("risk")
+    async def update_sl(self, symbol, new_sl, pos=None, plans=None):
+        """Moves the SL. `pos` / `plans` (plan index records) skip re-fetching state the caller already has."""
         try:
             # 1. Get current position to know side and SIZE
-            pos = await self.get_position(symbol)
+            pos, limit_order = await self._position_or_limit_order(symbol, pos)
             if not pos:
-                 # Fallback: Check for Open Limit Order
-                resolved_symbol = await self.resolve_symbol(symbol)
-                orders = await self.exchange.fetch_open_orders(resolved_symbol)
-                limit_order = next((o for o in orders if o['type'] == 'limit'), None)
-                
+                 # Fallback: Open Limit Order
                 if limit_order:
+                    resolved_symbol = await self.resolve_symbol(symbol)
                     logger.info(f"Found Limit Order {limit_order['id']} for {symbol}. updating SL via Replace.")
                     return await self.replace_limit_order(resolved_symbol, limit_order, new_sl=new_sl)
 
                 return False, "No active position/order found."
 
-            side = pos['side'].lower()
-            size = pos['contracts']
-            raw_symbol = symbol.replace("/", "").replace(":", "").split("USDT")[0] + "USDT"
-            
-            # FORMAT PRICE
-            trigger_price = self.exchange.price_to_precision(symbol, new_sl)
-            
-            # 2. Cancel Old SLs (Cleaned up payload for V2 API)
-            for p_type in ['loss_plan', 'pos_loss', 'normal_plan', 'profit_loss']:
-                try:
-                    if hasattr(self.exchange, 'privateMixGetV2MixOrderOrdersPlanPending'):
-                        params = {
-                            "symbol": raw_symbol,
-                            "productType": "USDT-FUTURES",
-                            "planType": p_type
-                        }
-                        resp = await self.exchange.privateMixGetV2MixOrderOrdersPlanPending(params)
-
-                        if resp.get('code') == '00000' and resp.get('data') and 'entrustedList' in resp['data']:
-                            for o in resp['data']['entrustedList']:
-                                oid = o['orderId']
-                                actual_type = o.get('planType', p_type)
-                                
-                                # Safety: don't cancel TPs by accident
-                                if actual_type in ['profit_plan', 'pos_profit']:
-                                    continue
-                                
-                                # Cancel
-                                cancel_params = {
-                                    "symbol": raw_symbol,
-                                    "productType": "USDT-FUTURES",
-                                    "orderId": oid,
-                                    "planType": actual_type
-                                }
-                                await self.exchange.privateMixPostV2MixOrderCancelPlanOrder(cancel_params)
-                                logger.info(f"Cancelled old SL order {oid} ({actual_type}) for {symbol}")
-                except Exception as e:
-                    logger.warning(f"Error cancelling old SLs ({p_type}): {e}")
-
-            # 3. Place New SL using PlaceTpslOrder
-            try:
-                params = {
-                    "symbol": raw_symbol,
-                    "productType": "USDT-FUTURES",
-                    "marginCoin": "USDT",
-                    "triggerPrice": trigger_price,
-                    "triggerType": "market_price",
-                    "planType": "loss_plan",
-                    "holdSide": "long" if side == "long" else "short",
-                    "size": str(size)
-                }
-                
-                await self.exchange.privateMixPostV2MixOrderPlaceTpslOrder(params)
-                logger.info(f"Placed new SL order for {symbol} at {trigger_price} (Size: {size})")
-                return True, "Success"
-                
-            except Exception as e:
-                 logger.error(f"Failed to execute PlaceTpslOrder (SL): {e}")
-                 return False, f"Failed to place SL: {e}"
+            # 2. Replace the SL plan(s): new SL first, then the old ones go
+            return await self._replace_tpsl(symbol, 'sl', new_sl, pos, plans)
                  
         except Exception as e:
             logger.error(f"Update SL failed: {e}")
@@ -848,6 +1031,11 @@ class ExchangeHandler:
 
     async def close(self):
         """Safely closes the CCXT exchange session to free up resources."""
+        for stream in (getattr(self, 'market_stream', None), getattr(self, 'private_stream', None)):
+            if stream:
+                await stream.stop()
+        if getattr(self, 'rest', None):
+            await self.rest.close()
         if hasattr(self, 'exchange') and self.exchange:
             await self.exchange.close()
             logger.info("Closed CCXT exchange session.")
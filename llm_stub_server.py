@@ -0,0 +1,111 @@
+"""
+Local stand-in for the Gemini `generateContent` REST endpoint (no network needed).
+
+Answers with the labelled result of the corpus message found in the prompt (IGNORE if none;
+one result per message for batch prompts),
+with configurable latency, jitter and error injection. Point the bot at it with
+GEMINI_BASE_URL=http://127.0.0.1:<port>/
+
+Usage: python llm_stub_server.py [--port 8765] [--latency-ms 800] [--jitter-ms 400] [--error-rate 0.05]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# The parser prompt quotes the message as `Message: "<text>"` followed by a blank line
+RE_PROMPT_MESSAGE = re.compile(r'Message: "(.*?)"\n\n', re.S)
+# Batch prompts (backlog catch-up) number them: `Message 3: "<text>"` + `Context 3 ...`
+RE_BATCH_MESSAGE = re.compile(r'Message (\d+): "(.*?)"\nContext \1 ', re.S)
+
+class LLMStubServer:
+    def __init__(self, corpus, latency_ms=800, jitter_ms=400, error_rate=0.0, error_status=503, seed=None):
+        self.labels = {r["text"]: r.get("expected", {"type": "IGNORE"}) for r in corpus}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "errors": 0}
+        self._runner = None
+        self.port = None
+
+    def _answer_for(self, prompt):
+        batch = RE_BATCH_MESSAGE.findall(prompt)
+        if batch:
+            return {"results": [dict(self.labels.get(text, {"type": "IGNORE"}), index=int(i)) for i, text in batch]}
+        m = RE_PROMPT_MESSAGE.search(prompt)
+        return self.labels.get(m.group(1) if m else None, {"type": "IGNORE"})
+
+    async def handle_generate(self, request):
+        self.stats["requests"] += 1
+        body = await request.json()
+        prompt = "".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+
+        delay = max(0.0, self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+
+        if self.random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return web.json_response({"error": {"code": self.error_status, "message": "Injected stub error", "status": "UNAVAILABLE"}}, status=self.error_status)
+
+        answer = json.dumps(self._answer_for(prompt))
+        prompt_tokens = max(1, len(prompt) // 4)
+        answer_tokens = max(1, len(answer) // 4)
+        return web.json_response({
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": answer}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": answer_tokens,
+                "totalTokenCount": prompt_tokens + answer_tokens,
+            },
+            "modelVersion": request.match_info["model"],
+        })
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application()
+        app.router.add_post("/{version}/models/{model}:generateContent", self.handle_generate)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"LLM stub listening on http://{host}:{self.port}/")
+        return f"http://{host}:{self.port}/"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+async def _serve(args):
+    stub = LLMStubServer(load_corpus(args.corpus), args.latency_ms, args.jitter_ms, args.error_rate, args.error_status)
+    url = await stub.start(port=args.port)
+    print(f"Gemini stub ready: GEMINI_BASE_URL={url}")
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local Gemini generateContent stand-in")
+    ap.add_argument("--corpus", default="corpus/channel_corpus.jsonl")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=800)
+    ap.add_argument("--jitter-ms", type=float, default=400)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--error-status", type=int, default=503)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(ap.parse_args()))
+    except KeyboardInterrupt:
+        pass
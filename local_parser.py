@@ -0,0 +1,218 @@
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# --- Compiled grammar (built once at import) ---
+# Numbers: 95000 | 95,000 | 0.00378 | 1.2 (commas only as thousands separators; never part of 2ND / 2%)
+NUM = r'(\d+(?:,\d{3})*(?:\.\d+)?)(?![\w%])'
+SEP = r'\s*(?:[:=@\-]|TO|AT)?\s*'
+
+RE_DIRECTION = re.compile(r'\b(LONG|SHORT)\b')
+RE_CALL_WORDS = re.compile(r'\b(?:LONG|SHORT|BUY|SELL)\b')
+RE_AS_LONG_AS = re.compile(r'\bAS\s+LONG\s+AS\b')
+RE_SYMBOL_TAG = re.compile(r'[#$]([A-Z][A-Z0-9]{1,14})\b')
+RE_WORD = re.compile(r'[A-Z0-9]+')
+RE_COIN = re.compile(r'[A-Z][A-Z0-9]{1,14}')
+RE_ENTRY = re.compile(r'\b(?:ENTRY|ENTER|EP)\b' + SEP + r'(?:(?:NOW|HERE|CMP|ZONE|PRICE)\s*[:=@\-]?\s*)?' + NUM + r'(?:\s*(?:-|–|~|TO)\s*' + NUM + r')?')
+RE_SL = re.compile(r'\b(?:SL|STOP\s*LOSS|STOPLOSS|STOP|INVALIDATION)\b' + SEP + NUM)
+RE_TP_LABEL = re.compile(r'(?:\b(?:TPS?|TARGETS?|OBJECTIVES?|T(?=\d))\d*(?!\d)|🎯)' + SEP + NUM + r'((?:\s*[/,|&]\s*' + NUM + r')*)')
+RE_NUMBER = re.compile(NUM)
+RE_LEVERAGE = re.compile(r'\b(?:LEVERAGE|LEV)\s*[:=]?\s*(\d+(?:\.\d+)?)\s*X?\b|\b(\d+(?:\.\d+)?)\s*X\b')
+RE_LIMIT = re.compile(r'\bLIMIT\b')
+RE_IDEA = re.compile(r'\b(?:IDEA|OBSERVATION|WATCHING|OPINION)\b')
+
+# Update grammar (PROMPT_TEMPLATE rules 1-8, 12)
+RE_SL_SPECIAL = re.compile(
+    r'\b(?:MOVE\s+)?(?:SL|STOP\s*LOSS|STOPLOSS|STOP)\s*(?:TO|AT|@)?\s*(ENTRY|BE|BREAK\s*EVEN|BREAKEVEN|LIQUIDATION|LIQ)\b'
+    r'|\b(BREAK\s*EVEN|BREAKEVEN)\b'
+)
+RE_SL_NUMERIC = re.compile(r'\b(?:MOVE\s+|NEW\s+)?(?:SL|STOP\s*LOSS|STOPLOSS|STOP)\d*(?!\d)\s*(?:TO|AT|@|:|=)?\s*' + NUM)
+RE_TP_NUMERIC = re.compile(
+    r'\b(?:MOVE|CHANGE|NEW|SET)\s+(?:TP|TARGET)\d*(?!\d)\s*(?:TO|AT|@|:|=)?\s*' + NUM +
+    r'|\b(?:TP|TARGET)\d*(?!\d)\s*(?:TO|AT|@)\s*' + NUM
+)
+RE_BOOK_R = re.compile(r'\bBOOKED\s+(\d+(?:\.\d+)?)\s*R\b|\b(\d+(?:\.\d+)?)\s*R\s+BOOKED\b')
+RE_CANCEL = re.compile(r'\bCANCEL(?:LED)?\b|\bDELETE\s+(?:ALL\s+)?ORDERS?\b|\bREMOVE\s+(?:ALL\s+)?LIMITS?\b')
+RE_SL_WORD = re.compile(r'\b(?:SL|STOP\s*LOSS|STOPLOSS|STOP|TRAIL(?:ING)?)\b')
+RE_CLOSE_FULL = re.compile(
+    r"\bMARKET\s+IS\s+SLOW\b|\bDON'?T\s+WANT\s+TO\s+RISK\b|\bCLOSING\s+EARLY\b|\bTOOK\s+PROFITS?\b"
+    r"|\bTOOK\s+TP\d*\b|\bTP\d*\s+(?:HIT|BOOKED)\b|\bPROFITS?\s+SECURED\b"
+)
+
+# Words the grammar does not model: a negation, a status or a condition can flip the meaning
+# ("Don't cancel", "closed in profit", "not yet, wait"), so such messages go to Gemini
+RE_OFF_GRAMMAR = re.compile(
+    r"\b(?:DON['’]?T|DO\s+NOT|NOT|NO|NEVER|WAIT|KEEP|STILL|HOLDING|UNLESS|IF"
+    r"|CLOSED|CLOSING|CANCEL(?:L?ED)?|INVALIDATED|STOPPED|CONFIRMATION)\b"
+)
+# Relative levels ("SL 2% below entry"): the number is not a price
+RE_RELATIVE = re.compile(r'\d\s*%|\bPERCENT\b|\b(?:BELOW|ABOVE|UNDER)\b')
+# Below LOCAL_PARSE_MIN_CONFIDENCE's default, so these parses are re-done by Gemini
+UNSURE_CONFIDENCE = 0.5
+
+# Tokens that can sit next to LONG/SHORT but are never a coin
+NON_SYMBOL_WORDS = {
+    "ENTRY", "ENTER", "LIMIT", "MARKET", "NOW", "HERE", "SL", "TP", "STOP", "TARGET", "ORDER",
+    "POSITION", "TRADE", "SETUP", "SIGNAL", "SCALP", "SWING", "AT", "FROM", "ON", "FOR", "IN",
+    "THE", "A", "AND", "LONG", "SHORT", "WITH", "CMP", "EP", "LEV", "LEVERAGE", "ZONE", "MOCK",
+}
+
+# Short updates are unambiguous; long free text may carry nuance only the LLM picks up.
+MAX_UPDATE_WORDS = 12
+
+def _to_float(raw):
+    return float(raw.replace(",", ""))
+
+def _to_value(raw):
+    """Formats a numeric capture the way Gemini fills `value` (string, no separators)."""
+    return raw.replace(",", "")
+
+def _find_symbol(text):
+    tag = RE_SYMBOL_TAG.search(text)
+    if tag:
+        return tag.group(1)
+    # Otherwise the coin sits right after (`LONG BTC`) or right before (`BTC LONG`) the direction
+    words = RE_WORD.findall(text)
+    for i, word in enumerate(words):
+        if word not in ("LONG", "SHORT"):
+            continue
+        for j in (i + 1, i - 1):
+            if 0 <= j < len(words) and RE_COIN.fullmatch(words[j]) and words[j] not in NON_SYMBOL_WORDS:
+                return words[j]
+    return None
+
+def _normalize_symbol(base):
+    base = base.replace("/", "")
+    return base if base.endswith("USDT") else f"{base}USDT"
+
+def _parse_trade_call(text):
+    """Matches `#BTC LONG ENTRY x SL y TP a/b` style calls. Returns (data, confidence)."""
+    directions = set(RE_DIRECTION.findall(text))
+    entry_m = RE_ENTRY.search(text)
+    sl_m = RE_SL.search(text)
+    if not directions or not entry_m or not sl_m:
+        return None, 0.0
+
+    symbol = _find_symbol(text)
+    if len(directions) > 1 or not symbol:
+        # Mixed directions or no coin: the LLM has to decide
+        return None, 0.3
+
+    tp_list = []
+    for m in RE_TP_LABEL.finditer(text):
+        tp_list.append(_to_float(m.group(1)))
+        tp_list.extend(_to_float(n) for n in RE_NUMBER.findall(m.group(2) or ""))
+
+    leverage = None
+    lev_m = RE_LEVERAGE.search(text)
+    if lev_m:
+        leverage = float(lev_m.group(1) or lev_m.group(2))
+
+    confidence = 1.0
+    # Entry ranges (`ENTRY 95000-95500`) are a judgement call: leave them to Gemini
+    if entry_m.group(2):
+        confidence = 0.6
+    if RE_OFF_GRAMMAR.search(text) or RE_RELATIVE.search(text):
+        confidence = min(confidence, UNSURE_CONFIDENCE)
+
+    data = dict(
+        type="TRADE_CALL",
+        symbol=_normalize_symbol(symbol),
+        direction=directions.pop(),
+        entry=_to_float(entry_m.group(1)),
+        sl=_to_float(sl_m.group(1)),
+        tp=tp_list or None,
+        leverage=leverage,
+        order_type="LIMIT" if RE_LIMIT.search(text) else "MARKET",
+    )
+    return data, confidence
+
+def _parse_update(text):
+    """Matches SL/TP moves, cancels, R bookings and early closes. Returns (data, confidence)."""
+    matches = []  # (action, value, raw_text)
+
+    special = RE_SL_SPECIAL.search(text)
+    if special:
+        word = (special.group(1) or special.group(2)).replace(" ", "")
+        value = {"BREAKEVEN": "BE", "LIQUIDATION": "LIQ"}.get(word, word)
+        matches.append(("MOVE_SL", value, special.group(0)))
+    else:
+        sl_num = RE_SL_NUMERIC.search(text)
+        if sl_num:
+            matches.append(("MOVE_SL", _to_value(sl_num.group(1)), sl_num.group(0)))
+
+    tp_num = RE_TP_NUMERIC.search(text)
+    if tp_num:
+        matches.append(("MOVE_TP", _to_value(tp_num.group(1) or tp_num.group(2)), tp_num.group(0)))
+
+    book = RE_BOOK_R.search(text)
+    if book:
+        matches.append(("BOOK_R", book.group(1) or book.group(2), book.group(0)))
+
+    cancel = RE_CANCEL.search(text)
+    if cancel:
+        matches.append(("CANCEL", None, cancel.group(0)))
+
+    close = RE_CLOSE_FULL.search(text)
+    if close:
+        matches.append(("CLOSE_FULL", None, close.group(0)))
+
+    if not matches:
+        return None, 0.0
+
+    actions = {a for a, _, _ in matches}
+    # Rule 12: "Booked 1R, SL to entry" -> MOVE_SL wins over BOOK_R / CLOSE_FULL
+    if "MOVE_SL" in actions and actions <= {"MOVE_SL", "BOOK_R", "CLOSE_FULL"}:
+        matches = [m for m in matches if m[0] == "MOVE_SL"]
+    elif len(actions) > 1:
+        return None, 0.3
+
+    action, value, raw = matches[0]
+    # "TP1 hit, trail SL" / "SL now at entry": an SL instruction the grammar did not read must
+    # never turn into a close or an R booking (rule 12) -> the LLM decides
+    if action != "MOVE_SL" and RE_SL_WORD.search(text):
+        return None, 0.3
+    tag = RE_SYMBOL_TAG.search(text)
+
+    confidence = 0.95 if len(text.split()) <= MAX_UPDATE_WORDS else 0.6
+    # The cancel / early-close phrases are grammar; any other negation or condition is not
+    rest = RE_CLOSE_FULL.sub(" ", RE_CANCEL.sub(" ", text))
+    if RE_OFF_GRAMMAR.search(rest) or RE_RELATIVE.search(text):
+        confidence = min(confidence, UNSURE_CONFIDENCE)
+    data = dict(
+        type="UPDATE",
+        symbol=_normalize_symbol(tag.group(1)) if tag else None,
+        action=action,
+        value=value,
+        raw_text=raw.strip(),
+    )
+    return data, confidence
+
+def guess_symbol(message_text):
+    """Cheap symbol guess from raw text (e.g. `#BTC LONG` -> BTCUSDT), used to prefetch tickers."""
+    symbol = _find_symbol((message_text or "").upper())
+    return _normalize_symbol(symbol) if symbol else None
+
+def parse_locally(message_text, reply_context=""):
+    """
+    Deterministic fast path for the channel's fixed signal/update shapes.
+    Returns (data, confidence); data holds TradeParsingResult fields (parser.py
+    validates it against the schema) and is None when no grammar matched.
+    """
+    text = RE_AS_LONG_AS.sub('', (message_text or "").upper())
+
+    # Rule 11: opinions/ideas need intent detection -> always LLM
+    if RE_IDEA.search(text):
+        return None, 0.0
+
+    data, confidence = _parse_trade_call(text)
+    if data:
+        return data, confidence
+    if confidence > 0:
+        return None, confidence
+    # Looks like a call the grammar could not read (`BUY ZONE 2950 STOP 2890`): never guess an update
+    if RE_CALL_WORDS.search(text):
+        return None, 0.3
+
+    return _parse_update(text)
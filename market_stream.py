@@ -0,0 +1,123 @@
+import logging
+import time
+from collections import OrderedDict
+from ws_client import BitgetWSClient
+from symbol_registry import SymbolRegistry
+from config import BITGET_WS_PUBLIC_URL, MARKET_WS_MAX_AGE, MARKET_WS_MAX_SYMBOLS, MARKET_WS_PING_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+INST_TYPE = "USDT-FUTURES"
+
+class MarketDataStream(BitgetWSClient):
+    """
+    Live ticker / mark-price book fed by the Bitget V2 public WebSocket (`ticker` channel).
+    Symbols are subscribed on demand (signals, open positions) and the least recently used are
+    dropped beyond `max_symbols`. Reads only return data younger than `max_age` seconds; callers
+    fall back to REST otherwise. Every update is also published as a 'ticker' event on `bus`.
+    Symbols map to instIds through the registry (DegenReborn/USDT:USDT -> DEGENUSDT).
+    """
+    name = "Market stream"
+
+    def __init__(self, url=BITGET_WS_PUBLIC_URL, max_age=MARKET_WS_MAX_AGE, max_symbols=MARKET_WS_MAX_SYMBOLS, ping_interval=MARKET_WS_PING_INTERVAL, bus=None, symbols=None):
+        super().__init__(url, ping_interval)
+        self.symbols = symbols or SymbolRegistry()
+        self.max_age = max_age
+        self.max_symbols = max_symbols
+        self.bus = bus
+
+        self.book = {}  # instId -> {'last', 'mark', 'percentage', 'daily_pct', 'updated'}
+        self.subscribed = OrderedDict()  # instId -> None, LRU order
+        self.stats.update({"hits": 0, "stale": 0, "misses": 0, "updates": 0})
+
+    # --- Subscriptions ---
+
+    def subscribe(self, symbols):
+        """Adds symbols to the stream (no-op for ones already subscribed, which only get touched)."""
+        new = []
+        for symbol in symbols:
+            inst_id = self.symbols.raw_id(symbol)
+            if inst_id in self.subscribed:
+                self.subscribed.move_to_end(inst_id)
+            else:
+                self.subscribed[inst_id] = None
+                new.append(inst_id)
+
+        evicted = []
+        while len(self.subscribed) > self.max_symbols:
+            inst_id, _ = self.subscribed.popitem(last=False)
+            self.book.pop(inst_id, None)
+            evicted.append(inst_id)
+
+        if new:
+            self._send_op("subscribe", new)
+        if evicted:
+            self._send_op("unsubscribe", evicted)
+
+    def _send_op(self, op, inst_ids):
+        # Dropped while disconnected: on_connect re-subscribes everything
+        self.send({"op": op, "args": [{"instType": INST_TYPE, "channel": "ticker", "instId": i} for i in inst_ids]})
+
+    # --- Reads ---
+
+    def get_ticker(self, symbol):
+        """Fresh book entry for symbol, or None (unsubscribed, not yet pushed, or older than max_age)."""
+        inst_id = self.symbols.raw_id(symbol)
+        entry = self.book.get(inst_id)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        if time.monotonic() - entry['updated'] > self.max_age:
+            self.stats["stale"] += 1
+            return None
+        self.stats["hits"] += 1
+        if inst_id in self.subscribed:
+            self.subscribed.move_to_end(inst_id)
+        return entry
+
+    def is_streaming(self, symbol):
+        """True while symbol is subscribed on a connected stream (its pushes arrive live)."""
+        return self.connected.is_set() and self.symbols.raw_id(symbol) in self.subscribed
+
+    def get_price(self, symbol):
+        entry = self.get_ticker(symbol)
+        return entry['last'] if entry else None
+
+    def get_stats(self):
+        lookups = self.stats["hits"] + self.stats["stale"] + self.stats["misses"]
+        return dict(self.stats, connected=self.connected.is_set(), symbols=len(self.subscribed),
+                    hit_rate=(self.stats["hits"] / lookups) if lookups else 0.0)
+
+    # --- Connection ---
+
+    async def on_connect(self, ws):
+        logger.info(f"📡 Market stream connected ({len(self.subscribed)} symbols)")
+        if self.subscribed:
+            self._send_op("subscribe", list(self.subscribed))
+
+    def on_message(self, payload):
+        if payload.get("event") == "error":
+            logger.warning(f"Market stream error: {payload}")
+            return
+        arg = payload.get("arg", {})
+        if arg.get("channel") != "ticker" or "data" not in payload:
+            return
+        now = time.monotonic()
+        for t in payload.get("data") or []:
+            inst_id = t.get("instId") or arg.get("instId")
+            if inst_id not in self.subscribed:
+                continue  # Push in flight while it was being unsubscribed
+            try:
+                self.book[inst_id] = {
+                    'last': float(t['lastPr']),
+                    'mark': float(t.get('markPrice') or t['lastPr']),
+                    'percentage': float(t.get('change24h') or 0) * 100,  # Decimal -> %
+                    'daily_pct': float(t.get('changeUtc24h') or 0) * 100,
+                    'updated': now,
+                }
+                self.stats["updates"] += 1
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Bad ticker push for {inst_id}: {e}")
+                continue
+            if self.bus:
+                self.bus.publish("ticker", (inst_id, self.book[inst_id]))
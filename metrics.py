@@ -0,0 +1,45 @@
+from collections import deque
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended.
+DEFAULT_BUCKETS_MS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram plus a window of recent samples for percentiles.
+    Cheap enough to record on every call.
+    """
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS, window=1000):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.samples = deque(maxlen=window)
+        self.total = 0
+
+    def record(self, latency_ms):
+        self.total += 1
+        self.samples.append(latency_ms)
+        for i, bound in enumerate(self.buckets_ms):
+            if latency_ms <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def percentile(self, pct):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self):
+        return {
+            'count': self.total,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': {f"<={b}ms": c for b, c in zip(self.buckets_ms, self.counts)} | {f">{self.buckets_ms[-1]}ms": self.counts[-1]},
+        }
+
+    def format_line(self):
+        if not self.total:
+            return "no samples"
+        return f"p50 `{self.percentile(50):.0f}ms` | p95 `{self.percentile(95):.0f}ms` | p99 `{self.percentile(99):.0f}ms` (n={self.total})"
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from config import PARSE_CACHE_TTL, PARSE_CACHE_MEMORY_SIZE, PARSE_CACHE_MAX_ROWS
+from database import get_parse_cache, store_parse_cache, prune_parse_cache
+
+logger = logging.getLogger(__name__)
+
+# Prune the SQLite tier every N stores (keeps writes cheap)
+PRUNE_EVERY = 100
+
+def _normalize(text):
+    return re.sub(r'\s+', ' ', (text or "")).strip().casefold()
+
+def make_cache_key(message_text, reply_context, prompt_version):
+    """Content address: sha256 of normalized text + reply context + prompt version."""
+    payload = "\x1f".join([_normalize(message_text), _normalize(reply_context), prompt_version])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ParseCache:
+    """
+    Two-tier cache for Gemini parse results.
+    Tier 1: in-memory LRU (OrderedDict). Tier 2: `parse_cache` table in trading_bot.db.
+    Both tiers honour the same TTL; the DB tier is size-bounded by least-recent hit.
+    """
+    def __init__(self, ttl=PARSE_CACHE_TTL, memory_size=PARSE_CACHE_MEMORY_SIZE, max_rows=PARSE_CACHE_MAX_ROWS, persistent=True):
+        self.ttl = ttl
+        self.persistent = persistent  # False: memory tier only (benchmarks, no DB file)
+        self.memory_size = memory_size
+        self.max_rows = max_rows
+        self._memory = OrderedDict()  # key -> (expires_at, result)
+        self._stores_since_prune = 0
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0}
+
+    def _remember(self, key, result, expires_at):
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = (expires_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    async def get(self, key):
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry:
+            expires_at, result = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return dict(result)
+            del self._memory[key]
+
+        raw = None
+        if self.persistent:
+            try:
+                raw = await get_parse_cache(key, now - self.ttl)
+            except Exception as e:
+                logger.warning(f"Parse cache DB read failed: {e}")
+
+        if raw:
+            result = json.loads(raw)
+            self._remember(key, result, now + self.ttl)
+            self.stats["db_hits"] += 1
+            return dict(result)
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key, result):
+        self._remember(key, dict(result), time.time() + self.ttl)
+        self.stats["stores"] += 1
+        if not self.persistent:
+            return
+        try:
+            await store_parse_cache(key, json.dumps(result))
+            self._stores_since_prune += 1
+            if self._stores_since_prune >= PRUNE_EVERY:
+                self._stores_since_prune = 0
+                await prune_parse_cache(time.time() - self.ttl, self.max_rows)
+        except Exception as e:
+            logger.warning(f"Parse cache DB write failed: {e}")
+
+    def get_stats(self):
+        hits = self.stats["memory_hits"] + self.stats["db_hits"]
+        lookups = hits + self.stats["misses"]
+        return dict(
+            self.stats,
+            hit_rate=(hits / lookups) if lookups else 0.0,
+            memory_entries=len(self._memory),
+        )
@@ -2,16 +2,27 @@
 from google import genai
 # pyrefly: ignore [missing-import]
 from google.genai import types
+import asyncio
+import hashlib
 import logging
 import os
+import time
 from pydantic import BaseModel, Field
 from typing import Optional, List, Literal
-from config import GEMINI_API_KEY
+from config import GEMINI_API_KEY, GEMINI_BASE_URL, GEMINI_MODEL, GEMINI_HEDGE_MODEL, PARSER_HEDGE_DELAY, PARSER_MAX_CONCURRENCY, PARSER_TIMEOUT, LOCAL_PARSE_MIN_CONFIDENCE, PARSER_BATCH_SIZE, REPLY_CONTEXT_MAX_CHARS
+from config import PARSER_BREAKER_WINDOW, PARSER_BREAKER_MIN_CALLS, PARSER_BREAKER_ERROR_RATE, PARSER_BREAKER_SLOW_MS, PARSER_BREAKER_SLOW_RATE, PARSER_BREAKER_OPEN_SECONDS, DEGRADED_MIN_CONFIDENCE
+from local_parser import parse_locally, UNSURE_CONFIDENCE
+from parse_cache import ParseCache, make_cache_key
+from metrics import LatencyHistogram
+from circuit_breaker import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
-# Initialize Client
-client = genai.Client(api_key=GEMINI_API_KEY)
+# Initialize Client (GEMINI_BASE_URL redirects it, e.g. to llm_stub_server.py for offline benchmarks)
+client = genai.Client(
+    api_key=GEMINI_API_KEY,
+    http_options=types.HttpOptions(base_url=GEMINI_BASE_URL) if GEMINI_BASE_URL else None
+)
 
 # Define strict Pydantic Response Schema to enforce compact output
 class TradeParsingResult(BaseModel):
@@ -59,6 +70,12 @@ class TradeParsingResult(BaseModel):
         description="The specific text segment that triggered the update."
     )
 
+class BatchItemResult(TradeParsingResult):
+    index: int = Field(description="The number of the message this result belongs to.")
+
+class BatchParsingResult(BaseModel):
+    results: List[BatchItemResult] = Field(description="Exactly one result per message, in any order.")
+
 PROMPT_TEMPLATE = """
 Analyze the following Telegram message from a crypto trading channel.
 Determine if it is a TRADE_CALL, an UPDATE, or IGNORE.
@@ -82,21 +99,317 @@ Rules:
 12. If a message mentions both "1R" (or profit booking) and "SL to entry" (or BE), prioritize MOVE_SL. Do NOT return BOOK_R or CLOSE_FULL if MOVE_SL is requested in the same message.
 """
 
-async def parse_message(message_text, reply_context=""):
+# Backlog catch-up: several messages per request, same rules (applied to each message independently)
+BATCH_PROMPT_TEMPLATE = """
+Analyze each of the following numbered Telegram messages from a crypto trading channel.
+For EACH message determine if it is a TRADE_CALL, an UPDATE, or IGNORE, and return one result per message with its number as "index".
+Messages are independent: never merge information across messages.
+
+{messages}
+Rules (apply to every message):
+""" + PROMPT_TEMPLATE.split("Rules:", 1)[1]
+
+BATCH_MESSAGE_TEMPLATE = """Message {index}: "{message_text}"
+Context {index} (if reply/edit): {reply_context}
+
+"""
+
+# Changing the prompt or the model invalidates every cached parse
+PROMPT_VERSION = hashlib.sha256((GEMINI_MODEL + PROMPT_TEMPLATE).encode("utf-8")).hexdigest()[:12]
+
+parse_cache = ParseCache()
+
+# Bounded parsing pool: at most PARSER_MAX_CONCURRENCY Gemini calls run at once,
+# extra requests wait their turn (FIFO) on the semaphore instead of piling onto the API.
+_parse_slots = asyncio.Semaphore(PARSER_MAX_CONCURRENCY)
+_parser_stats = {"local_hits": 0, "queued": 0, "in_flight": 0, "completed": 0, "timeouts": 0, "errors": 0, "hedges_fired": 0, "hedge_wins": 0, "batches": 0, "batched_messages": 0, "degraded_parses": 0, "degraded_misses": 0}
+
+# Gemini outages / rate limits: stop calling it and parse locally until a probe succeeds
+llm_breaker = CircuitBreaker(
+    "gemini",
+    window=PARSER_BREAKER_WINDOW,
+    min_calls=PARSER_BREAKER_MIN_CALLS,
+    error_rate=PARSER_BREAKER_ERROR_RATE,
+    slow_call_ms=PARSER_BREAKER_SLOW_MS,
+    slow_rate=PARSER_BREAKER_SLOW_RATE,
+    open_seconds=PARSER_BREAKER_OPEN_SECONDS,
+    probe_timeout=PARSER_TIMEOUT,
+)
+
+# Per-model Gemini latency (successful, schema-valid calls only) -> tune PARSER_HEDGE_DELAY
+model_latency = {}
+
+# Token usage per result type (TRADE_CALL / UPDATE / IGNORE / BATCH), from the response usage metadata
+token_stats = {}
+
+def _record_usage(kind, response, latency_ms):
+    usage = getattr(response, "usage_metadata", None)
+    entry = token_stats.setdefault(kind, {"requests": 0, "prompt_tokens": 0, "output_tokens": 0, "latency_ms": 0.0})
+    entry["requests"] += 1
+    entry["prompt_tokens"] += (getattr(usage, "prompt_token_count", None) or 0)
+    entry["output_tokens"] += (getattr(usage, "candidates_token_count", None) or 0)
+    entry["latency_ms"] += latency_ms
+
+def get_parser_stats():
+    """Returns a snapshot of the parsing pool counters (for /trace)."""
+    return dict(_parser_stats, max_concurrency=PARSER_MAX_CONCURRENCY, cache=parse_cache.get_stats(),
+                hedge_delay=PARSER_HEDGE_DELAY, latency={m: h for m, h in model_latency.items()},
+                tokens={k: dict(v) for k, v in token_stats.items()}, breaker=llm_breaker.get_stats())
+
+async def _generate(model, prompt, schema=TradeParsingResult):
+    """Runs one Gemini call on the async client once a pool slot is free. Returns an instance of schema."""
+    _parser_stats["queued"] += 1
     try:
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=PROMPT_TEMPLATE.format(message_text=message_text, reply_context=reply_context),
+        await _parse_slots.acquire()
+    finally:
+        _parser_stats["queued"] -= 1
+
+    _parser_stats["in_flight"] += 1
+    try:
+        start = time.perf_counter()
+        response = await client.aio.models.generate_content(
+            model=model,
+            contents=prompt,
             config=types.GenerateContentConfig(
                 response_mime_type='application/json',
-                response_schema=TradeParsingResult,
+                response_schema=schema,
             )
         )
+        parsed_obj = response.parsed
+        if not isinstance(parsed_obj, schema):
+            raise ValueError(f"{model} returned a response that does not match the schema")
+        latency_ms = (time.perf_counter() - start) * 1000
+        model_latency.setdefault(model, LatencyHistogram()).record(latency_ms)
+        _record_usage(parsed_obj.type if isinstance(parsed_obj, TradeParsingResult) else "BATCH", response, latency_ms)
+        llm_breaker.record_success(latency_ms)
+        return parsed_obj
+    except Exception as e:
+        llm_breaker.record_failure(type(e).__name__)
+        raise
+    finally:
+        _parser_stats["in_flight"] -= 1
+        _parse_slots.release()
+
+async def _hedged_generate(prompt, schema=TradeParsingResult):
+    """
+    Fires the primary model; if it has not answered after PARSER_HEDGE_DELAY (or fails early),
+    fires GEMINI_HEDGE_MODEL as well. The first schema-valid answer wins, the loser is cancelled.
+    """
+    primary = asyncio.create_task(_generate(GEMINI_MODEL, prompt, schema))
+    tasks = {primary}
+    try:
+        if PARSER_HEDGE_DELAY <= 0:
+            return await primary
+
+        await asyncio.wait(tasks, timeout=PARSER_HEDGE_DELAY)
+        if primary.done() and primary.exception() is None:
+            return primary.result()
+
+        _parser_stats["hedges_fired"] += 1
+        logger.info(f"⏱️ {GEMINI_MODEL} slow/failed after {PARSER_HEDGE_DELAY}s. Hedging with {GEMINI_HEDGE_MODEL}...")
+        hedge = asyncio.create_task(_generate(GEMINI_HEDGE_MODEL, prompt, schema))
+        tasks.add(hedge)
+
+        pending = {t for t in tasks if not t.done()}
+        errors = [t.exception() for t in tasks if t.done()]
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if t.exception() is None:
+                    if t is hedge:
+                        _parser_stats["hedge_wins"] += 1
+                    return t.result()
+                errors.append(t.exception())
+        raise errors[0]
+    finally:
+        for t in tasks:
+            if not t.done():
+                t.cancel()
+
+def format_trade_context(trade):
+    """
+    One-line summary of a trade call for the prompt, e.g. `TRADE BTCUSDT LONG entry=95000 sl=94000 tp=96000 status=OPEN`.
+    Accepts parser results (entry/sl/tp/direction) and DB rows (entry_price/sl_price/tp_price/position_side).
+    """
+    tp = trade.get('tp') if trade.get('tp') is not None else trade.get('tp_price')
+    if isinstance(tp, list):
+        tp = "/".join(f"{t:g}" for t in tp)
+    fields = (
+        ("entry", trade.get('entry') if trade.get('entry') is not None else trade.get('entry_price')),
+        ("sl", trade.get('sl') if trade.get('sl') is not None else trade.get('sl_price')),
+        ("tp", tp),
+        ("status", trade.get('status')),
+    )
+    summary = " ".join(f"{k}={v:g}" if isinstance(v, float) else f"{k}={v}" for k, v in fields if v not in (None, ""))
+    side = trade.get('direction') or trade.get('position_side') or ""
+    return f"TRADE {trade.get('symbol') or '?'} {side} {summary}".replace("  ", " ").strip()
+
+async def compact_reply_context(reply_text, trade=None):
+    """
+    Prompt context for a reply: the structured trade when one is known (DB row or earlier parse),
+    else the local/cached parse of the replied-to text, else that text truncated to REPLY_CONTEXT_MAX_CHARS.
+    """
+    if trade:
+        return format_trade_context(trade)
+    if not reply_text:
+        return ""
+
+    local_data, confidence = parse_locally(reply_text)
+    if local_data and confidence >= LOCAL_PARSE_MIN_CONFIDENCE and local_data.get('type') == 'TRADE_CALL':
+        return format_trade_context(local_data)
+    cached = await parse_cache.get(make_cache_key(reply_text, "", PROMPT_VERSION))
+    if cached and cached.get('type') == 'TRADE_CALL':
+        return format_trade_context(cached)
+
+    return reply_text if len(reply_text) <= REPLY_CONTEXT_MAX_CHARS else reply_text[:REPLY_CONTEXT_MAX_CHARS] + "…"
+
+def _parse_degraded(message_text, reply_context, reason):
+    """
+    Gemini unavailable: takes the local grammar's answer down to DEGRADED_MIN_CONFIDENCE, but never
+    one it marked unsure (negated, relative, status words). Results carry `degraded: True` so the
+    listener can tell the admin what was (not) understood.
+    """
+    local_data, confidence = parse_locally(message_text, reply_context)
+    if local_data and confidence > UNSURE_CONFIDENCE and confidence >= DEGRADED_MIN_CONFIDENCE:
+        try:
+            data = TradeParsingResult(**local_data).model_dump()
+            data['degraded'] = True
+            _parser_stats["degraded_parses"] += 1
+            logger.warning(f"🛟 Parsed locally ({reason}, {confidence:.2f}): {data['type']} {data.get('action') or data.get('symbol')}")
+            return data
+        except Exception as e:
+            logger.warning(f"Degraded local parse rejected by schema: {e}")
+    _parser_stats["degraded_misses"] += 1
+    if local_data:
+        logger.warning(f"🛟 Local parse too unsure to act on ({reason}, {confidence:.2f}): {message_text[:50]}...")
+    else:
+        logger.warning(f"🛟 No local parse ({reason}): {message_text[:50]}...")
+    return {"type": "IGNORE", "degraded": True}
+
+async def parse_message(message_text, reply_context="", timeout=None):
+    """
+    Parses a message without blocking the event loop.
+    Tries the local grammar first, then the parse cache, and only calls Gemini on a miss.
+    The deadline (default PARSER_TIMEOUT) covers both queue wait and the Gemini round trip.
+    While the Gemini circuit is open, or if the call fails, the local grammar answers instead.
+    """
+    # Fast path: standard grammars are parsed locally in microseconds
+    local_data, confidence = parse_locally(message_text, reply_context)
+    if local_data and confidence >= LOCAL_PARSE_MIN_CONFIDENCE:
+        try:
+            data = TradeParsingResult(**local_data).model_dump()
+            _parser_stats["local_hits"] += 1
+            logger.info(f"⚡ Parsed locally ({confidence:.2f}): {data['type']} {data.get('action') or data.get('symbol')}")
+            return data
+        except Exception as e:
+            logger.warning(f"Local parse rejected by schema, using Gemini: {e}")
+
+    # Same content already parsed (edits, channel + DM copies) -> no second LLM round trip
+    cache_key = make_cache_key(message_text, reply_context, PROMPT_VERSION)
+    cached = await parse_cache.get(cache_key)
+    if cached:
+        logger.info(f"♻️ Parse cache hit: {cached.get('type')} {cached.get('action') or cached.get('symbol')}")
+        return cached
+
+    if not llm_breaker.allow():
+        return _parse_degraded(message_text, reply_context, "Gemini circuit open")
+
+    deadline = timeout or PARSER_TIMEOUT
+    try:
+        prompt = PROMPT_TEMPLATE.format(message_text=message_text, reply_context=reply_context)
+        parsed_obj = await asyncio.wait_for(_hedged_generate(prompt), timeout=deadline)
         
         # Safely convert Pydantic model response to standard dictionary
-        parsed_obj: TradeParsingResult = response.parsed
         data = parsed_obj.model_dump()
+        _parser_stats["completed"] += 1
+        await parse_cache.put(cache_key, data)
         return data
+    except asyncio.TimeoutError:
+        _parser_stats["timeouts"] += 1
+        llm_breaker.record_failure("timeout")
+        logger.error(f"Parsing timed out after {deadline}s: {message_text[:50]}...")
+        return _parse_degraded(message_text, reply_context, "Gemini timeout")
     except Exception as e:
+        _parser_stats["errors"] += 1
         logger.error(f"Error parsing message: {e}")
-        return {"type": "IGNORE"}
+        return _parse_degraded(message_text, reply_context, "Gemini error")
+
+async def _parse_chunk(chunk, timeout):
+    """One Gemini request for a chunk of (text, reply_context) pairs. Returns {chunk position: result dict}."""
+    messages = "".join(
+        BATCH_MESSAGE_TEMPLATE.format(index=i, message_text=text, reply_context=reply)
+        for i, (text, reply) in enumerate(chunk)
+    )
+    try:
+        parsed_obj = await asyncio.wait_for(_hedged_generate(BATCH_PROMPT_TEMPLATE.format(messages=messages), BatchParsingResult), timeout=timeout)
+    except asyncio.TimeoutError:
+        _parser_stats["timeouts"] += 1
+        llm_breaker.record_failure("timeout")
+        logger.error(f"Batch parse of {len(chunk)} messages timed out after {timeout}s")
+        return {}
+    except Exception as e:
+        _parser_stats["errors"] += 1
+        logger.error(f"Error batch parsing {len(chunk)} messages: {e}")
+        return {}
+
+    _parser_stats["batches"] += 1
+    results = {}
+    for item in parsed_obj.results:
+        if 0 <= item.index < len(chunk) and item.index not in results:
+            results[item.index] = item.model_dump(exclude={"index"})
+    _parser_stats["batched_messages"] += len(results)
+    return results
+
+async def parse_batch(items, batch_size=None, timeout=None):
+    """
+    Parses a backlog of (message_text, reply_context) pairs, returning one result dict per item (same order).
+    Local grammar and cache are tried per message; the rest go to Gemini batch_size messages per request,
+    all chunks concurrently through the parsing pool. Messages a batch answer leaves out are re-parsed singly.
+    """
+    batch_size = batch_size or PARSER_BATCH_SIZE
+    deadline = timeout or PARSER_TIMEOUT * 2  # Batch answers are longer than single ones
+    results = [None] * len(items)
+    pending = []  # (item position, cache key)
+
+    for pos, (text, reply) in enumerate(items):
+        local_data, confidence = parse_locally(text, reply)
+        if local_data and confidence >= LOCAL_PARSE_MIN_CONFIDENCE:
+            try:
+                results[pos] = TradeParsingResult(**local_data).model_dump()
+                _parser_stats["local_hits"] += 1
+                continue
+            except Exception as e:
+                logger.warning(f"Local parse rejected by schema, using Gemini: {e}")
+        cache_key = make_cache_key(text, reply, PROMPT_VERSION)
+        cached = await parse_cache.get(cache_key)
+        if cached:
+            results[pos] = cached
+        else:
+            pending.append((pos, cache_key))
+
+    if pending and not llm_breaker.allow():
+        for pos, _ in pending:
+            results[pos] = _parse_degraded(*items[pos], "Gemini circuit open")
+        return results
+
+    chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    logger.info(f"📦 Batch parse: {len(items)} messages, {len(items) - len(pending)} local/cached, {len(pending)} to Gemini in {len(chunks)} request(s)")
+    answers = await asyncio.gather(*(_parse_chunk([items[pos] for pos, _ in chunk], deadline) for chunk in chunks))
+
+    missing = []
+    for chunk, answer in zip(chunks, answers):
+        for i, (pos, cache_key) in enumerate(chunk):
+            if i in answer:
+                results[pos] = answer[i]
+                _parser_stats["completed"] += 1
+                await parse_cache.put(cache_key, answer[i])
+            else:
+                missing.append(pos)
+
+    if missing:
+        logger.warning(f"Batch answers missed {len(missing)} message(s). Parsing them individually...")
+        singles = await asyncio.gather(*(parse_message(*items[pos]) for pos in missing))
+        for pos, data in zip(missing, singles):
+            results[pos] = data
+
+    return results
@@ -0,0 +1,101 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_TYPE = "USDT-FUTURES"
+PAGE_SIZE = 100  # Bitget V2 orders-plan-pending maximum
+
+# Trigger states that still count as pending (orders-algo push uses 'live', REST 'planStatus' too)
+LIVE_STATUSES = ("live", "not_trigger")
+
+class PlanOrderIndex:
+    """
+    In-memory index of every pending TP/SL plan order, grouped by raw symbol.
+    One paginated orders-plan-pending sweep (planType=profit_loss, all symbols) replaces the
+    per-symbol calls. Private-stream 'orders-algo' pushes are applied incrementally; a full
+    sweep runs when the index is older than `ttl` or after our own TP/SL writes (invalidate).
+    Sweeps are single-flight through the shared ReadCache (kind 'plans').
+    """
+    def __init__(self, fetch_page, reads, ttl):
+        self.fetch_page = fetch_page  # ccxt privateMixGetV2MixOrderOrdersPlanPending
+        self.reads = reads
+        self.ttl = ttl
+        self.by_symbol = {}  # 'BTCUSDT' -> {orderId: record}
+        self._sweeping = False
+        self._pending_pushes = []  # Pushes that arrive mid-sweep, replayed on the fresh index
+        self.stats = {"sweeps": 0, "pages": 0, "pushes": 0}
+
+    @staticmethod
+    def _record(o):
+        return {
+            'orderId': str(o.get('orderId')),
+            'symbol': o.get('symbol') or o.get('instId'),
+            'planType': o.get('planType'),
+            'triggerPrice': float(o.get('triggerPrice') or 0.0),
+            'size': o.get('size'),
+            'posSide': o.get('posSide') or o.get('holdSide'),
+        }
+
+    async def _sweep(self):
+        self._sweeping = True
+        try:
+            by_symbol = {}
+            params = {"productType": PRODUCT_TYPE, "planType": "profit_loss", "limit": str(PAGE_SIZE)}
+            while True:
+                response = await self.fetch_page(params)
+                self.stats["pages"] += 1
+                if response.get('code') != '00000':
+                    raise Exception(f"Plan Order API Error: {response}")
+                data = response.get('data') or {}
+                page = data.get('entrustedList') or []
+                for o in page:
+                    record = self._record(o)
+                    by_symbol.setdefault(record['symbol'], {})[record['orderId']] = record
+                if len(page) < PAGE_SIZE or not data.get('endId'):
+                    break
+                params = dict(params, idLessThan=data['endId'])
+            self.by_symbol = by_symbol
+            self.stats["sweeps"] += 1
+        finally:
+            self._sweeping = False
+        pushes, self._pending_pushes = self._pending_pushes, []
+        for plans in pushes:
+            self.apply_push(plans, replay=True)
+        return self.by_symbol
+
+    async def refresh(self):
+        """Makes sure the index is no older than ttl (one shared sweep for concurrent callers)."""
+        await self.reads.get(("plans",), self._sweep, self.ttl)
+
+    def apply_push(self, plans, replay=False):
+        """Private stream 'orders-algo' push: upsert live TP/SL plans, drop triggered/cancelled ones."""
+        if self._sweeping and not replay:
+            self._pending_pushes.append(plans)
+        for o in plans:
+            record = self._record(o)
+            if record['planType'] not in ('profit_plan', 'loss_plan', 'pos_profit', 'pos_loss'):
+                continue
+            self.stats["pushes"] += not replay
+            orders = self.by_symbol.setdefault(record['symbol'], {})
+            if o.get('status', o.get('planStatus')) in LIVE_STATUSES:
+                orders[record['orderId']] = record
+            else:
+                orders.pop(record['orderId'], None)
+
+    def invalidate(self):
+        self.reads.invalidate("plans")
+
+    async def get_orders(self, raw_symbol):
+        await self.refresh()
+        return list(self.by_symbol.get(raw_symbol, {}).values())
+
+    async def get_tp_sl(self, raw_symbol):
+        """(tp_prices, sl_prices), each sorted and de-duplicated."""
+        orders = await self.get_orders(raw_symbol)
+        tp = sorted({o['triggerPrice'] for o in orders if o['planType'] == 'profit_plan' and o['triggerPrice'] > 0})
+        sl = sorted({o['triggerPrice'] for o in orders if o['planType'] == 'loss_plan' and o['triggerPrice'] > 0})
+        return tp, sl
+
+    def get_stats(self):
+        return dict(self.stats, symbols=sum(1 for v in self.by_symbol.values() if v),
+                    orders=sum(len(v) for v in self.by_symbol.values()))
@@ -0,0 +1,44 @@
+import re
+from typing import NamedTuple
+
+# Whole-word action keywords (numeric suffix allowed for levels like TP1, SL2, TARGET3)
+KEYWORDS = [
+    r'LONG', r'SHORT', r'BUY', r'SELL',
+    r'SL\d*', r'TP\d*', r'TARGET\d*', r'STOP', r'INVALIDATION',
+    r'CLOSE', r'CANCEL', r'BOOKED', r'HIT', r'MOVE',
+    r'EXIT', r'DELETE', r'BREAKEVEN', r'BE',
+]
+SYMBOLS = ['❌', '🎯']
+
+# One alternation, compiled once. "AS LONG AS" is listed first so a search that lands on the
+# phrase can step past it instead of reporting its LONG as a direction keyword.
+PREFILTER_PATTERN = re.compile(
+    r'(?P<ignore>\bAS\s+LONG\s+AS\b)'
+    r'|\b(?:' + '|'.join(KEYWORDS) + r')\b'
+    r'|' + '|'.join(SYMBOLS)
+)
+DIRECTION_PATTERN = re.compile(r'(?P<ignore>\bAS\s+LONG\s+AS\b)|\b(?:LONG|SHORT)\b')
+
+class PrefilterResult(NamedTuple):
+    matched: bool
+    is_trade_call_shaped: bool  # LONG/SHORT in the message text itself
+
+def _first_keyword(pattern, text):
+    """Stops at the first keyword; only an 'as long as' hit makes it search on."""
+    pos = 0
+    while (m := pattern.search(text, pos)) is not None:
+        if m.lastgroup != 'ignore':
+            return True
+        pos = m.end()
+    return False
+
+def matches_keywords(text):
+    """True if `text` (a message or its reply context) contains any action keyword."""
+    return bool(text) and _first_keyword(PREFILTER_PATTERN, text.upper())
+
+def prefilter_message(text, reply_context=""):
+    """Checks the message first and only scans the reply context when the message has no keyword."""
+    upper = (text or "").upper()
+    if _first_keyword(PREFILTER_PATTERN, upper):
+        return PrefilterResult(True, _first_keyword(DIRECTION_PATTERN, upper))
+    return PrefilterResult(matches_keywords(reply_context), False)
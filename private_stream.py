@@ -0,0 +1,57 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+from ws_client import BitgetWSClient
+from config import BITGET_API_KEY, BITGET_SECRET_KEY, BITGET_PASSPHRASE, BITGET_WS_PRIVATE_URL, MARKET_WS_PING_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# Account-wide USDT-futures channels, republished on the event bus under the channel name
+PRIVATE_CHANNELS = (
+    {"instType": "USDT-FUTURES", "channel": "orders", "instId": "default"},
+    {"instType": "USDT-FUTURES", "channel": "positions", "instId": "default"},
+    {"instType": "USDT-FUTURES", "channel": "orders-algo", "instId": "default"},
+    {"instType": "USDT-FUTURES", "channel": "account", "coin": "default"},
+)
+
+def login_args(api_key, secret, passphrase, timestamp=None):
+    """Bitget V2 WebSocket login: sign = base64(HMAC-SHA256(secret, ts + 'GET' + '/user/verify'))."""
+    timestamp = str(timestamp or int(time.time()))
+    digest = hmac.new(secret.encode(), f"{timestamp}GET/user/verify".encode(), hashlib.sha256).digest()
+    return {"apiKey": api_key, "passphrase": passphrase, "timestamp": timestamp, "sign": base64.b64encode(digest).decode()}
+
+class PrivateStream(BitgetWSClient):
+    """
+    Bitget V2 private WebSocket: logs in, subscribes to orders / positions / plan orders / account
+    and publishes every push as `bus.publish(channel, data_list)`.
+    """
+    name = "Private stream"
+
+    def __init__(self, bus, url=BITGET_WS_PRIVATE_URL, api_key=BITGET_API_KEY, secret=BITGET_SECRET_KEY, passphrase=BITGET_PASSPHRASE, ping_interval=MARKET_WS_PING_INTERVAL):
+        super().__init__(url, ping_interval)
+        self.bus = bus
+        self.api_key = api_key
+        self.secret = secret
+        self.passphrase = passphrase
+        self.stats.update({"pushes": 0, "logins": 0})
+
+    async def on_connect(self, ws):
+        await ws.send_str(json.dumps({"op": "login", "args": [login_args(self.api_key, self.secret, self.passphrase)]}))
+        reply = json.loads(await ws.receive_str(timeout=10))
+        if reply.get("event") != "login" or str(reply.get("code")) != "0":
+            raise ConnectionError(f"Login rejected: {reply}")
+        self.stats["logins"] += 1
+        await ws.send_str(json.dumps({"op": "subscribe", "args": list(PRIVATE_CHANNELS)}))
+        logger.info("🔐 Private stream logged in (orders, positions, plan orders, account)")
+
+    def on_message(self, payload):
+        if payload.get("event") == "error":
+            logger.warning(f"Private stream error: {payload}")
+            return
+        channel = payload.get("arg", {}).get("channel")
+        if channel and "data" in payload:
+            self.stats["pushes"] += 1
+            self.bus.publish(channel, payload["data"])
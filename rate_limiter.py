@@ -0,0 +1,200 @@
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+import ccxt.async_support as ccxt
+from metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, most urgent first. A request's lane comes from the calling task's context.
+LANES = ("order", "risk", "monitor", "report")
+DEFAULT_LANE = "monitor"
+
+# Bitget V2 limits (requests/second, per UID for private and per IP for public endpoints)
+ENDPOINT_LIMITS = {
+    "v2/public/time": 20,
+    "v2/mix/market/ticker": 20,
+    "v2/mix/market/tickers": 20,
+    "v2/mix/market/contracts": 20,
+    "v2/mix/account/account": 10,
+    "v2/mix/account/accounts": 10,
+    "v2/mix/account/set-leverage": 5,
+    "v2/mix/account/set-margin-mode": 5,
+    "v2/mix/account/set-position-mode": 5,
+    "v2/mix/position/all-position": 5,
+    "v2/mix/position/single-position": 10,
+    "v2/mix/position/history-position": 20,
+    "v2/mix/order/place-order": 10,
+    "v2/mix/order/cancel-order": 10,
+    "v2/mix/order/cancel-all-orders": 10,
+    "v2/mix/order/batch-cancel-orders": 10,
+    "v2/mix/order/place-tpsl-order": 10,
+    "v2/mix/order/cancel-plan-order": 10,
+    "v2/mix/order/orders-plan-pending": 10,
+    "v2/mix/order/orders-pending": 10,
+    "v2/mix/order/orders-history": 10,
+    "v2/mix/order/fill-history": 10,
+    "v2/mix/order/fills": 10,
+    "v2/mix/order/detail": 10,
+}
+DEFAULT_LIMIT = 10
+
+_lane = contextvars.ContextVar("rate_limit_lane", default=DEFAULT_LANE)
+
+@contextmanager
+def lane(name):
+    """Runs the enclosed exchange calls (and tasks spawned from them) in the given priority lane."""
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+def in_lane(name):
+    """Decorator form of `lane()` for coroutine methods."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with lane(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def endpoint_key(path):
+    """'/api/v2/mix/market/ticker' or 'v2/mix/market/ticker' -> 'v2/mix/market/ticker'."""
+    return path.split("?")[0].strip("/").removeprefix("api/")
+
+def is_throttled(e):
+    """True for HTTP 429 / Bitget 429 and 'Request Frequency Is Too High' replies."""
+    return isinstance(e, (ccxt.RateLimitExceeded, ccxt.DDoSProtection)) or '"429"' in str(e) or "Too Many Requests" in str(e)
+
+WINDOW = 1.0  # Seconds: Bitget counts requests per endpoint over a rolling second
+WINDOW_MARGIN = 0.1  # Network jitter can bunch requests at the server, so keep them slightly further apart
+
+class _Bucket:
+    """Sliding one-second window for one endpoint plus the heap of requests waiting on it."""
+    def __init__(self, rate):
+        self.rate = rate
+        self.sent = deque()  # Send times inside the current window (never more than `rate`)
+        self.blocked_until = 0.0  # Set by a 429 backoff
+        self.waiters = []  # (lane priority, seq, future)
+        self.dispatcher = None
+        self.max_depth = 0
+        self.throttled = 0
+
+    def wait_time(self):
+        now = time.monotonic()
+        while self.sent and self.sent[0] <= now - WINDOW - WINDOW_MARGIN:
+            self.sent.popleft()
+        full = self.sent[0] + WINDOW + WINDOW_MARGIN - now if len(self.sent) >= self.rate else 0.0
+        return max(self.blocked_until - now, full)
+
+    def take(self):
+        self.sent.append(time.monotonic())
+
+class RateLimitScheduler:
+    """
+    Replaces ccxt's single global throttle with one rolling-second window per Bitget endpoint, so a
+    tickers sweep never queues an order placement behind it. Requests waiting on the same
+    bucket are released by lane priority (order > risk > monitor > report), then FIFO.
+    A 429 pauses that endpoint for an exponentially growing, jittered delay and retries the call.
+    """
+    def __init__(self, limits=ENDPOINT_LIMITS, default_limit=DEFAULT_LIMIT, max_retries=3, backoff_base=0.5, backoff_max=8.0):
+        self.limits = limits
+        self.default_limit = default_limit
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.buckets = {}
+        self._seq = itertools.count()
+        self.waits = {name: LatencyHistogram(buckets_ms=(1, 10, 50, 100, 250, 500, 1000, 2000, 4000)) for name in LANES}
+        self.stats = {name: {"requests": 0, "queued": 0, "retries": 0} for name in LANES}
+
+    def _bucket(self, endpoint):
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            bucket = self.buckets[endpoint] = _Bucket(self.limits.get(endpoint, self.default_limit))
+        return bucket
+
+    async def _dispatch(self, bucket):
+        """Releases the highest-priority waiter whenever the window has room, until the queue is empty."""
+        try:
+            while bucket.waiters:
+                delay = bucket.wait_time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue  # Re-check: a more urgent request may have arrived meanwhile
+                _, _, future = heapq.heappop(bucket.waiters)
+                if future.done():  # Caller gave up (cancelled)
+                    continue
+                bucket.take()
+                future.set_result(None)
+        finally:
+            bucket.dispatcher = None
+
+    async def acquire(self, endpoint, lane_name=None):
+        lane_name = lane_name or _lane.get()
+        bucket = self._bucket(endpoint)
+        stats = self.stats[lane_name]
+        stats["requests"] += 1
+        start = time.perf_counter()
+        if not bucket.waiters and bucket.wait_time() <= 0:
+            bucket.take()
+        else:
+            stats["queued"] += 1
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(bucket.waiters, (LANES.index(lane_name), next(self._seq), future))
+            bucket.max_depth = max(bucket.max_depth, len(bucket.waiters))
+            if bucket.dispatcher is None:
+                bucket.dispatcher = asyncio.create_task(self._dispatch(bucket))
+            await future
+        self.waits[lane_name].record((time.perf_counter() - start) * 1000)
+
+    def _backoff(self, bucket, attempt):
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        delay = random.uniform(delay / 2, delay)  # Jitter so queued callers do not retry in lockstep
+        bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+        bucket.throttled += 1
+        return delay
+
+    async def run(self, path, call):
+        """Awaits `call()` once the endpoint has capacity; retries with backoff on 429."""
+        endpoint = endpoint_key(path)
+        lane_name = _lane.get()
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(endpoint, lane_name)
+            try:
+                return await call()
+            except Exception as e:
+                if not is_throttled(e) or attempt == self.max_retries:
+                    raise
+                delay = self._backoff(self._bucket(endpoint), attempt)
+                self.stats[lane_name]["retries"] += 1
+                logger.warning(f"⏳ Rate limited on {endpoint} ({lane_name}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+
+    def install(self, exchange):
+        """Routes every ccxt request of `exchange` through the scheduler (ccxt's own throttle is turned off)."""
+        fetch2 = exchange.fetch2
+
+        async def limited_fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            return await self.run(path, lambda: fetch2(path, api, method, params, headers, body, config))
+
+        exchange.fetch2 = limited_fetch2
+        exchange.enableRateLimit = False
+
+    def get_stats(self):
+        return {
+            "lanes": {name: dict(self.stats[name], p50_wait=self.waits[name].percentile(50), p99_wait=self.waits[name].percentile(99))
+                      for name in LANES if self.stats[name]["requests"]},
+            "queue_depth": sum(len(b.waiters) for b in self.buckets.values()),
+            "max_depth": max((b.max_depth for b in self.buckets.values()), default=0),
+            "throttled": sum(b.throttled for b in self.buckets.values()),
+            "busiest": sorted(((b.max_depth, e) for e, b in self.buckets.items() if b.max_depth), reverse=True)[:3],
+        }
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+class ReadCache:
+    """
+    Single-flight + short-TTL cache for exchange reads.
+    Concurrent `get()` calls for the same key share one in-flight request; its result is then
+    served for `ttl` seconds. Keys are tuples whose first item is the kind ('positions',
+    'balance', 'tickers'); `invalidate(kind)` drops a kind after our own writes or a push event.
+    Errors are never cached. A fetch that started before an invalidation is not stored.
+    """
+    def __init__(self):
+        self._values = {}    # key -> (expires_at, value)
+        self._inflight = {}  # key -> Task
+        self._generation = defaultdict(int)  # kind -> bumped on invalidate
+        self.stats = defaultdict(lambda: {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0})
+
+    async def get(self, key, fetch, ttl):
+        kind = key[0]
+        stats = self.stats[kind]
+        cached = self._values.get(key)
+        if cached and cached[0] > time.monotonic():
+            stats["hits"] += 1
+            return cached[1]
+
+        inflight = self._inflight.get(key)
+        if inflight:
+            stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        stats["misses"] += 1
+        # The fetch runs in its own task and every caller (the first one included) only shields it:
+        # cancelling one caller never cancels the request the others are waiting on
+        task = asyncio.ensure_future(self._fetch(key, fetch, ttl, self._generation[kind]))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())  # Retrieved even if every caller left
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key, fetch, ttl, generation):
+        try:
+            value = await fetch()
+        finally:
+            self._inflight.pop(key, None)
+        if ttl > 0 and generation == self._generation[key[0]]:
+            self._values[key] = (time.monotonic() + ttl, value)
+        return value
+
+    def invalidate(self, *kinds):
+        for kind in kinds:
+            self._generation[kind] += 1
+            self.stats[kind]["invalidations"] += 1
+            for key in [k for k in self._values if k[0] == kind]:
+                del self._values[key]
+
+    def get_stats(self):
+        result = {}
+        for kind, s in self.stats.items():
+            served = s["hits"] + s["coalesced"]
+            total = served + s["misses"]
+            result[kind] = dict(s, saved_rate=(served / total) if total else 0.0)
+        return result
@@ -0,0 +1,87 @@
+import logging
+import time
+import aiohttp
+from config import BITGET_REST_URL, HTTP_POOL_SIZE, HTTP_KEEPALIVE, HTTP_DNS_TTL, HTTP_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+class BitgetRestClient:
+    """
+    Long-lived pooled HTTP session for raw Bitget V2 REST calls (keep-alive, DNS cache).
+    Created lazily inside the running loop; `warm_up()` opens a connection ahead of the
+    first real request. Connection events are traced so `get_stats()` shows how many
+    TCP/TLS handshakes were actually paid versus reused.
+    """
+    def __init__(self, base_url=BITGET_REST_URL, pool_size=HTTP_POOL_SIZE, keepalive=HTTP_KEEPALIVE, dns_ttl=HTTP_DNS_TTL, timeout=HTTP_TIMEOUT, limiter=None):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self.dns_ttl = dns_ttl
+        self.timeout = timeout
+        self.limiter = limiter  # Optional RateLimitScheduler shared with the ccxt client
+        self._session = None
+        self.stats = {"requests": 0, "errors": 0, "new_connections": 0, "reused_connections": 0,
+                      "dns_lookups": 0, "dns_cache_hits": 0, "total_ms": 0.0}
+
+    def _trace_config(self):
+        trace = aiohttp.TraceConfig()
+
+        async def count(key):
+            self.stats[key] += 1
+
+        trace.on_connection_create_end.append(lambda s, c, p: count("new_connections"))
+        trace.on_connection_reuseconn.append(lambda s, c, p: count("reused_connections"))
+        trace.on_dns_resolvehost_end.append(lambda s, c, p: count("dns_lookups"))
+        trace.on_dns_cache_hit.append(lambda s, c, p: count("dns_cache_hits"))
+        return trace
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.keepalive,
+                                             ttl_dns_cache=self.dns_ttl, use_dns_cache=True)
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[self._trace_config()],
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def get(self, path, params=None):
+        """GET a V2 endpoint and return its `data` field (raises on a non-00000 code)."""
+        if self.limiter:
+            return await self.limiter.run(path, lambda: self._get(path, params))
+        return await self._get(path, params)
+
+    async def _get(self, path, params=None):
+        self.stats["requests"] += 1
+        start = time.perf_counter()
+        try:
+            async with self.session.get(f"{self.base_url}{path}", params=params) as resp:
+                payload = await resp.json(content_type=None)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self.stats["total_ms"] += (time.perf_counter() - start) * 1000
+        if payload.get("code") != "00000":
+            self.stats["errors"] += 1
+            raise Exception(f"Raw API Error: {payload}")
+        return payload.get("data")
+
+    async def warm_up(self):
+        """Opens a pooled connection (DNS + TCP + TLS) before the first real request needs it."""
+        try:
+            await self.get("/api/v2/public/time")
+            logger.info(f"🔌 REST pool warmed up ({self.base_url})")
+        except Exception as e:
+            logger.warning(f"REST pool warm-up failed (will connect on demand): {e}")
+
+    def get_stats(self):
+        connections = self.stats["new_connections"] + self.stats["reused_connections"]
+        return dict(self.stats, open=not (self._session is None or self._session.closed),
+                    reuse_rate=(self.stats["reused_connections"] / connections) if connections else 0.0,
+                    avg_ms=(self.stats["total_ms"] / self.stats["requests"]) if self.stats["requests"] else 0.0)
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info("Closed REST pool session.")
+        self._session = None
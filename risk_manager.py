@@ -76,6 +76,27 @@ class RiskManager:
         else:
             return 'ABORT', 0, f"Price deviated {diff_percent*100:.2f}% (>1.0% | Market: {current_market_price}). Too late."
 
+    def check_signal_staleness(self, direction, signal_entry, sl_price, tp_price, current_market_price, signal_age=None, max_age=None):
+        """
+        Late signals (backlog catch-up): is the setup still tradeable at the current price?
+        Prices must already be scaled to the market. Entry drift itself is judged by determine_entry_action.
+
+        Returns: (is_stale, reason)
+        """
+        if signal_age is not None and max_age is not None and signal_age > max_age:
+            return True, f"Signal is {signal_age / 60:.0f} min old (max {max_age / 60:.0f} min)"
+
+        is_long = direction.upper() == 'LONG'
+        if sl_price:
+            if (is_long and current_market_price <= sl_price) or (not is_long and current_market_price >= sl_price):
+                return True, f"SL {sl_price} already hit (Market: {current_market_price})"
+        if tp_price:
+            if (is_long and current_market_price >= tp_price) or (not is_long and current_market_price <= tp_price):
+                return True, f"TP {tp_price} already reached (Market: {current_market_price})"
+
+        age_note = f", {signal_age / 60:.0f} min old" if signal_age is not None else ""
+        return False, f"Setup still valid (Market: {current_market_price}{age_note})"
+
     def scale_price(self, signal_price, market_price):
         """
         Re-scales signal price to match market price decimal formatting and magnitude.
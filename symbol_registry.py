@@ -0,0 +1,152 @@
+import logging
+import re
+import time
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Contract-size prefixes Bitget puts in front of low-priced coins (1000BONKUSDT, 1MBABYDOGEUSDT)
+RE_MULTIPLIER = re.compile(r'^(?:1000000|100000|10000|1000|100|1M)(?=[A-Z])')
+
+# Names channels use instead of the ticker (only added when the target contract is listed)
+COIN_NICKNAMES = {
+    "BITCOIN": "BTC", "ETHEREUM": "ETH", "ETHER": "ETH", "SOLANA": "SOL", "RIPPLE": "XRP",
+    "DOGECOIN": "DOGE", "CARDANO": "ADA", "AVALANCHE": "AVAX", "POLKADOT": "DOT", "CHAINLINK": "LINK",
+    "LITECOIN": "LTC", "MATIC": "POL", "GOLD": "XAU", "SILVER": "XAG", "TONCOIN": "TON", "BINANCE": "BNB",
+}
+
+MIN_PREFIX = 3  # Shorter inputs are too ambiguous for prefix completion
+
+@lru_cache(maxsize=4096)
+def normalize_symbol(symbol):
+    """'BTC/USDT:USDT', 'BTCUSDT:USDT' or 'BTCUSDT' -> 'BTCUSDT' (raw Bitget id). Memoized."""
+    return symbol.replace("/", "").replace(":", "").split("USDT")[0] + "USDT"
+
+def markets_from_contracts(contracts):
+    """Bitget V2 /mix/market/contracts rows -> minimal CCXT-style markets dict (for the registry)."""
+    return {
+        f"{c['baseCoin']}/{c['quoteCoin']}:{c['quoteCoin']}": {
+            'id': c['symbol'], 'base': c['baseCoin'], 'quote': c['quoteCoin'], 'swap': True, 'linear': True,
+        }
+        for c in contracts
+    }
+
+class SymbolRegistry:
+    """
+    Bidirectional symbol maps for Bitget USDT-M futures, built once from the CCXT markets:
+    raw id (BTCUSDT) <-> unified symbol (BTC/USDT:USDT) <-> base asset (BTC).
+    All lookups are dict hits; before markets load, `raw_id` still works via normalize_symbol.
+    """
+    def __init__(self):
+        self.by_id = {}       # 'BTCUSDT' -> 'BTC/USDT:USDT'
+        self.by_unified = {}  # 'BTC/USDT:USDT' -> 'BTCUSDT'
+        self.by_base = {}     # 'BTC' -> 'BTCUSDT'
+        self.aliases = {}     # 'BTC', 'BONK' (-> 1000BONKUSDT), 'GOLD' (-> XAUUSDT) -> raw id
+        self.trie = {}        # char -> {'ids': {raw ids below}, 'next': {...}} over alias keys
+        self.source = None    # 'snapshot', 'api' or 'ccxt'
+        self.loaded_at = None
+        self._source = None
+        self.ccxt_names = {}  # 'DEGENUSDT' -> 'DegenReborn/USDT:USDT' (CCXT commonCurrencies renames)
+        self._ccxt_markets = None
+
+    @property
+    def loaded(self):
+        return bool(self.by_id)
+
+    def load(self, markets, source="ccxt"):
+        """(Re)builds the maps from a CCXT-style `markets` dict. No-op if it is the same dict as last time."""
+        if not markets or markets is self._source:
+            return
+        by_id, by_unified, by_base = {}, {}, {}
+        for unified, m in markets.items():
+            if not (m.get('swap') and m.get('linear') and m.get('quote') == 'USDT'):
+                continue
+            by_id[m['id']] = self.ccxt_names.get(m['id'], unified)
+            by_unified[by_id[m['id']]] = m['id']
+            by_base.setdefault(m.get('base', ''), m['id'])
+        self.by_id, self.by_unified, self.by_base = by_id, by_unified, by_base
+        self._build_aliases()
+        self._source = markets
+        self.source = source
+        self.loaded_at = time.time()
+        logger.info(f"🗂️ Symbol registry built from {source}: {len(by_id)} USDT futures, {len(self.aliases)} aliases")
+
+    def overlay(self, markets):
+        """
+        Adopts CCXT's unified symbols for every id CCXT lists, so symbols handed to CCXT methods
+        always exist there (snapshot / API rows are named baseCoin/USDT:USDT, which misses CCXT's
+        commonCurrencies renames). Kept for later snapshot / API reloads. No-op for the same dict.
+        """
+        if not markets or markets is self._ccxt_markets:
+            return
+        self.ccxt_names = {m['id']: unified for unified, m in markets.items()
+                           if m.get('swap') and m.get('linear') and m.get('quote') == 'USDT'}
+        self._ccxt_markets = markets
+        renamed = [raw_id for raw_id, unified in self.by_id.items() if self.ccxt_names.get(raw_id, unified) != unified]
+        for raw_id in renamed:
+            self.by_unified.pop(self.by_id[raw_id], None)
+            self.by_id[raw_id] = self.ccxt_names[raw_id]
+            self.by_unified[self.by_id[raw_id]] = raw_id
+        if renamed:
+            logger.info(f"🗂️ Symbol registry aligned with CCXT names: {len(renamed)} renamed ({', '.join(renamed[:5])})")
+
+    def _build_aliases(self):
+        aliases = {}
+        # Priority: the id's own base, then the base without its multiplier, then nicknames
+        for raw_id in self.by_id:
+            aliases[raw_id[:-4]] = raw_id
+        for raw_id in self.by_id:
+            aliases.setdefault(RE_MULTIPLIER.sub("", raw_id[:-4]), raw_id)
+        for nickname, base in COIN_NICKNAMES.items():
+            if base in aliases:
+                aliases.setdefault(nickname, aliases[base])
+
+        trie = {}
+        for alias, raw_id in aliases.items():
+            level = trie
+            for ch in alias:
+                node = level.setdefault(ch, {'ids': set(), 'next': {}})
+                node['ids'].add(raw_id)
+                level = node['next']
+        self.aliases, self.trie = aliases, trie
+
+    def complete(self, prefix):
+        """Raw ids whose base (or alias) starts with prefix."""
+        level, node = self.trie, None
+        for ch in prefix:
+            node = level.get(ch)
+            if node is None:
+                return set()
+            level = node['next']
+        return node['ids'] if node else set()
+
+    def resolve(self, base):
+        """
+        Channel coin name -> (raw id, how) or (None, None). Order: exact id, alias
+        (multiplier / nickname), then a prefix that completes to exactly one contract.
+        """
+        if f"{base}USDT" in self.by_id:
+            return f"{base}USDT", "exact"
+        if base in self.aliases:
+            return self.aliases[base], "alias"
+        if len(base) >= MIN_PREFIX:
+            candidates = self.complete(base)
+            if len(candidates) == 1:
+                return next(iter(candidates)), "prefix"
+            if candidates:
+                logger.info(f"Ambiguous symbol prefix '{base}': {sorted(candidates)[:5]}")
+        return None, None
+
+    def raw_id(self, symbol):
+        """Any symbol form -> raw Bitget id ('BTCUSDT')."""
+        return self.by_unified.get(symbol) or normalize_symbol(symbol)
+
+    def unified(self, symbol):
+        """Any symbol form -> CCXT unified futures symbol, or None if not a listed USDT future."""
+        return symbol if symbol in self.by_unified else self.by_id.get(self.raw_id(symbol))
+
+    def id_for_base(self, base):
+        return self.by_base.get(base)
+
+    def __contains__(self, raw_id):
+        return raw_id in self.by_id
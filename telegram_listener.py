@@ -3,11 +3,16 @@ from telethon import TelegramClient, events
 import logging
 import asyncio
 import time
-from config import TELEGRAM_API_ID, TELEGRAM_API_HASH, TELEGRAM_CHANNEL_ID, NOTIFICATION_USER_ID
-from parser import parse_message
+from collections import deque
+from config import TELEGRAM_API_ID, TELEGRAM_API_HASH, TELEGRAM_CHANNEL_ID, NOTIFICATION_USER_ID, EDIT_DEBOUNCE_SECONDS, CATCHUP_MAX_MESSAGES, CATCHUP_MAX_AGE, CATCHUP_CHECK_INTERVAL, POSITION_RECONCILE_INTERVAL
+from parser import parse_message, parse_batch, get_parser_stats, compact_reply_context, llm_breaker
+from local_parser import guess_symbol
+from prefilter import matches_keywords, prefilter_message
+from edit_tracker import EditTracker, EditDebouncer
 from risk_manager import RiskManager
 from exchange_handler import ExchangeHandler
-from database import store_trade, get_trade_by_msg_id, update_trade_order_id, update_trade_sl, close_trade_db, get_open_trade_count, get_all_open_trades, get_recent_trades, reserve_trade, update_trade_full, get_stats_report, get_monthly_stats, clear_all_trades, update_trade_entry, update_trade_tp, get_setting, update_setting, delete_trade
+from rate_limiter import in_lane
+from database import store_trade, get_trade_by_msg_id, update_trade_order_id, update_trade_sl, close_trade_db, get_open_trade_count, get_all_open_trades, get_recent_trades, reserve_trade, update_trade_full, get_stats_report, get_monthly_stats, clear_all_trades, update_trade_entry, update_trade_tp, get_setting, update_setting, delete_trade, get_pending_entry_by_order_id, mark_entry_filled
 from notifier import Notifier
 
 logger = logging.getLogger(__name__)
@@ -28,15 +33,61 @@ class TelegramListener:
         # Guard against duplicate closure notifications
         self.processing_closures = set()
 
+        # Edit bursts: debounce per message id, skip edits that don't touch trade tokens
+        self.edit_tracker = EditTracker(symbols=self.exchange.symbols)
+        self.edit_debouncer = EditDebouncer(EDIT_DEBOUNCE_SECONDS)
+        self.cosmetic_edits_skipped = 0
+
+        # Backlog catch-up: last handled channel message id (persisted) + ids already claimed by
+        # the live handler or a catch-up run, so a message is never processed twice
+        self.last_processed_id = None
+        self.claimed_ids = set()
+        self.claimed_order = deque()
+        self.catchup_lock = asyncio.Lock()
+        # From checkpoint load until a catch-up is done, the checkpoint stays below its first unfinished
+        # message; newer live ids are held and written once the batch is done (a crash replays the rest)
+        self.catchup_floor = None
+        self.held_checkpoint = None
+        self.catchup_stats = {"runs": 0, "messages": 0, "parsed": 0, "stale_skipped": 0, "last_ms": 0.0}
+
+        # Reply context sent to Gemini: structured trade summary instead of the raw replied-to text
+        self.context_stats = {"structured": 0, "raw": 0, "chars_before": 0, "chars_after": 0}
+
+        # Gemini outage alerts (the parser falls back to the local grammar on its own)
+        llm_breaker.on_state_change = self.on_llm_breaker_change
+
+        # Push-driven trade monitor: exchange events wake it, polling is only a reconciliation backstop.
+        # be_watch: open trades below 0.5R ({instId: (entry, sl, side)}), checked on every ticker push.
+        self.monitor_wake = asyncio.Event()
+        self.be_watch = {}
+        self.push_stats = {"wakeups": 0, "fills": 0, "polls": 0}
+        bus = self.exchange.event_bus
+        bus.subscribe("orders", self.on_order_event)
+        bus.subscribe("positions", lambda data: self.wake_monitor("position update"))
+        bus.subscribe("orders-algo", self.on_plan_order_event)
+        bus.subscribe("ticker", self.on_ticker_event)
+
     async def start(self):
+        # Symbol lookups: instant from the contracts snapshot, before any handler or the catch-up can
+        # call validate_symbol (otherwise the first ones would wait on a full CCXT load_markets)
+        self.exchange.boot_markets()
+
+        # Catch-up checkpoint, loaded before the live handlers can move it past the missed backlog
+        await self.load_checkpoint()
+
         # 1. Channel Listener (Userbot)
         @self.client.on(events.NewMessage(chats=self.channel_id))
         async def handler_new(event):
-            await self.process_message(event)
+            if not self.claim_message(event.message.id):
+                return
+            try:
+                await self.process_message(event)
+            finally:
+                await self.mark_processed(event.message.id)
 
         @self.client.on(events.MessageEdited(chats=self.channel_id))
         async def handler_edit(event):
-            await self.process_message(event, is_edit=True)
+            self.edit_debouncer.submit(event.message.id, self.process_edit, event)
 
         # 2. DM Listener (Bot API) - For Mock Signals
         @self.bot_client.on(events.NewMessage(incoming=True, func=lambda e: e.is_private))
@@ -89,6 +140,10 @@ class TelegramListener:
         
         # Fetch and notify last message on startup
         await self.notify_last_message()
+
+        # Replay channel messages missed while the bot was down, then watch for reconnects
+        asyncio.create_task(self.catch_up_backlog("startup"))
+        asyncio.create_task(self.connection_watch_task())
         
         # Send Status on Startup
         await self.send_status()
@@ -99,9 +154,19 @@ class TelegramListener:
         # Start Trade Monitor (Immediate Alerts)
         asyncio.create_task(self.monitor_trade_updates())
 
-        # Pre-warm Exchange Markets
+        # Symbol lookups refreshed from the API in the background (booted at the top of start())
+        asyncio.create_task(self.exchange.market_refresh_task())
+
+        # Restore + validate the hedge/margin/leverage cache, prewarm the most traded symbols
+        asyncio.create_task(self.exchange.prewarm_config())
+
+        # Pre-warm CCXT Markets (order precision); no longer on the symbol lookup path.
+        # Once loaded, the registry takes over CCXT's unified names (DEGENUSDT -> DegenReborn/USDT:USDT).
         logger.info("Pre-warming exchange markets info...")
-        asyncio.create_task(self.exchange.exchange.load_markets())
+        asyncio.create_task(self.exchange.load_ccxt_markets())
+
+        # WebSocket feeds: live ticker book (public) + order/position pushes for the monitor (private)
+        self.exchange.start_streams()
 
     async def notify_last_message(self):
         try:
@@ -122,9 +187,13 @@ class TelegramListener:
         msg_id = event.message.id
         sender_id = event.sender_id
         
+        # Reply lookup is a Telegram round trip: start it now, await it only when needed
+        reply_task = asyncio.create_task(event.get_reply_message())
+        
         # --- PAUSE CHECK ---
         is_paused = await get_setting("trading_paused", "false")
         if is_paused == "true":
+            reply_task.cancel()
             logger.info(f"Trading is PAUSED. Ignoring message {msg_id}.")
             # We only notify if it looks like a trade call to avoid spamming for every message
             if any(x in text.upper() for x in ["LONG", "SHORT", "ENTRY", "LIMIT"]):
@@ -134,9 +203,6 @@ class TelegramListener:
         # Mock Mode Detection
         # Default to False unless overridden or MOCK prefix used
         is_mock = is_mock_override
-            
-        reply_msg = await event.get_reply_message()
-        reply_context = reply_msg.message if reply_msg else ""
         
         # Explicit MOCK Command
         if text.lstrip().upper().startswith("MOCK"):
@@ -151,21 +217,46 @@ class TelegramListener:
 
         # Safety Check: Ignore "ideas"
         if "IDEA" in text.upper():
+            reply_task.cancel()
             logger.info(f"Skipping potential 'idea' signal {msg_id}: {text[:30]}...")
             return
 
-        # Local Pre-Filtering to save API costs
-        if not self.should_parse_message(text, reply_context):
+        # Local Pre-Filtering to save API costs.
+        # Trade-call shaped text (LONG/SHORT) starts the speculative exchange reads before the reply lookup lands.
+        # The reply context is only scanned when the message itself has no keyword.
+        text_filter = prefilter_message(text)
+        prefetch = self.start_prefetch(text) if text_filter.is_trade_call_shaped else None
+
+        reply_msg = await reply_task
+        reply_context = await self.build_reply_context(reply_msg)
+
+        if not text_filter.matched and not matches_keywords(reply_context):
             logger.info(f"Skipping message {msg_id} locally (no active trade keywords): {text[:50]}...")
             return
 
         # Parse
         data = await parse_message(text, reply_context)
+        self.edit_tracker.remember(msg_id, event.message.message, dict(data))
         data['raw_message'] = text # Inject raw text for advanced processing
-        
+
+        await self.dispatch_parsed(msg_id, data, reply_msg_id=reply_msg.id if reply_msg else None, is_mock=is_mock, prefetch=prefetch)
+
+    @in_lane("order")
+    async def dispatch_parsed(self, msg_id, data, reply_msg_id=None, is_mock=False, prefetch=None, signal_age=None):
+        """
+        Executes a parsed message: trade calls are validated, reserved and traded, updates applied.
+        signal_age (seconds) is set for backlog messages and turns on the staleness check.
+        """
+        if data['type'] != 'TRADE_CALL':
+            # Speculative reads are only consumed by trade calls
+            self.cancel_prefetch(prefetch)
+
         if data['type'] == 'TRADE_CALL':
             # 1. VALIDATE SYMBOL FIRST (So we reserve the correct normalized name)
             raw_symbol = data.get('symbol', 'UNKNOWN')
+            if prefetch and prefetch['price'] and guess_symbol(f"#{raw_symbol}") != prefetch['price_guess']:
+                # Wrong guess: drop the speculative ticker, handle_trade_call fetches the right one
+                prefetch['price'].cancel()
             symbol = await self.exchange.validate_symbol(raw_symbol)
             data['symbol'] = symbol # Update data with normalized symbol
             
@@ -173,6 +264,7 @@ class TelegramListener:
             is_reserved = await reserve_trade(msg_id, symbol)
             
             if not is_reserved:
+                self.cancel_prefetch(prefetch)
                 logger.info(f"Ignored duplicate/edited TRADE_CALL {msg_id} (Already processed/reserved).")
             else:
                 try:
@@ -180,7 +272,7 @@ class TelegramListener:
                     # Use a try block to handle deletion on failure
                     execution_started = False
                     try:
-                        execution_started = await self.handle_trade_call(msg_id, data, is_mock)
+                        execution_started = await self.handle_trade_call(msg_id, data, is_mock, prefetch=prefetch, signal_age=signal_age)
                     except Exception as handle_e:
                         logger.error(f"Error handling trade call {msg_id}: {handle_e}")
                         # If we never even opened it, delete the reservation
@@ -197,31 +289,303 @@ class TelegramListener:
                     await delete_trade(msg_id)
 
         elif data['type'] == 'UPDATE':
-            await self.handle_update(msg_id, data, reply_msg_id=reply_msg.id if reply_msg else None, is_mock=is_mock)
+            await self.handle_update(msg_id, data, reply_msg_id=reply_msg_id, is_mock=is_mock)
+        elif data.get('degraded'):
+            # Passed the keyword prefilter but Gemini is down and the local grammar could not read it
+            text = data.get('raw_message', '')
+            logger.warning(f"Unparsed signal {msg_id} while Gemini is unavailable: {text[:50]}...")
+            await self.notifier.send(f"⚠️ **Gemini unavailable** - could not parse message {msg_id} locally. Please check it manually:\n\n{text[:500]}")
         else:
             logger.info(f"Ignored message type: {data.get('type')}")
 
-    def should_parse_message(self, text: str, reply_context: str = "") -> bool:
-        """Determines if a message is worth sending to Gemini based on action keywords."""
-        import re
-        combined_text = (text + " " + reply_context).upper()
-        
-        # Pre-clean common phrase false positives
-        clean_text = re.sub(r'\bAS\s+LONG\s+AS\b', '', combined_text)
+    def on_llm_breaker_change(self, old_state, new_state, reason):
+        if new_state == "OPEN" and old_state == "CLOSED":
+            message = f"🔴 **Gemini circuit OPEN** ({reason}).\nParsing with the local grammar only; signals it cannot read will be forwarded to you."
+        elif new_state == "CLOSED":
+            message = f"🟢 **Gemini circuit closed** ({reason}). LLM parsing restored."
+        else:
+            return # Half-open probes and re-opens during one outage are only logged
+        asyncio.create_task(self.notifier.send(message))
+
+    async def build_reply_context(self, reply_msg):
+        """
+        Compact prompt context for a reply: the stored trade (DB row, else the earlier parse of the
+        replied-to message) as a one-line summary. Falls back to the (truncated) raw text.
+        """
+        if not reply_msg:
+            return ""
+        raw_text = reply_msg.message or ""
+        trade = await get_trade_by_msg_id(reply_msg.id)
+        if not trade:
+            parsed = self.edit_tracker.last_data(reply_msg.id)
+            trade = parsed if parsed and parsed.get('type') == 'TRADE_CALL' else None
+
+        context = await compact_reply_context(raw_text, trade)
+        self.context_stats["structured" if context.startswith("TRADE ") else "raw"] += 1
+        self.context_stats["chars_before"] += len(raw_text)
+        self.context_stats["chars_after"] += len(context)
+        return context
+
+    def claim_message(self, msg_id):
+        """True the first time a channel message id is seen; the live handler and catch-up never both take one."""
+        if msg_id in self.claimed_ids:
+            return False
+        self.claimed_ids.add(msg_id)
+        self.claimed_order.append(msg_id)
+        if len(self.claimed_order) > 1000:
+            self.claimed_ids.discard(self.claimed_order.popleft())
+        return True
+
+    async def load_checkpoint(self):
+        """Reads the persisted catch-up checkpoint (last handled channel message id)."""
+        saved = await get_setting("last_channel_msg_id")
+        self.last_processed_id = int(saved) if saved else None
+        if self.last_processed_id is not None:
+            self.catchup_floor = self.last_processed_id + 1  # Held until the startup catch-up has run
+
+    async def release_checkpoint(self, msg_id=0):
+        """Ends a catch-up: lifts the floor and writes the batch end or the newest held live id."""
+        self.catchup_floor = None
+        latest, self.held_checkpoint = max(msg_id, self.held_checkpoint or 0), None
+        if latest:
+            await self.mark_processed(latest)
+
+    async def mark_processed(self, msg_id):
+        """Advances the persisted catch-up checkpoint (never backwards, never past an unfinished catch-up message)."""
+        if self.catchup_floor is not None and msg_id >= self.catchup_floor:
+            self.held_checkpoint = max(self.held_checkpoint or 0, msg_id)
+            msg_id = self.catchup_floor - 1
+        if self.last_processed_id is not None and msg_id <= self.last_processed_id:
+            return
+        self.last_processed_id = msg_id
+        await update_setting("last_channel_msg_id", str(msg_id))
+
+    async def connection_watch_task(self):
+        """Runs a backlog catch-up whenever the userbot connection comes back."""
+        was_connected = True
+        while True:
+            await asyncio.sleep(CATCHUP_CHECK_INTERVAL)
+            connected = self.client.is_connected()
+            if connected and not was_connected:
+                logger.info("🔌 Listener reconnected. Catching up on missed channel messages...")
+                await self.catch_up_backlog("reconnect")
+            was_connected = connected
+
+    async def catch_up_backlog(self, reason="startup"):
+        """
+        Replays channel messages newer than the last processed id.
+        One history request, one request for all replied-to messages, prefilter, then batched
+        parsing (several messages per Gemini call). Execution stays sequential in message order,
+        and trade calls go through the staleness check against the current price.
+        """
+        if self.catchup_lock.locked():
+            return
+        async with self.catchup_lock:
+            try:
+                await self._catch_up(reason)
+            except Exception as e:
+                logger.error(f"Backlog catch-up ({reason}) failed: {e}")
+                await self.notifier.send(f"⚠️ Backlog catch-up failed ({reason}): `{e}`")
+            finally:
+                self.catchup_floor = None
+
+    async def _catch_up(self, reason):
+        start_time = time.perf_counter()
+        if self.last_processed_id is None:
+            latest = await self.client.get_messages(self.channel_id, limit=1)
+            if latest:
+                await self.mark_processed(latest[0].id)
+            logger.info("No catch-up checkpoint yet. Starting from the latest channel message.")
+            return
+
+        last_id = self.last_processed_id
+        self.catchup_floor = last_id + 1
+        history = await self.client.get_messages(self.channel_id, min_id=last_id, limit=CATCHUP_MAX_MESSAGES)
+        missed = sorted((m for m in history if m and m.id > last_id), key=lambda m: m.id)
+        if not missed:
+            logger.info(f"Catch-up ({reason}): no missed channel messages.")
+            await self.release_checkpoint()
+            return
+
+        if await get_setting("trading_paused", "false") == "true":
+            logger.info(f"Trading is PAUSED. Skipping {len(missed)} missed channel messages.")
+            await self.release_checkpoint(missed[-1].id)
+            return
+
+        now = time.time()
+        fresh = [m for m in missed if now - m.date.timestamp() <= CATCHUP_MAX_AGE]
+
+        # All replied-to messages in one round trip
+        reply_ids = list({m.reply_to_msg_id for m in fresh if m.reply_to_msg_id})
+        replies = {}
+        if reply_ids:
+            fetched = await self.client.get_messages(self.channel_id, ids=reply_ids)
+            replies = {r.id: r for r in fetched if r}
+
+        candidates = []
+        for m in fresh:
+            if not self.claim_message(m.id):
+                continue # Already handled live
+            text = m.message or ""
+            reply = replies.get(m.reply_to_msg_id)
+            reply_context = await self.build_reply_context(reply)
+            if "IDEA" in text.upper() or not prefilter_message(text, reply_context).matched:
+                continue
+            candidates.append((m, reply, text, reply_context))
+
+        logger.info(f"📥 Catch-up ({reason}): {len(missed)} missed, {len(missed) - len(fresh)} too old, {len(candidates)} to parse.")
+        results = await parse_batch([(text, reply_context) for _, _, text, reply_context in candidates])
+        parse_ms = (time.perf_counter() - start_time) * 1000
+
+        actionable = 0
+        stale_before = self.catchup_stats["stale_skipped"]
+        for (m, reply, text, _), data in zip(candidates, results):
+            self.catchup_floor = m.id
+            self.edit_tracker.remember(m.id, text, dict(data))
+            data['raw_message'] = text
+            if data['type'] == 'IGNORE':
+                if data.get('degraded'):
+                    await self.dispatch_parsed(m.id, data) # Forwards it to the admin
+                continue
+            actionable += 1
+            await self.dispatch_parsed(m.id, data, reply_msg_id=reply.id if reply else None, signal_age=now - m.date.timestamp())
+        await self.release_checkpoint(missed[-1].id)
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.catchup_stats["runs"] += 1
+        self.catchup_stats["messages"] += len(missed)
+        self.catchup_stats["parsed"] += len(candidates)
+        self.catchup_stats["last_ms"] = elapsed_ms
+        stale = self.catchup_stats["stale_skipped"] - stale_before
+        logger.info(f"📥 Catch-up done in {elapsed_ms:.0f}ms (parse {parse_ms:.0f}ms): {actionable} actionable, {stale} stale.")
+        await self.notifier.send(
+            f"📥 **Backlog Catch-up ({reason})**\n"
+            f"Missed: `{len(missed)}` | Too old: `{len(missed) - len(fresh)}` | Parsed: `{len(candidates)}`\n"
+            f"Actionable: `{actionable}` | Stale signals skipped: `{stale}`\n"
+            f"Time: `{elapsed_ms:.0f}ms` (parse `{parse_ms:.0f}ms`)"
+        )
+
+    async def process_edit(self, event):
+        """
+        Runs once per debounced edit burst.
+        Cosmetic edits are dropped; SL/TP edits of an already-open trade go straight to handle_update.
+        """
+        msg_id = event.message.id
+        text = event.message.message or ""
         
-        # Define whole-word keywords with numeric support for levels like TP1, SL1 etc.
-        keywords = [
-            r'\bLONG\b', r'\bSHORT\b', r'\bBUY\b', r'\bSELL\b',
-            r'\bSL\d*\b', r'\bTP\d*\b', r'\bTARGET\d*\b', r'\bSTOP\b', r'\bINVALIDATION\b',
-            r'\bCLOSE\b', r'\bCANCEL\b', r'\bBOOKED\b', r'\bHIT\b', r'\bMOVE\b', 
-            r'\bEXIT\b', r'\bDELETE\b', r'\bBREAKEVEN\b', r'\bBE\b',
-            r'❌', r'🎯'
-        ]
+        if not self.edit_tracker.has_changed(msg_id, text):
+            self.cosmetic_edits_skipped += 1
+            logger.info(f"Ignoring cosmetic edit of message {msg_id} (no trade-relevant changes).")
+            return
+
+        trade = await get_trade_by_msg_id(msg_id)
+        if trade and trade['status'] in ('OPEN', 'MOCK'):
+            await self.apply_signal_edit(msg_id, text, trade)
+            return
+
+        await self.process_message(event, is_edit=True)
+
+    async def apply_signal_edit(self, msg_id, text, trade):
+        """Turns an edited SL/TP on an executed trade call into MOVE_SL / MOVE_TP updates."""
+        previous = self.edit_tracker.last_data(msg_id) or {}
+        data = await parse_message(text)
+        self.edit_tracker.remember(msg_id, text, dict(data))
         
-        return any(re.search(pattern, clean_text) for pattern in keywords)
+        if data.get('type') != 'TRADE_CALL':
+            logger.info(f"Edit of executed signal {msg_id} no longer parses as a trade call. No action.")
+            return
+
+        def changed(new_val, old_val, db_val):
+            if new_val is None:
+                return False
+            if old_val is not None:
+                return new_val != old_val
+            # No parse in memory (e.g. after restart): compare against the stored, scaled DB value
+            if not db_val:
+                return True
+            ref_price = trade.get('entry_price') or db_val
+            return abs(self.risk_manager.scale_price(new_val, ref_price) - db_val) > db_val * 1e-6
+
+        new_tp = (data.get('tp') or [None])[0]
+        old_tp = (previous.get('tp') or [None])[0]
+        updates = []
+        if changed(data.get('sl'), previous.get('sl'), trade.get('sl_price')):
+            updates.append({'type': 'UPDATE', 'action': 'MOVE_SL', 'value': data['sl']})
+        if changed(new_tp, old_tp, trade.get('tp_price')):
+            updates.append({'type': 'UPDATE', 'action': 'MOVE_TP', 'value': new_tp})
+
+        if not updates:
+            logger.info(f"Edit of executed signal {msg_id} changed no SL/TP. Entry/direction edits are not applied to open trades.")
+            return
+
+        for update in updates:
+            logger.info(f"✏️ Signal {msg_id} edited: routing {update['action']} -> {update['value']}")
+            update['raw_message'] = text
+            await self.handle_update(msg_id, update, reply_msg_id=msg_id, is_mock=trade['status'] == 'MOCK')
+
+    def start_prefetch(self, text):
+        """
+        Starts the reads a trade call will need (positions, balance and, if a symbol can be
+        guessed from the raw text, its ticker) so they overlap with the Gemini call.
+        """
+        def _silence(task):
+            # Unused speculative results must not log 'exception was never retrieved'
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            return task
+
+        symbol_guess = guess_symbol(text)
+        prefetch = {
+            'positions': _silence(asyncio.create_task(self.exchange.get_all_positions())),
+            'balance': _silence(asyncio.create_task(self.exchange.get_balance())),
+            'price': None,
+            'price_guess': symbol_guess,
+        }
+        if symbol_guess:
+            prefetch['price'] = _silence(asyncio.create_task(self._fetch_guessed_price(symbol_guess)))
+        logger.info(f"⚡ Prefetch started (Symbol guess: {symbol_guess or 'None'})")
+        return prefetch
+
+    async def _fetch_guessed_price(self, symbol_guess):
+        symbol = await self.exchange.validate_symbol(symbol_guess)
+        return symbol, await self.exchange.get_market_price(symbol)
+
+    def cancel_prefetch(self, prefetch):
+        if not prefetch:
+            return
+        for key in ('positions', 'balance', 'price'):
+            task = prefetch.get(key)
+            if task and not task.done():
+                task.cancel()
+
+    async def _prefetched(self, prefetch, key, fetch):
+        """Awaits a speculative read from process_message, or runs `fetch` if there is none."""
+        task = (prefetch or {}).get(key)
+        if task is None or task.cancelled():
+            return await fetch()
+        return await task
+
+    async def _prefetched_price(self, symbol, prefetch):
+        """Uses the speculative ticker only if it was fetched for the validated symbol."""
+        task = (prefetch or {}).get('price')
+        if task and not task.cancelled():
+            try:
+                guessed_symbol, price = await task
+                if guessed_symbol == symbol:
+                    return price
+            except Exception as e:
+                logger.info(f"Speculative price for {prefetch['price_guess']} unusable ({e}). Fetching {symbol} directly.")
+        return await self.exchange.get_market_price(symbol)
 
-    async def handle_trade_call(self, msg_id, data, is_mock=False):
-        """Returns True if trade was opened or mocked successfully, False if aborted/failed."""
+    def should_parse_message(self, text: str, reply_context: str = "") -> bool:
+        """Determines if a message is worth sending to Gemini based on action keywords."""
+        return prefilter_message(text, reply_context).matched
+
+    async def handle_trade_call(self, msg_id, data, is_mock=False, prefetch=None, signal_age=None):
+        """
+        Returns True if trade was opened or mocked successfully, False if aborted/failed.
+        prefetch: speculative reads started by process_message (see start_prefetch).
+        signal_age: seconds since the signal was posted (backlog catch-up) -> staleness check.
+        """
         start_time = time.perf_counter()
         
         symbol = data['symbol'] # Already validated in process_message
@@ -234,10 +598,11 @@ class TelegramListener:
         
         try:
             # 1. Gather EVERYTHING in parallel
+            # Reuses reads that were already started while the message was being parsed
             results = await asyncio.gather(
-                self.exchange.get_all_positions(),
-                self.exchange.get_balance(),
-                self.exchange.get_market_price(symbol),
+                self._prefetched(prefetch, 'positions', self.exchange.get_all_positions),
+                self._prefetched(prefetch, 'balance', self.exchange.get_balance),
+                self._prefetched_price(symbol, prefetch),
                 return_exceptions=True
             )
             
@@ -304,6 +669,15 @@ class TelegramListener:
         else:
             tp_display = "None"
 
+        # Late signal (backlog catch-up): skip setups the market already invalidated
+        if signal_age is not None:
+            is_stale, stale_reason = self.risk_manager.check_signal_staleness(direction, entry_price, sl_price, tp_price, market_price, signal_age, CATCHUP_MAX_AGE)
+            if is_stale:
+                self.catchup_stats["stale_skipped"] += 1
+                await self.notifier.send(f"⌛ Stale signal skipped {symbol}: {stale_reason}")
+                return False
+            logger.info(f"Late signal {symbol} passed staleness check: {stale_reason}")
+
         # Decision Logic (Market vs Limit vs Abort)
         explicit_type = data.get('order_type', 'MARKET')
         action, decision_price, reason = self.risk_manager.determine_entry_action(entry_price, market_price, explicit_type)
@@ -394,8 +768,10 @@ class TelegramListener:
                      fill_price = float(order['price'])
                 
                 # UPDATE the reserved trade (PROCESSING -> OPEN)
+                # A real limit entry without a fill yet stays pending until its fill push (on_order_event)
                 db_notes = f"Risk: {risk_scalar}R" if risk_scalar != 1.0 else None
-                await update_trade_full(msg_id, order['id'], symbol, fill_price, sl_price, tp_price=tp_price, status="OPEN", position_side=direction, leverage=leverage, notes=db_notes)
+                entry_pending = action == 'LIMIT' and not order.get('average') and order.get('status') != 'closed'
+                await update_trade_full(msg_id, order['id'], symbol, fill_price, sl_price, tp_price=tp_price, status="OPEN", position_side=direction, leverage=leverage, notes=db_notes, entry_pending=entry_pending)
                 
                 risk_note = f"\n**Risk:** {risk_scalar}R" if risk_scalar != 1.0 else ""
                 await self.notifier.send(f"🟢 {final_order_type} Order Opened: {symbol} at {fill_price} with {leverage}x.\n**TP:** {tp_display}\n**SL:** {sl_price}\n**Margin:** ${position_size_usdt:.2f}{risk_note}\nReason: {reason}")
@@ -670,17 +1046,95 @@ class TelegramListener:
         msg += "**Features:**\n"
         msg += "✅ Parallel Data Fetching\n"
         msg += "✅ Conditional Configuration Caching\n"
-        msg += "✅ Pre-warmed Symbol Info\n\n"
+        msg += "✅ Pre-warmed Symbol Info\n"
+        msg += "✅ Async Parsing Pool\n"
+        msg += "✅ Local Fast-Path Parser\n"
+        msg += "✅ Persistent Parse Cache\n"
+        msg += "✅ Speculative Prefetch Pipeline\n"
+        msg += "✅ Edit Debouncing & Diffing\n"
+        msg += "✅ Hedged LLM Requests\n"
+        msg += "✅ Batched Backlog Catch-up\n"
+        msg += "✅ Compact Reply Context\n"
+        msg += "✅ Gemini Circuit Breaker\n"
+        msg += "✅ Streaming Ticker Book\n"
+        msg += "✅ Push-Driven Trade Monitor\n"
+        msg += "✅ Persistent Config Cache\n"
+        msg += "✅ Priority Rate Limiter\n"
+        msg += "✅ Hedged Price Reads\n\n"
+        
+        p_stats = get_parser_stats()
+        msg += f"🧠 **Parser:** Local hits: `{p_stats['local_hits']}` | "
+        msg += f"Pool: `{p_stats['in_flight']}/{p_stats['max_concurrency']}` in flight | "
+        msg += f"Queued: `{p_stats['queued']}` | Done: `{p_stats['completed']}` | "
+        msg += f"Timeouts: `{p_stats['timeouts']}` | Errors: `{p_stats['errors']}`\n"
+        b_stats = p_stats['breaker']
+        msg += f"🔌 **Gemini Circuit:** `{b_stats['state']}` | Errors `{b_stats['error_rate']*100:.0f}%` / Slow `{b_stats['slow_rate']*100:.0f}%` "
+        msg += f"(last {b_stats['window_calls']}) | Opened `{b_stats['opened']}` | Short-circuited `{b_stats['short_circuited']}` | "
+        msg += f"Local fallback: parsed `{p_stats['degraded_parses']}` / missed `{p_stats['degraded_misses']}`\n"
+        msg += f"🪁 **Hedging:** after `{p_stats['hedge_delay']}s` | Fired `{p_stats['hedges_fired']}` | Won `{p_stats['hedge_wins']}`\n"
+        for model, hist in p_stats['latency'].items():
+            msg += f"   └ {model}: {hist.format_line()}\n"
+        c_stats = p_stats['cache']
+        msg += f"♻️ **Parse Cache:** Hit rate `{c_stats['hit_rate']*100:.0f}%` "
+        msg += f"(Mem: `{c_stats['memory_hits']}` | DB: `{c_stats['db_hits']}` | Miss: `{c_stats['misses']}`)\n"
+        msg += f"✏️ **Edits:** Coalesced `{self.edit_debouncer.stats['coalesced']}` | Cosmetic skipped `{self.cosmetic_edits_skipped}`\n"
+        cu = self.catchup_stats
+        msg += f"📥 **Catch-up:** Runs `{cu['runs']}` | Missed `{cu['messages']}` | Parsed `{cu['parsed']}` | "
+        msg += f"Batches `{p_stats['batches']}` | Stale `{cu['stale_skipped']}` | Last `{cu['last_ms']:.0f}ms`\n"
+        cs = self.context_stats
+        if cs['chars_before']:
+            msg += f"🗜️ **Reply Context:** Structured `{cs['structured']}` | Raw `{cs['raw']}` | "
+            msg += f"Chars `{cs['chars_before']}` → `{cs['chars_after']}` (-{(1 - cs['chars_after'] / cs['chars_before']) * 100:.0f}%)\n"
+        if p_stats['tokens']:
+            msg += "🔢 **Tokens per request:**\n"
+        for kind, t in sorted(p_stats['tokens'].items()):
+            msg += f"   └ {kind}: `{t['requests']}` req | avg in `{t['prompt_tokens'] / t['requests']:.0f}` / out `{t['output_tokens'] / t['requests']:.0f}` tok | avg `{t['latency_ms'] / t['requests']:.0f}ms`\n"
+        msg += "\n"
         
+        if self.exchange.market_stream:
+            m_stats = self.exchange.market_stream.get_stats()
+            msg += f"📡 **Market Stream:** {'🟢 Connected' if m_stats['connected'] else '🔴 Disconnected'} | Symbols `{m_stats['symbols']}` | "
+            msg += f"Hit rate `{m_stats['hit_rate']*100:.0f}%` (Stale `{m_stats['stale']}` | Miss `{m_stats['misses']}`) | Reconnects `{m_stats['reconnects']}`\n"
+        if self.exchange.private_stream:
+            pr_stats = self.exchange.private_stream.stats
+            msg += f"🔐 **Private Stream:** {'🟢 Connected' if self.exchange.private_stream.connected.is_set() else '🔴 Disconnected'} | "
+            msg += f"Pushes `{pr_stats['pushes']}` | Reconnects `{pr_stats['reconnects']}`\n"
+        r_stats = self.exchange.rest.get_stats()
+        read_stats = self.exchange.reads.get_stats()
+        p_stats = self.exchange.plans.get_stats()
+        if self.exchange.tpsl_latency.total:
+            last = self.exchange.last_tpsl_timings
+            msg += f"🛡️ **TP/SL Replace:** {self.exchange.tpsl_latency.format_line()} | Last {last['kind'].upper()} {last['symbol']}: "
+            msg += " | ".join(f"{k} `{v:.0f}ms`" for k, v in last.items() if k not in ('symbol', 'kind')) + "\n"
+        msg += f"📑 **Plan Index:** `{p_stats['orders']}` TP/SL orders on `{p_stats['symbols']}` symbols | Sweeps `{p_stats['sweeps']}` ({p_stats['pages']} pages) | Pushes `{p_stats['pushes']}`\n"
+        if read_stats:
+            msg += "🧊 **Read Cache:** " + " | ".join(
+                f"{kind} `{s['hits']}`H/`{s['coalesced']}`C/`{s['misses']}`M ({s['saved_rate']*100:.0f}% saved)" for kind, s in read_stats.items()) + "\n"
+        msg += f"🗂️ **Contracts:** `{len(self.exchange.symbols.by_id)}` from {self.exchange.symbols.source or 'not loaded'} (v`{self.exchange.contracts_version}`)\n"
+        msg += f"🔌 **REST Pool:** Requests `{r_stats['requests']}` | Handshakes `{r_stats['new_connections']}` | "
+        msg += f"Reuse `{r_stats['reuse_rate']*100:.0f}%` | Avg `{r_stats['avg_ms']:.0f}ms`\n"
+        pr = self.exchange.price_stats
+        msg += f"🏁 **Price Reads:** REST `{pr['reads']}` | Hedged `{pr['hedges_fired']}` | Raw won `{pr['hedge_wins']}` | Over budget `{pr['timeouts']}`\n"
+        for endpoint, hist in self.exchange.read_latency.items():
+            msg += f"   └ {endpoint}: {hist.format_line()}\n"
+        rl_stats = self.exchange.limiter.get_stats()
+        msg += f"🚦 **Rate Limiter:** Queued now `{rl_stats['queue_depth']}` | Max depth `{rl_stats['max_depth']}` | 429s `{rl_stats['throttled']}`\n"
+        for lane_name, s in rl_stats['lanes'].items():
+            msg += f"   └ {lane_name}: `{s['requests']}` req | queued `{s['queued']}` | wait p50 `{s['p50_wait']:.0f}ms` / p99 `{s['p99_wait']:.0f}ms` | retries `{s['retries']}`\n"
+        msg += f"👁️ **Monitor:** Push wake-ups `{self.push_stats['wakeups']}` | Polls `{self.push_stats['polls']}` | "
+        msg += f"Fills confirmed `{self.push_stats['fills']}` | BE watch `{len(self.be_watch)}`\n\n"
+
         if self.last_latency > 0:
             msg += f"📊 **Last Execution Trace:**\n"
             msg += f"   ⏱️ Total Time: `{self.last_latency:.0f}ms`\n"
             msg += f"   🛠️ Actions: `{', '.join(self.last_actions)}`\n\n"
 
         if not cache:
-            msg += "📭 **Cache:** Empty (No trades since restart)\n"
+            msg += "📭 **Cache:** Empty (nothing traded or prewarmed yet)\n"
         else:
-            msg += "**📂 Optimization Cache:**\n"
+            cfg = self.exchange.config_stats
+            msg += f"**📂 Optimization Cache:** Restored `{cfg['restored']}` | Validated `{cfg['validated']}` | "
+            msg += f"Corrected `{cfg['corrected']}` | Dropped `{cfg['dropped']}` | Prewarmed `{cfg['prewarmed']}`\n"
             for key, data in cache.items():
                 symbol = key.split("_")[0]
                 side = key.split("_")[1]
@@ -692,6 +1146,7 @@ class TelegramListener:
         msg += "\n💡 *Cached settings are skipped during execution to save ~1.5s.*"
         await self.notifier.send(msg)
 
+    @in_lane("report")
     async def send_status(self):
         try:
             bal_data = await self.exchange.get_balance()
@@ -722,6 +1177,7 @@ class TelegramListener:
         except Exception as e:
             await self.notifier.send(f"⚠️ Could not fetch status: {e}")
 
+    @in_lane("report")
     async def send_open_trades(self):
         # Use Real Exchange Data
         trades = await self.exchange.get_all_positions()
@@ -743,7 +1199,7 @@ class TelegramListener:
             liq_price = t.get('liquidationPrice') or 0.0
             margin = t.get('initialMargin') or t.get('maintenanceMargin') or 0.0
             
-            # Fetch active SL/TP
+            # Active SL/TP (plan-order index: one sweep covers every position)
             tp_list, sl_list = await self.exchange.get_active_tp_sl(symbol)
             
             # Format as strings
@@ -767,6 +1223,7 @@ class TelegramListener:
         
         await self.notifier.send(msg)
 
+    @in_lane("report")
     async def periodic_status_task(self):
         """Sends status updates based on dynamic schedule."""
         from datetime import datetime, timezone, timedelta
@@ -816,6 +1273,7 @@ class TelegramListener:
             # Check every 50s to avoid skipping minutes
             await asyncio.sleep(50)
 
+    @in_lane("report")
     async def send_market_update(self):
         """Sends current prices for Top 8 Crypto + Metals."""
         try:
@@ -863,8 +1321,77 @@ class TelegramListener:
             logger.error(f"Market update failed: {e}")
             await self.notifier.send(f"⚠️ Market update failed: {e}")
 
+    def wake_monitor(self, reason):
+        if not self.monitor_wake.is_set():
+            logger.info(f"⚡ Trade monitor woken: {reason}")
+            self.monitor_wake.set()
+
+    async def on_order_event(self, orders):
+        """Private stream 'orders' push: confirms pending limit entry fills and syncs the real entry price."""
+        for o in orders:
+            status = o.get('status')
+            if status not in ('filled', 'partially_filled'):
+                continue
+            self.wake_monitor(f"{o.get('instId')} order {status}")
+            if status != 'filled' or o.get('tradeSide', 'open') != 'open':
+                continue
+
+            # Market entries were announced (and priced) when placed: only pending limit entries count
+            trade = await get_pending_entry_by_order_id(o.get('orderId'))
+            if not trade:
+                continue
+            fill_price = float(o.get('priceAvg') or 0.0)
+            db_entry = float(trade.get('entry_price') or 0.0)
+            synced = fill_price if fill_price > 0 and (db_entry <= 0 or abs(fill_price - db_entry) / db_entry > 0.001) else None
+            if not await mark_entry_filled(trade['message_id'], synced):
+                continue # A repeated push already handled this fill
+            self.push_stats["fills"] += 1
+            if synced:
+                logger.info(f"🔄 Entry synced from fill for {trade['symbol']}: {db_entry} -> {fill_price}")
+            await self.notifier.send(f"✅ **Entry Filled:** {trade['symbol']} {o.get('orderType', '').upper()} @ {fill_price or db_entry}")
+
+    def on_plan_order_event(self, plans):
+        """Private stream 'orders-algo' push: a triggered TP/SL means a closure is on its way."""
+        for p in plans:
+            if p.get('status') in ('executing', 'executed'):
+                self.wake_monitor(f"{p.get('instId')} {p.get('planType', 'plan')} order {p['status']}")
+
+    def on_ticker_event(self, event):
+        """Public stream ticker push: wakes the monitor once a watched trade reaches 0.5R (auto-BE)."""
+        inst_id, ticker = event
+        watch = self.be_watch.get(inst_id)
+        if not watch:
+            return
+        entry, sl, side = watch
+        direction = 1 if side == 'long' else -1
+        current_r = ((ticker['mark'] - entry) / abs(entry - sl)) * direction
+        if current_r >= 0.5:
+            del self.be_watch[inst_id] # One wake-up; the monitor re-arms the watch if needed
+            self.wake_monitor(f"{inst_id} at {current_r:.2f}R (auto-BE)")
+
+    async def wait_for_monitor_wake(self):
+        """
+        Sleeps until a push event wakes the monitor, or the poll interval elapses. The long
+        interval needs the private stream and a live ticker for every auto-BE watch, else 60s.
+        """
+        stream = self.exchange.private_stream
+        market = self.exchange.market_stream
+        be_streamed = all(market and market.is_streaming(symbol) for symbol in self.be_watch)
+        interval = POSITION_RECONCILE_INTERVAL if stream and stream.connected.is_set() and be_streamed else 60
+        try:
+            await asyncio.wait_for(self.monitor_wake.wait(), timeout=interval)
+            self.push_stats["wakeups"] += 1
+            await asyncio.sleep(0.5) # One fill pushes orders + positions + account: let the burst settle
+        except asyncio.TimeoutError:
+            self.push_stats["polls"] += 1
+        self.monitor_wake.clear()
+
     async def monitor_trade_updates(self):
-        """Polls for trade closures (SL/TP) every 60s."""
+        """
+        Detects trade closures (SL/TP), syncs entries and applies auto-BE.
+        Runs on every exchange push (see wait_for_monitor_wake), else polls every 60s
+        (POSITION_RECONCILE_INTERVAL while the private stream is connected).
+        """
         logger.info("Trade Monitor Task Started.")
         last_positions = {}
         
@@ -934,7 +1461,7 @@ class TelegramListener:
                             open_trades = await get_all_open_trades()
                             # Find the trade for this symbol
                             # Normalization: BTC/USDT:USDT -> BTCUSDT
-                            normalized_symbol = symbol.replace("/", "").replace(":", "").split("USDT")[0] + "USDT"
+                            normalized_symbol = self.exchange.symbols.raw_id(symbol)
                             
                             # We might have multiple if bugged, but usually one OPEN per symbol
                             target_trade = next((t for t in open_trades if t['symbol'] == normalized_symbol or t['symbol'] == symbol), None)
@@ -955,19 +1482,14 @@ class TelegramListener:
                 # ----------------------------------
                 
                 # --- SYNC OPEN TRADES ENTRY PRICE ---
+                be_watch = {}
                 try:
                     open_trades_sync = await get_all_open_trades()
+                    # DB Symbol is normalized (BTCUSDT), Pos Symbol might be (BTC/USDT:USDT): index positions by raw id once
+                    positions_by_id = {self.exchange.symbols.raw_id(pos_sym): pos_data for pos_sym, pos_data in current_positions.items()}
                     for t in open_trades_sync:
                         # Find matching position
-                        # DB Symbol is normalized (BTCUSDT), Pos Symbol might be (BTC/USDT:USDT)
-                        # We need to find if 't' corresponds to any key in current_positions
-                        
-                        match_pos = None
-                        for pos_sym, pos_data in current_positions.items():
-                             norm_pos = pos_sym.replace("/", "").replace(":", "").split("USDT")[0] + "USDT"
-                             if norm_pos == t['symbol']:
-                                 match_pos = pos_data
-                                 break
+                        match_pos = positions_by_id.get(t['symbol'])
                         
                         if match_pos:
                             real_entry = float(match_pos.get('entryPrice', 0.0))
@@ -990,12 +1512,8 @@ class TelegramListener:
                             db_tp = float(t.get('tp_price') or 0.0)
 
                             if db_sl == 0.0 or db_tp == 0.0:
-                                # Fetch active SL/TP from exchange
-                                # We use pos_sym if match_pos was found (which it was, at line 805)
-                                # But we need pos_sym again. Let's find it.
-                                
-                                # Find original pos_sym from current_positions
-                                current_pos_sym = next((ps for ps, pd in current_positions.items() if pd == match_pos), t['symbol'])
+                                # Fetch active SL/TP from exchange (positions carry their own CCXT symbol)
+                                current_pos_sym = match_pos.get('symbol', t['symbol'])
                                 
                                 ex_tp_list, ex_sl_list = await self.exchange.get_active_tp_sl(current_pos_sym)
                                 ex_sl = ex_sl_list[0] if ex_sl_list else 0.0
@@ -1019,10 +1537,7 @@ class TelegramListener:
                             
                             # Only proceed if we have valid entry and original SL from DB
                             if db_entry > 0 and db_sl > 0 and db_entry != db_sl:
-                                current_pos_sym = next((ps for ps, pd in current_positions.items() if pd == match_pos), t['symbol'])
-                                ex_tp_list, ex_sl_list = await self.exchange.get_active_tp_sl(current_pos_sym)
-                                current_ex_sl = ex_sl_list[0] if ex_sl_list else 0.0
-                                
+                                current_pos_sym = match_pos.get('symbol', t['symbol'])
                                 mark_price = float(match_pos.get('markPrice', 0.0))
                                 side = match_pos.get('side', '').lower()
                                 
@@ -1032,7 +1547,14 @@ class TelegramListener:
                                 if mark_price > 0 and risk > 0:
                                     current_r = ((mark_price - db_entry) / risk) * direction
                                     
-                                    if current_r >= 0.5:
+                                    if current_r < 0.5:
+                                        # Ticker pushes wake the monitor the moment this trade reaches 0.5R
+                                        be_watch[t['symbol']] = (db_entry, db_sl, side)
+                                    else:
+                                        # Plan orders are only read once BE is in reach (saves a REST call per trade per cycle)
+                                        ex_tp_list, ex_sl_list = await self.exchange.get_active_tp_sl(current_pos_sym)
+                                        current_ex_sl = ex_sl_list[0] if ex_sl_list else 0.0
+
                                         # Calculate BE price with small buffer (e.g., 0.13% to cover fees)
                                         buffer_pct = 0.0013
                                         be_price = db_entry * (1 + buffer_pct) if side == 'long' else db_entry * (1 - buffer_pct)
@@ -1049,8 +1571,8 @@ class TelegramListener:
                                         if needs_update:
                                             logger.info(f"🛡️ Auto-BE Triggered for {t['symbol']} at {current_r:.2f}R! Moving SL to {be_price}")
                                             
-                                            # Update SL on exchange
-                                            result = await self.exchange.update_sl(current_pos_sym, be_price)
+                                            # Update SL on exchange (position already known, plans come from the index just read)
+                                            result = await self.exchange.update_sl(current_pos_sym, be_price, pos=match_pos)
                                             success = result[0] if isinstance(result, tuple) else result
                                             
                                             if success:
@@ -1060,12 +1582,13 @@ class TelegramListener:
 
                 except Exception as sync_loop_e:
                     logger.error(f"Sync Loop Error: {sync_loop_e}")
+                self.be_watch = be_watch
                 # ------------------------------------
                 
             except Exception as e:
                 logger.error(f"Trade monitor error: {e}")
             
-            await asyncio.sleep(60) # Poll every 60s
+            await self.wait_for_monitor_wake()
 
     async def send_database_records(self):
         """Sends the last 10 trades from the database."""
@@ -1145,6 +1668,7 @@ class TelegramListener:
             logger.error(f"DB Fetch failed: {e}")
             await self.notifier.send(f"⚠️ Error fetching history: {e}")
 
+    @in_lane("report")
     async def send_performance_stats(self, command_text):
         """Sends performance stats report."""
         try:
@@ -1336,10 +1860,10 @@ class TelegramListener:
         found_count = 0
         try:
             open_trades_sync = await get_all_open_trades()
-            db_symbols = [t['symbol'] for t in open_trades_sync]
+            db_symbols = {t['symbol'] for t in open_trades_sync}
             
             for pos_sym, pos_data in current_positions.items():
-                norm_pos = pos_sym.replace("/", "").replace(":", "").split("USDT")[0] + "USDT"
+                norm_pos = self.exchange.symbols.raw_id(pos_sym)
                 
                 if norm_pos not in db_symbols:
                     import time
@@ -1363,7 +1887,7 @@ class TelegramListener:
                     except Exception as e:
                         logger.error(f"Error in manual detection for {pos_sym}: {e}")
                     
-                    db_symbols.append(norm_pos)
+                    db_symbols.add(norm_pos)
         except Exception as detect_e:
             logger.error(f"Manual Detection Loop Error: {detect_e}")
         return found_count
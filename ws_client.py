@@ -0,0 +1,86 @@
+import asyncio
+import json
+import logging
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+class BitgetWSClient:
+    """
+    Connection loop shared by the Bitget V2 WebSocket feeds: connect, `on_connect` (login /
+    re-subscribe), text "ping" heartbeat, JSON dispatch to `on_message`, reconnect with backoff.
+    """
+    name = "ws"
+
+    def __init__(self, url, ping_interval=25):
+        self.url = url
+        self.ping_interval = ping_interval
+        self.connected = asyncio.Event()
+        self._ws = None
+        self._task = None
+        self.stats = {"messages": 0, "reconnects": 0}
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def send(self, payload):
+        """Fire-and-forget JSON send; dropped while disconnected (on_connect restores state)."""
+        if self._ws is None or self._ws.closed:
+            return False
+        asyncio.create_task(self._ws.send_str(json.dumps(payload)))
+        return True
+
+    async def on_connect(self, ws):
+        pass
+
+    def on_message(self, payload):
+        pass
+
+    async def _heartbeat(self, ws):
+        # Bitget drops connections without a ping for 2 minutes
+        while not ws.closed:
+            await asyncio.sleep(self.ping_interval)
+            await ws.send_str("ping")
+
+    async def _run(self):
+        backoff = 1
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.ws_connect(self.url, heartbeat=None, timeout=10) as ws:
+                        self._ws = ws
+                        backoff = 1
+                        await self.on_connect(ws)
+                        self.connected.set()
+                        heartbeat = asyncio.create_task(self._heartbeat(ws))
+                        try:
+                            async for msg in ws:
+                                if msg.type != aiohttp.WSMsgType.TEXT:
+                                    if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                        break
+                                    continue
+                                if msg.data == "pong":
+                                    continue
+                                self.stats["messages"] += 1
+                                self.on_message(json.loads(msg.data))
+                        finally:
+                            heartbeat.cancel()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"{self.name} connection error: {e}")
+                finally:
+                    self._ws = None
+                    self.connected.clear()
+
+                self.stats["reconnects"] += 1
+                logger.info(f"📡 {self.name} disconnected. Reconnecting in {backoff}s...")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)